@@ -1,118 +1,250 @@
-from flask import Flask, request, render_template, redirect, url_for ,Response
+from flask import Flask, request, render_template, redirect, url_for ,Response, jsonify, stream_with_context, g
 import numpy as np
 import pandas as pd
 from src.utils.logger import logger
-from src.pipeline.drift_detection import DriftDetectionPipeline
-from src.pipeline.drift_metrics import DriftMetricsUpdater
+from src.pipeline.drift_schedule import DriftSchedulePipeline
+from src.pipeline.metrics_collector import MetricsCollectorPipeline
+from src.pipeline.drift_monitor import DriftMonitorPipeline
+from src.pipeline.traffic_capture import TrafficCapturePipeline
 from src.pipeline.prediction import PredictionPipeline
+from src.pipeline.training_jobs import TrainingJobManager
 from src.config.configuration import ConfigurationManager
+from src.constants import PREDICTION_INPUT_SCHEMA
+from src.utils.serving_metrics import ServingMetrics, GAUGE_MULTIPROCESS_MODE
+import io
+import json
 import os
-import mlflow.pyfunc
-import psutil
-from prometheus_client import Gauge, generate_latest, CONTENT_TYPE_LATEST, CollectorRegistry
+import time
+import uuid
+from prometheus_client import Gauge, generate_latest, CONTENT_TYPE_LATEST, CollectorRegistry, multiprocess
+from prometheus_client.openmetrics.exposition import generate_latest as generate_openmetrics, \
+    CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE
 
 app = Flask(__name__)
 
 # Set up Prometheus registry and gauges
 registry = CollectorRegistry()
-drift_gauge = Gauge('evidently_data_drift_score', 'Data drift score from Evidently AI', ['metric'], registry=registry)
+drift_gauge = Gauge('evidently_data_drift_score', 'Data drift score from Evidently AI', ['metric'], registry=registry,
+                    multiprocess_mode=GAUGE_MULTIPROCESS_MODE)
 # Drift metrics gets updated dynamically based on drift report.
 # For each drift metric (e.g., overall, or per-feature), a Gauge is created.
 drift_gauges = {}
-# System usage metrics
-cpu_usage_gauge = Gauge('system_cpu_usage_percent', 'System CPU usage percent', registry=registry)
-memory_usage_gauge = Gauge('system_memory_usage_percent', 'System memory usage percent', registry=registry)
+# Request latency, per-stage serving latency, decisions and errors
+serving_metrics = ServingMetrics(registry)
+
+# Under gunicorn (gunicorn.conf.py) this module is loaded once in the master process and the workers
+# are forked from it; threads do not survive a fork, so each worker starts its own (post_fork)
+start_threads = not os.environ.get("DEFER_BACKGROUND_THREADS")
+# Directory the gunicorn workers share training jobs and running drift counts through; unset for a single process
+serving_state_dir = os.environ.get("SERVING_STATE_DIR")
+
+# Model, transform plan and config are loaded once here and hot-swapped when a new version is registered
+inference_context = PredictionPipeline().main(start=start_threads)
+# Scored rows are binned against the training reference profile as they arrive,
+# and queued for capture to disk as the current window of the full drift report
+drift_monitor = DriftMonitorPipeline().main(state_dir=serving_state_dir)
+traffic_recorder = TrafficCapturePipeline().main(start=start_threads)
+# The full drift report runs on its own thread; its last result backs /drift?report=full and the drift gauges
+drift_scheduler = DriftSchedulePipeline().main(registry, drift_gauge, drift_gauges, start=start_threads)
+# System usage and running drift gauges are refreshed in the background, not per scrape
+metrics_collector = MetricsCollectorPipeline().main(registry, drift_gauge, drift_gauges, drift_monitor, drift_scheduler,
+                                                    start=start_threads)
+
+def start_background_threads():
+    """
+    Start the model watcher, traffic writer, drift scheduler, metrics collector and
+    training job watcher threads of this process.
+    """
+    inference_context.start_watcher()
+    traffic_recorder.start()
+    drift_scheduler.start()
+    metrics_collector.start()
+    training_jobs.start()
+
+def record_traffic(input_df, predictions):
+    """Feed scored rows to drift monitoring; monitoring never fails a prediction."""
+    try:
+        drift_monitor.update(input_df)
+        traffic_recorder.record(input_df, predictions)
+        drift_scheduler.notify_rows(len(input_df))
+    except Exception as e:
+        logger.error(f"Error recording scored traffic: {e}")
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    # Serving stages add their seconds here; observed once the response is ready
+    g.timings = {}
+
+@app.after_request
+def observe_request(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    serving_metrics.observe_request(endpoint, request.method, response.status_code,
+                                    time.perf_counter() - g.request_started, g.request_id)
+    if g.timings:
+        serving_metrics.observe_stages(endpoint, g.timings, g.request_id)
+    response.headers["X-Request-ID"] = g.request_id
+    return response
 
 @app.route('/', methods=['GET'])
 def home():
     return render_template("index.html")
 
+# Training runs on a background worker; the newly registered version is picked up as soon as it finishes,
+# by this process and (through the shared job files) by the other workers
+def on_training_success():
+    inference_context.refresh()
+    drift_monitor.refresh()
+    drift_scheduler.request_run()
+
+training_jobs = TrainingJobManager(on_success=on_training_success, state_dir=serving_state_dir)
+
 @app.route('/train',methods=['GET', 'POST'])  # route to train the pipeline
 def training():
-    os.system("python main.py")
-    logger.info("Training completed. Redirecting to prediction page.")
-    return redirect(url_for('predict'))
+    """
+    Starts a training job (or returns the one already running) without blocking.
+    Browsers get a progress page; API clients get 202 with the job id to poll.
+    """
+    job = training_jobs.submit()
+    if not request.is_json and request.accept_mimetypes.accept_html:
+        return render_template("training.html", job=job)
+    status_url = url_for('training_status', job_id=job.job_id)
+    return jsonify({"job_id": job.job_id, "status": job.status, "status_url": status_url}), 202, {"Location": status_url}
 
-model = None
+@app.route('/train/<job_id>', methods=['GET'])
+def training_status(job_id):
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown training job {job_id}"}), 404
+    return jsonify(job)
+
+@app.route('/train/<job_id>/events', methods=['GET'])
+def training_events(job_id):
+    """Streams the job status as server-sent events until the job finishes."""
+    if training_jobs.get(job_id) is None:
+        return jsonify({"error": f"Unknown training job {job_id}"}), 404
+
+    def stream():
+        seen_events, seen_status = -1, None
+        while True:
+            job = training_jobs.wait_for_update(job_id, seen_events, seen_status)
+            if job is None:
+                return
+            if (len(job["events"]), job["status"]) != (seen_events, seen_status):
+                seen_events, seen_status = len(job["events"]), job["status"]
+                yield f"data: {json.dumps(job)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if job["status"] in ("completed", "failed"):
+                return
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream")
 
 @app.route("/predict", methods=["GET", "POST"])
 def predict():
     """
     Handles prediction requests.
     """
-    global model  # Use the global model variable
-
-    if model is None:
-        try:
-            config_manager = ConfigurationManager()
-            mlflow_config = config_manager.get_mlflow_config()
-            mlflow.set_tracking_uri(mlflow_config.tracking["tracking_uri"])
-            # Load the model from the registry by specifying the model name
-            model = mlflow.pyfunc.load_model(f"models:/{mlflow_config.model_name}/1")
-            logger.info("Model loaded successfully from MLflow.")
-        except Exception as e:
-            logger.error(f"Error loading model: {str(e)}")
-            return render_template("result.html", result="Model loading failed.")
+    try:
+        inference_context.get_bundle()
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        serving_metrics.count_error("/predict", e)
+        return render_template("result.html", result="Model loading failed.")
 
     if request.method == "POST":
         try:
-            # Retrieve input values from the form
-            input_data = {
-                            'age': int(request.form['age']),
-                            'education_level': request.form['education_level'],
-                            'num_platforms': float(request.form['num_platforms']),
-                            'work_experience': float(request.form['work_experience']),
-                            'monthly_income': float(request.form['monthly_income']),
-                            'seasonal_variation': float(request.form['seasonal_variation']),
-                            'income_volatility': int(request.form['income_volatility']),
-                            'savings_balance': float(request.form['savings_balance']),
-                            'debt_to_income_ratio': float(request.form['debt_to_income_ratio']),
-                            'credit_score': int(request.form['credit_score']),
-                            'existing_loans': float(request.form['existing_loans']),
-                            'loan_amount_requested': float(request.form['loan_amount_requested']),
-                            'transaction_frequency': int(request.form['transaction_frequency']),
-                            'avg_monthly_expenses': float(request.form['avg_monthly_expenses']),
-                            'credit_card_utilization': int(request.form['credit_card_utilization']),
-                            'subscription_services': int(request.form['subscription_services']),
-                            'financial_emergencies_last_year': int(request.form['financial_emergencies_last_year']),
-                            'inflation_rate': float(request.form['inflation_rate']),
-                            'customer_feedback_score': float(request.form['customer_feedback_score']),
-                            'work_consistency': int(request.form['work_consistency']),
-                            'penalties': float(request.form['penalties']),
-                            'alternative_income_source': request.form['alternative_income_source'],
-                            'loan_coapplicant': request.form['loan_coapplicant'],
-                            'urban_rural': request.form['urban_rural'],
-                            'avg_platform_tenure': float(request.form['avg_platform_tenure']),
-                            'family_dependents': int(request.form['family_dependents']),
-                            'cost_of_living_index': float(request.form['cost_of_living_index']),
-                            'reason_for_loan': request.form['reason_for_loan'],
-                            'platform_ratings': request.form['platform_ratings']
-                        }
-            # Convert input data into DataFrame for prediction
-            input_df = pd.DataFrame([input_data])
+            with serving_metrics.timed(g.timings, "parse_input"):
+                # Retrieve input values from the form
+                input_data = {col: cast(request.form[col]) for col, cast in PREDICTION_INPUT_SCHEMA.items()}
+                # Convert input data into DataFrame for prediction
+                input_df = pd.DataFrame([input_data])
             logger.info(f"Input DataFrame for prediction:\n{input_df}")
-            # Preprocess input data using the loaded preprocessor
-            predictor = PredictionPipeline()
-            processed_input = predictor.main(input_df)
-            logger.info(f"Processed input data: {processed_input}")
-            prediction = model.predict(processed_input)
+            # Preprocess and score with the resident model and transform plan
+            prediction = inference_context.predict(input_df, timings=g.timings)
+            serving_metrics.count_decisions("/predict", prediction)
+            record_traffic(input_df, pd.DataFrame({"loan_approved": prediction}))
             logger.info(f"Predicted output: {prediction[0]}")
             result = "Loan is Approved" if prediction[0] == 1 else "Loan is Rejected"
-            return render_template("result.html", result=result)
+            with serving_metrics.timed(g.timings, "render"):
+                return render_template("result.html", result=result)
         except Exception as e:
             logger.error(f"Error during prediction: {str(e)}")
+            serving_metrics.count_error("/predict", e)
             return render_template("result.html", result="Error in prediction.")
     return render_template("predict.html")
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Scores many applicants in one call.
+    Accepts a JSON list of records (or {"records": [...]}), a CSV upload in the
+    `file` form field, or a raw text/csv body. CSV in gives CSV out, JSON in gives JSON out.
+    """
+    try:
+        inference_context.get_bundle()
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        serving_metrics.count_error("/predict/batch", e)
+        return jsonify({"error": "Model loading failed."}), 503
+
+    try:
+        parse_started = time.perf_counter()
+        if request.is_json:
+            payload = request.get_json()
+            records = payload.get("records", []) if isinstance(payload, dict) else payload
+            input_df = pd.DataFrame.from_records(records)
+            as_csv = False
+        elif "file" in request.files:
+            input_df = pd.read_csv(request.files["file"])
+            as_csv = True
+        elif request.mimetype == "text/csv":
+            input_df = pd.read_csv(io.BytesIO(request.get_data()))
+            as_csv = True
+        else:
+            return jsonify({"error": "Send JSON records, a CSV file upload or a text/csv body."}), 415
+        g.timings["parse_input"] = time.perf_counter() - parse_started
+        logger.info(f"Batch prediction request with {len(input_df)} rows")
+
+        predictions = inference_context.predict_batch(input_df, timings=g.timings)
+        serving_metrics.count_decisions("/predict/batch", predictions["loan_approved"].to_numpy())
+        record_traffic(input_df, predictions)
+        with serving_metrics.timed(g.timings, "render"):
+            if as_csv:
+                return Response(predictions.to_csv(index=False), mimetype="text/csv")
+            return jsonify({"predictions": predictions.to_dict(orient="records")})
+    except (ValueError, KeyError) as e:
+        logger.error(f"Invalid batch prediction request: {str(e)}")
+        serving_metrics.count_error("/predict/batch", e)
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {str(e)}")
+        serving_metrics.count_error("/predict/batch", e)
+        return jsonify({"error": "Error in prediction."}), 500
+
 @app.route("/drift", methods=["GET"])
 def drift():
+        """
+        Running drift of scored traffic against the training reference (cheap to read).
+        ?report=full returns the last full drift report of the background scheduler instead;
+        &refresh=1 also asks it for a new run, which a later request will see.
+        """
         try:
-            # Load drift detection configuration from config
-            logger.info(f" Drift Detection started ") 
-            drift_detection = DriftDetectionPipeline()
-            drift_report = drift_detection.main()
-            logger.info(f" Drift Detection completed ")
-        
+            if request.args.get("report") != "full":
+                drift_report = drift_monitor.snapshot()
+                if request.is_json or not request.accept_mimetypes.accept_html:
+                    return jsonify(drift_report)
+                return render_template("drift.html", drift_report=drift_report)
+
+            if request.args.get("refresh"):
+                drift_scheduler.request_run()
+            drift_report = drift_scheduler.latest
+            if drift_report is None:
+                drift_scheduler.request_run()
+                drift_report = {"error": "No drift report yet; one has been scheduled."}
+            if request.is_json or not request.accept_mimetypes.accept_html:
+                return jsonify({"schedule": drift_scheduler.status(), "report": drift_report})
             return render_template("drift.html", drift_report=drift_report)
     
         except Exception as e:
@@ -123,23 +255,22 @@ def drift():
 def metrics():
     """
     Exposes system and drift metrics so that Prometheus (and Grafana) can scrape them.
+    The gauges are kept current by the metrics collector and the drift scheduler.
+    Scrapers accepting OpenMetrics also get the latency exemplars (request ids).
+    With several gunicorn workers (PROMETHEUS_MULTIPROC_DIR set) the metrics of every
+    worker are merged from their files, whichever worker answers the scrape.
     """
-    try:
-        # Update system metrics with current values
-        cpu_usage = psutil.cpu_percent(interval=1)
-        mem_usage = psutil.virtual_memory().percent
-        cpu_usage_gauge.set(cpu_usage)
-        memory_usage_gauge.set(mem_usage)
-        # Update drift metrics from a saved report file 
-        metrics_updater = DriftMetricsUpdater()
-        metrics_updater.main(registry, drift_gauge, drift_gauges)
-    except Exception as e:
-        logger.exception("Error updating metrics: %s", e)
-
-    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+    exposed = registry
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        exposed = CollectorRegistry()
+        multiprocess.MultiProcessCollector(exposed)
+    if "application/openmetrics-text" in request.headers.get("Accept", ""):
+        return Response(generate_openmetrics(exposed), mimetype=OPENMETRICS_CONTENT_TYPE)
+    return Response(generate_latest(exposed), mimetype=CONTENT_TYPE_LATEST)
 
 
 if __name__ == "__main__":
+    # Development server; production runs gunicorn -c gunicorn.conf.py wsgi:app
     app.run(host="0.0.0.0", port = 1417, debug=True, use_reloader=False)
 
 
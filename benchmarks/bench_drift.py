@@ -0,0 +1,81 @@
+"""
+Benchmark the full drift report engines: the native binned statistics against
+Evidently's DataDriftPreset, on synthetic reference/current frames of growing
+size with a known shift in one numeric and one categorical column.
+
+--workers times the native engine again on that many processes, which
+memory-map the frames from Arrow files; it only pays off with as many cores.
+
+Evidently runs only when it is installed and the frames are at most
+--evidently-max-rows rows (it keeps every column in memory several times over).
+
+    python -m benchmarks.bench_drift --rows 10000 1000000 10000000 --workers 4
+"""
+import argparse
+from functools import partial
+import numpy as np
+import pandas as pd
+from benchmarks.bench_platform_ratings import timed
+from src.components.drift_detection import native_drift, evidently_drift
+from src.utils.profiling import PeakMemorySampler
+
+
+def make_frame(rows: int, numeric: int, categorical: int, shift: float, seed: int) -> pd.DataFrame:
+    """Float32 numeric columns and low-cardinality categoricals; `shift` moves num_0 and cat_0."""
+    rng = np.random.default_rng(seed)
+    data = {f"num_{i}": rng.standard_normal(rows, dtype=np.float32) for i in range(numeric)}
+    data["num_0"] += np.float32(shift)
+    levels = np.array(["a", "b", "c", "d"])
+    for i in range(categorical):
+        weights = np.array([0.4, 0.3, 0.2, 0.1])
+        if i == 0 and shift:
+            weights = weights[::-1]
+        data[f"cat_{i}"] = pd.Categorical.from_codes(rng.choice(4, rows, p=weights).astype(np.int8), levels)
+    return pd.DataFrame(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000, 10000000],
+                        help="Rows of both the reference and the current frame")
+    parser.add_argument("--numeric", type=int, default=8)
+    parser.add_argument("--categorical", type=int, default=3)
+    parser.add_argument("--shift", type=float, default=0.5, help="Mean shift of num_0 in the current frame")
+    parser.add_argument("--workers", type=int, default=1, help="Also time the native engine on this many processes")
+    parser.add_argument("--shared-dir", default=None, help="Scratch directory of the worker files, e.g. /dev/shm")
+    parser.add_argument("--evidently-max-rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    try:
+        import evidently  # noqa: F401
+        has_evidently = True
+    except ImportError:
+        has_evidently = False
+        print("evidently is not installed; timing the native engine only\n")
+
+    print(f"{'rows':>10}{'engine':>13}{'seconds':>10}{'+RSS MB':>9}{'drifted':>9}{'num_0 score':>13}")
+    for rows in args.rows:
+        reference = make_frame(rows, args.numeric, args.categorical, 0.0, seed=0)
+        current = make_frame(rows, args.numeric, args.categorical, args.shift, seed=1)
+        engines = [("native", native_drift)]
+        if args.workers > 1:
+            engines.append((f"native x{args.workers}",
+                            partial(native_drift, n_workers=args.workers, shared_dir=args.shared_dir)))
+        if has_evidently and rows <= args.evidently_max_rows:
+            engines.append(("evidently", evidently_drift))
+        for name, engine in engines:
+            with PeakMemorySampler() as memory:
+                seconds, report = timed(engine, reference, current, repeat=1)
+            if name.startswith("native"):
+                drifted = report["number_of_drifted_columns"]
+                score = report["drift_by_columns"]["num_0"]["drift_score"]
+            else:
+                table = next(m["result"] for m in report["metrics"] if "drift_by_columns" in m["result"])
+                drifted = table["number_of_drifted_columns"]
+                score = table["drift_by_columns"]["num_0"]["drift_score"]
+            print(f"{rows:>10}{name:>13}{seconds:>10.3f}{memory.increase_mb:>9.1f}{drifted:>9}{score:>13.4f}")
+        del reference, current
+
+
+if __name__ == "__main__":
+    main()
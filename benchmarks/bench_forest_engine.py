@@ -0,0 +1,96 @@
+"""
+Benchmark the compiled forest engine against sklearn and the MLflow pyfunc wrapper.
+
+Scores the committed model on transformed test rows, one row per call and in
+batches of several sizes, and checks the compiled probabilities equal sklearn's exactly.
+
+    python -m benchmarks.bench_forest_engine --batch-sizes 32 512 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from benchmarks.bench_platform_ratings import timed
+from src.components.forest_engine import CompiledForest
+from src.components.transform_plan import TransformPlan
+from src.config.configuration import ConfigurationManager
+from src.utils.common import load_frame
+
+
+def load_inputs():
+    """Committed model, and the test split transformed with the committed plan."""
+    config_manager = ConfigurationManager()
+    mb_config = config_manager.get_model_building_config()
+    dp_config = config_manager.get_data_preprocessing_config()
+    model = joblib.load(os.path.join(mb_config.model_dir, mb_config.model_name))
+    plan = TransformPlan.load(os.path.join(dp_config.root_dir, dp_config.plan_name))
+    test = load_frame(dp_config.test_data_file, dp_config.artifact_format)
+    return model, plan.transform_frame(test)
+
+
+def load_pyfunc(model, directory):
+    """The model as serving loaded it before: saved with mlflow.sklearn, loaded as a pyfunc."""
+    try:
+        import mlflow.pyfunc
+        import mlflow.sklearn
+    except ImportError:
+        return None
+    path = os.path.join(directory, "model")
+    mlflow.sklearn.save_model(model, path, serialization_format="cloudpickle")
+    return mlflow.pyfunc.load_model(path)
+
+
+def per_row_latency(fn, rows: pd.DataFrame, n_calls: int) -> float:
+    """Mean seconds per call when scoring one row at a time."""
+    singles = [rows.iloc[[i % len(rows)]] for i in range(n_calls)]
+    start = time.perf_counter()
+    for row in singles:
+        fn(row)
+    return (time.perf_counter() - start) / n_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 512, 10_000, 100_000])
+    parser.add_argument("--single-calls", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    model, features = load_inputs()
+    forest = CompiledForest.from_sklearn(model)
+    largest = features.iloc[np.arange(max(args.batch_sizes)) % len(features)].reset_index(drop=True)
+    print(f"{forest.n_trees} trees, max depth {forest.max_depth}, {len(forest.threshold):,} nodes, "
+          f"{forest.nbytes / 1e6:.2f} MB node table")
+
+    with tempfile.TemporaryDirectory() as directory:
+        pyfunc = load_pyfunc(model, directory)
+        cases = [("sklearn predict_proba", model.predict_proba),
+                 ("compiled predict_proba", lambda X: forest.predict_proba(X.to_numpy()))]
+        if pyfunc is not None:
+            cases.insert(0, ("mlflow pyfunc predict", pyfunc.predict))
+
+        print(f"single row, mean of {args.single_calls} calls")
+        for name, fn in cases:
+            seconds = per_row_latency(fn, features, args.single_calls)
+            print(f"  {name:<24} {seconds * 1e6:10.1f} us/row")
+
+        for size in args.batch_sizes:
+            batch = largest.iloc[:size]
+            print(f"batch of {size:,} rows, best of {args.repeat}")
+            for name, fn in cases:
+                seconds, _ = timed(fn, batch, repeat=args.repeat)
+                print(f"  {name:<24} {seconds * 1e3:10.2f} ms  {size / seconds:14,.0f} rows/s")
+
+    expected = model.predict_proba(largest)
+    assert np.array_equal(forest.predict_proba(largest.to_numpy()), expected), "compiled probabilities differ"
+    assert np.array_equal(forest.predict(largest.to_numpy()), model.predict(largest)), "compiled classes differ"
+    print("  compiled predictions match sklearn exactly")
+
+
+if __name__ == "__main__":
+    main()
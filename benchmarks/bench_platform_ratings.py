@@ -0,0 +1,96 @@
+"""
+Benchmark the vectorized platform_ratings parser against the implementations it replaced.
+
+    python -m benchmarks.bench_platform_ratings --rows 200000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.components.platform_ratings import parse_platform_ratings
+
+PLATFORMS = ["Swiggy", "Zomato", "Rapido", "Ola", "Uber", "Amazon Flex", "Dunzo", "UrbanClap", "Fiverr", "Upwork"]
+
+
+def make_ratings(n: int, seed: int = 42) -> pd.Series:
+    """Rating strings shaped like the synthetic data: 1-3 platforms per applicant."""
+    rng = np.random.default_rng(seed)
+    counts = rng.choice([1, 2, 3], size=n, p=[0.6, 0.3, 0.1])
+    picks = rng.random((n, len(PLATFORMS))).argsort(axis=1)
+    scores = np.round(rng.uniform(3.0, 5.0, (n, 3)), 1)
+    return pd.Series([
+        "; ".join(f"{PLATFORMS[picks[i, j]]}:{scores[i, j]}" for j in range(counts[i]))
+        for i in range(n)
+    ])
+
+
+def legacy_training_average(ratings: pd.Series) -> pd.Series:
+    """Step 7 of the old _base_preprocessing: split into 3 columns, dict per cell, average."""
+    elementwise = pd.DataFrame.map if hasattr(pd.DataFrame, "map") else pd.DataFrame.applymap
+    platform_ratings = ratings.str.split('; ', expand=True)
+    platform_ratings_dict = elementwise(platform_ratings, lambda x: dict([x.split(':')]) if pd.notna(x) else {})
+
+    def calculate_avg(ratings):
+        if isinstance(ratings, dict) and len(ratings) > 0:
+            return sum(map(float, ratings.values())) / len(ratings)
+        return None
+    return elementwise(platform_ratings_dict[[0, 1, 2]], calculate_avg).mean(axis=1)
+
+
+def legacy_serving_average(ratings: pd.Series) -> pd.Series:
+    """The old per-row calculate_average_platform_rating from prediction_preprocess."""
+    def calculate_average_platform_rating(rating_str: str) -> float:
+        try:
+            items = [item.strip() for item in rating_str.split(';') if item.strip()]
+            scores = []
+            for item in items:
+                parts = item.split(':')
+                if len(parts) == 2:
+                    try:
+                        scores.append(float(parts[1].strip()))
+                    except ValueError:
+                        continue
+            return np.mean(scores) if scores else 0.0
+        except Exception:
+            return 0.0
+    return ratings.apply(calculate_average_platform_rating)
+
+
+def timed(fn, *args, repeat: int = 3, **kwargs):
+    """Best wall time over `repeat` runs, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ratings = make_ratings(args.rows)
+    cases = [
+        ("legacy training (applymap)", lambda: legacy_training_average(ratings)),
+        ("legacy serving (apply)", lambda: legacy_serving_average(ratings)),
+        ("vectorized average", lambda: parse_platform_ratings(ratings).average),
+        ("vectorized + dense block", lambda: parse_platform_ratings(ratings, per_platform=True)),
+        ("vectorized + sparse block", lambda: parse_platform_ratings(ratings, per_platform=True, sparse=True)),
+    ]
+    results = {}
+    print(f"{args.rows:,} rows, best of {args.repeat}")
+    for name, fn in cases:
+        seconds, results[name] = timed(fn, repeat=args.repeat)
+        print(f"  {name:<28} {seconds:8.3f} s  {args.rows / seconds:14,.0f} rows/s")
+
+    expected = results["legacy training (applymap)"].to_numpy(dtype=float)
+    assert np.allclose(results["vectorized average"], expected), "vectorized average differs from legacy"
+    assert np.allclose(results["legacy serving (apply)"], expected), "legacy implementations disagree"
+    print("  averages match the legacy implementations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the class rebalancing methods: time and memory of the rebalancing
+step, forest fit time on the result, and the metrics ModelEvaluation reports
+on the untouched test split.
+
+The training split is enlarged to --rows by resampling it with a little
+noise on the numeric columns, to show how each method scales.
+
+    python -m benchmarks.bench_rebalancing --rows 200000
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from benchmarks.bench_platform_ratings import timed
+from src.components.rebalancing import REBALANCE_METHODS, rebalance
+from src.components.transform_plan import TransformPlan
+from src.config.configuration import ConfigurationManager
+from src.utils.common import load_frame
+from src.utils.profiling import PeakMemorySampler
+
+
+def load_inputs(rows: int, seed: int = 0):
+    """Transformed train split enlarged to `rows` rows, and the transformed test split."""
+    dp_config = ConfigurationManager().get_data_preprocessing_config()
+    plan = TransformPlan.load(os.path.join(dp_config.root_dir, dp_config.plan_name))
+    train = load_frame(dp_config.train_data_file, dp_config.artifact_format)
+    test = load_frame(dp_config.test_data_file, dp_config.artifact_format)
+    X, y = plan.transform_frame(train), plan.target(train)
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(len(X), size=rows)
+    X_big = X.iloc[picks].reset_index(drop=True)
+    continuous = [col for col in X.columns if X[col].nunique() > 20]
+    X_big[continuous] *= rng.normal(1, 0.01, (rows, len(continuous))).astype(np.float32)
+    return X_big, y.iloc[picks].reset_index(drop=True), plan.transform_frame(test), plan.target(test)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Training rows before rebalancing")
+    parser.add_argument("--methods", nargs="+", default=REBALANCE_METHODS, choices=REBALANCE_METHODS)
+    parser.add_argument("--subset-rows", type=int, default=20000, help="Minority rows indexed by smote_subset")
+    parser.add_argument("--trees", type=int, default=50)
+    args = parser.parse_args()
+
+    X, y, X_test, y_test = load_inputs(args.rows)
+    print(f"{len(X)} training rows, minority share {y.mean():.3f}; {len(X_test)} test rows\n")
+    print(f"{'method':<18}{'rows out':>10}{'rebalance s':>13}{'+RSS MB':>9}{'fit s':>8}"
+          f"{'accuracy':>10}{'f1':>8}{'recall(1)':>11}")
+    for method in args.methods:
+        with PeakMemorySampler() as memory:
+            X_out, y_out = rebalance(X, y, method, subset_rows=args.subset_rows)
+        model = RandomForestClassifier(n_estimators=args.trees, n_jobs=-1, random_state=42,
+                                       class_weight="balanced" if method == "class_weight" else None)
+        fit_seconds, _ = timed(model.fit, X_out, y_out, repeat=1)
+        y_pred = model.predict(X_test)
+        report = classification_report(y_test, y_pred, output_dict=True)
+        print(f"{method:<18}{len(X_out):>10}{memory.seconds:>13.3f}{memory.increase_mb:>9.1f}{fit_seconds:>8.2f}"
+              f"{accuracy_score(y_test, y_pred):>10.4f}{report['weighted avg']['f1-score']:>8.4f}"
+              f"{report['1']['recall']:>11.4f}")
+        del X_out, y_out
+
+
+if __name__ == "__main__":
+    main()
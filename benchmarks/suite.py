@@ -0,0 +1,210 @@
+"""
+Benchmark suite: throughput of the main pipeline and serving steps at several
+scales, compared with a saved baseline.
+
+Each benchmark runs the real component on synthetic applicants generated with a
+fixed seed, in a scratch directory (the committed artifacts are not touched),
+and reports rows per second (requests per second for single-row inference):
+
+    ingestion           DataIngestion.generate_synthetic_data
+    base_preprocess     DataPreprocessing._base_preprocessing with a fitted plan
+    predict_preprocess  DataPreprocessing.prediction_preprocess
+    build_model         ModelBuilding.build_model (--trees trees)
+    predict_single      InferenceContext.predict, one row per call
+    predict_batch       InferenceContext.predict_batch
+    drift               DriftDetection.run_drift_detection (configured engine)
+
+Results are compared with --baseline; any benchmark slower than the baseline by
+more than --threshold (a fraction of its throughput) is reported and the script
+exits with status 1. --save-baseline writes the current results instead. Baselines
+are only comparable on the same machine; the file records where it was measured.
+Everything runs offline on CPU.
+
+    python -m benchmarks.suite --scales 5000 100000 1000000
+    python -m benchmarks.suite --scales 5000 100000 --save-baseline
+"""
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import sklearn
+from benchmarks.bench_platform_ratings import timed
+from src.components.data_ingestion import DataIngestion
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.drift_detection import DriftDetection
+from src.components.model_building import ModelBuilding
+from src.components.model_serving import InferenceContext, ModelBundle
+from src.components.transform_plan import TransformPlan
+from src.config.configuration import ConfigurationManager
+from src.constants import PREDICTION_INPUT_SCHEMA
+from src.utils.common import load_frame
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCHMARKS = ["ingestion", "base_preprocess", "predict_preprocess", "build_model",
+              "predict_single", "predict_batch", "drift"]
+
+
+def machine() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__
+    }
+
+
+class Suite:
+    def __init__(self, scratch: str, trees: int, single_rows: int, repeat: int):
+        """
+        Component configs from config.yaml with every output redirected into `scratch`.
+        :param single_rows: Calls timed for single-row inference.
+        """
+        config_manager = ConfigurationManager()
+        self.ingestion_config = dataclasses.replace(
+            config_manager.get_data_ingestion_config(), root_dir=scratch,
+            shards_dir=os.path.join(scratch, "shards"), num_workers=1)
+        self.dp_config = dataclasses.replace(config_manager.get_data_preprocessing_config(), root_dir=scratch)
+        self.mb_config = dataclasses.replace(config_manager.get_model_building_config(), model_dir=scratch,
+                                             warm_start=False)
+        self.md_config = dataclasses.replace(config_manager.get_model_drift_config(), drift_dir=scratch)
+        self.pr_config = config_manager.get_prediction_config()
+        self.mlflow_config = config_manager.get_mlflow_config()
+        self.scratch = scratch
+        self.trees = trees
+        self.single_rows = single_rows
+        self.repeat = repeat
+
+    def generate(self, rows: int, seed: int) -> pd.DataFrame:
+        config = dataclasses.replace(self.ingestion_config, n_samples=rows, seed=seed,
+                                     data_file=os.path.join(self.scratch, f"data-{rows}-{seed}.parquet"))
+        return load_frame(DataIngestion(config).generate_synthetic_data(), config.artifact_format)
+
+    def run(self, rows: int, benchmarks: list) -> dict:
+        """Seconds and throughput of each benchmark at `rows` rows."""
+        results = {}
+        repeat = self.repeat if rows < 1_000_000 else 1
+
+        def record(name, seconds, units):
+            results[name] = {"rows": units, "seconds": seconds, "rows_per_second": units / seconds}
+            print(f"{name:<20}{rows:>10}{seconds:>12.3f}{units / seconds:>16.0f}", flush=True)
+
+        if "ingestion" in benchmarks:
+            config = dataclasses.replace(self.ingestion_config, n_samples=rows,
+                                         data_file=os.path.join(self.scratch, f"data-{rows}.parquet"))
+            seconds, data_file = timed(DataIngestion(config).generate_synthetic_data, repeat=repeat)
+            record("ingestion", seconds, rows)
+            df = load_frame(data_file, config.artifact_format)
+        else:
+            df = self.generate(rows, self.ingestion_config.seed)
+
+        preprocessing = DataPreprocessing(self.dp_config)
+        plan = TransformPlan.fit(df, platform_features=self.dp_config.platform_features)
+        if "base_preprocess" in benchmarks:
+            seconds, _ = timed(preprocessing._base_preprocessing, df, plan, repeat=repeat)
+            record("base_preprocess", seconds, rows)
+        inputs = df[list(PREDICTION_INPUT_SCHEMA)]
+        if "predict_preprocess" in benchmarks:
+            seconds, _ = timed(preprocessing.prediction_preprocess, inputs, plan, repeat=repeat)
+            record("predict_preprocess", seconds, rows)
+
+        X, y = plan.transform_frame(df), plan.target(df)
+        building = ModelBuilding(self.mb_config)
+        params = {"n_estimators": self.trees}
+        seconds, model = timed(building.build_model, X, y, params, repeat=1)
+        if "build_model" in benchmarks:
+            record("build_model", seconds, rows)
+
+        context = InferenceContext(self.dp_config, self.pr_config, self.mlflow_config)
+        context.bundle = ModelBundle(model, plan, "benchmark", "benchmark", compiled=context._compile(model))
+        if "predict_single" in benchmarks:
+            singles = [inputs.iloc[[i]] for i in range(min(self.single_rows, rows))]
+            start = time.perf_counter()
+            for row in singles:
+                context.predict(row)
+            record("predict_single", time.perf_counter() - start, len(singles))
+        if "predict_batch" in benchmarks:
+            batch = inputs.iloc[:min(rows, self.pr_config.max_batch_rows)]
+            seconds, _ = timed(context.predict_batch, batch, repeat=repeat)
+            record("predict_batch", seconds, len(batch))
+
+        if "drift" in benchmarks:
+            current = self.generate(rows, self.ingestion_config.seed + 1)[list(PREDICTION_INPUT_SCHEMA)]
+            seconds, _ = timed(DriftDetection(self.md_config).run_drift_detection, inputs, current, repeat=repeat)
+            record("drift", seconds, rows)
+        return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Benchmarks whose throughput fell more than `threshold` below the baseline."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        change = result["rows_per_second"] / reference["rows_per_second"] - 1
+        status = "REGRESSION" if change < -threshold else "ok"
+        print(f"{key:<28}{reference['rows_per_second']:>14.0f}{result['rows_per_second']:>14.0f}{change:>+9.1%}  {status}")
+        if status != "ok":
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[5000, 100000, 1000000], help="Row counts")
+    parser.add_argument("--benchmarks", nargs="+", default=BENCHMARKS, choices=BENCHMARKS)
+    parser.add_argument("--trees", type=int, default=20, help="Trees fitted by build_model")
+    parser.add_argument("--single-rows", type=int, default=500, help="Calls timed for predict_single")
+    parser.add_argument("--repeat", type=int, default=5, help="Best of this many runs (one run from 1M rows)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed throughput drop against the baseline, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as scratch:
+        suite = Suite(scratch, args.trees, args.single_rows, args.repeat)
+        print(f"{'benchmark':<20}{'rows':>10}{'seconds':>12}{'rows/s':>16}")
+        for rows in args.scales:
+            for name, result in suite.run(rows, args.benchmarks).items():
+                results[f"{name}@{rows}"] = result
+    report = {"machine": machine(), "created_at": time.time(), "trees": args.trees, "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nBaseline saved at {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["machine"] != report["machine"]:
+        print("\nWarning: the baseline was measured on a different machine or software stack")
+    if baseline.get("trees") != args.trees:
+        print(f"\nWarning: the baseline fitted {baseline.get('trees')} trees, this run {args.trees}")
+    print(f"\n{'benchmark':<28}{'baseline/s':>14}{'current/s':>14}{'change':>9}")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Gunicorn settings for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app (model, transform plan, drift reference, config) is loaded once in the master
+process (preload_app) and the workers are forked from it, sharing that memory
+copy-on-write. Each worker then starts its own background threads. The workers share
+training jobs (one trains at a time; any worker answers for a job) and merge their running
+drift counts through files in the state directory. Worker and thread counts, timeouts and
+the metrics and state directories come from the serving section of config.yaml;
+GUNICORN_CMD_ARGS (e.g. "--workers 4 --timeout 60") overrides them at deploy time.
+
+kill -HUP <master pid> replaces the workers gracefully: in-flight requests get
+graceful_timeout seconds to finish. The preloaded app is not re-imported; new model
+versions reach every worker through its registry watcher (prediction.reload_interval).
+"""
+import gc
+import glob
+import os
+from src.config.configuration import ConfigurationManager
+
+serving_config = ConfigurationManager().get_serving_config()
+
+# Prometheus multiprocess mode is chosen when prometheus_client is first imported (by the app),
+# so the directory is set here, before the app is loaded, for the master and every worker
+multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", str(serving_config.prometheus_multiproc_dir))
+os.makedirs(multiproc_dir, exist_ok=True)
+# Read by the app to share training jobs and running drift counts between the workers
+state_dir = os.environ.setdefault("SERVING_STATE_DIR", str(serving_config.state_dir))
+os.makedirs(state_dir, exist_ok=True)
+if not os.environ.get("DEFER_BACKGROUND_THREADS"):
+    # First load in this master (the file is read again on HUP): drop metric files and
+    # running drift counts of earlier runs
+    for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+        os.remove(path)
+    for path in glob.glob(os.path.join(state_dir, "drift_monitor", "*.json")):
+        os.remove(path)
+# Threads started in the master would not survive the fork; post_fork starts them per worker
+os.environ["DEFER_BACKGROUND_THREADS"] = "1"
+
+bind = serving_config.bind
+workers = serving_config.workers
+threads = serving_config.threads
+worker_class = "gthread"
+timeout = serving_config.timeout
+graceful_timeout = serving_config.graceful_timeout
+keepalive = serving_config.keepalive
+max_requests = serving_config.max_requests
+max_requests_jitter = serving_config.max_requests_jitter
+preload_app = True
+accesslog = "-"
+
+
+def when_ready(server):
+    """
+    The app is loaded and no worker forked yet: move its objects out of the garbage
+    collector's reach, so collections in the workers do not write to (and copy) their pages.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_background_threads
+    start_background_threads()
+    server.log.info(f"Worker {worker.pid}: background threads started")
+
+
+def child_exit(server, worker):
+    """Stop reporting the live gauges and running drift counts of a worker that exited."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+    try:
+        os.remove(os.path.join(state_dir, "drift_monitor", f"{worker.pid}.json"))
+    except FileNotFoundError:
+        pass
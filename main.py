@@ -1,67 +1,13 @@
-from src.utils.logger import logger
-from src.pipeline.data_ingestion import DataIngestionPipeline
-from src.pipeline.data_preprocessing import DataPreprocessingPipeline
-from src.pipeline.model_building import ModelBuildingPipeline
-from src.pipeline.model_evaluation import ModelEvaluationPipeline
-from src.pipeline.model_register import ModelRegisterPipeline
+import argparse
+from src.pipeline.training import TrainingPipeline, TRAINING_STAGES
 
 
-STAGE_NAME = "Data Ingestion stage"
-try:
-   logger.info(f" {STAGE_NAME} started ") 
-   data_ingestion = DataIngestionPipeline()
-   data_ingestion.main()
-   logger.info(f" {STAGE_NAME} completed ")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-STAGE_NAME = "Data Preprocessing stage"
-try:
-   logger.info(f" {STAGE_NAME} started ")  
-   data_preprocessing = DataPreprocessingPipeline()
-   X_train, y_train, X_test, y_test = data_preprocessing.main()
-   logger.info(f" {STAGE_NAME} completed ")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-STAGE_NAME = "Model Building stage"
-try:
-   logger.info(f" {STAGE_NAME} started ")  
-   model_building = ModelBuildingPipeline()
-   model_building.main(X_train, y_train)
-   logger.info(f" {STAGE_NAME} completed ")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-
-STAGE_NAME = "Model Evaluation stage"
-try:
-   logger.info(f" {STAGE_NAME} started ")  
-   model_evaluation = ModelEvaluationPipeline()
-   model_evaluation.main(X_test, y_test)
-   logger.info(f" {STAGE_NAME} completed ")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-STAGE_NAME = "Model Register stage"
-try:
-   logger.info(f" {STAGE_NAME} started ") 
-   model_register = ModelRegisterPipeline()
-   model_register.main()
-   logger.info(f" {STAGE_NAME} completed ")
-except Exception as e:
-        logger.exception(e)
-        raise e
+parser = argparse.ArgumentParser(description="Run the training pipeline graph in-process.")
+parser.add_argument("--stages", nargs="+", choices=[stage.name for stage in TRAINING_STAGES],
+                    help="Run only these stages and the stages they depend on.")
+parser.add_argument("--no-cache", action="store_true",
+                    help="Recompute every stage instead of reusing cached outputs.")
+args = parser.parse_args()
 
+# Stage failures are logged by the runner and re-raised
+TrainingPipeline().main(targets=args.stages, use_cache=not args.no_cache)
@@ -1,13 +1,29 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import PowerTransformer
-from imblearn.over_sampling import SMOTE
+from src.components.transform_plan import TransformPlan, TransformPlanBuilder, INPUT_COLUMNS
+from src.components.rebalancing import rebalance
+from src.utils.common import load_frame, save_frame, iter_frames, concat_artifacts
 from src.utils.logger import logger
-from src.utils.exception import CustomException
+from src.utils.profiling import PeakMemorySampler
+from src.utils.exception import CustomException, InvalidInputError
 import os
 import sys
-import joblib 
+import json
+import shutil
+
+# Raw columns carried into the train/test splits: the plan inputs, the label,
+# and location, which is not a feature but is monitored for drift
+SPLIT_COLUMNS = INPUT_COLUMNS + ['location', 'loan_approved']
+
+
+def test_split_mask(applicant_ids: pd.Series, test_fraction: float) -> np.ndarray:
+    """
+    Deterministic train/test assignment from a hash of applicant_id: the same applicant
+    always lands in the same split, whatever chunk or order it is read in.
+    """
+    hashes = pd.util.hash_pandas_object(applicant_ids, index=False).to_numpy()
+    return hashes < np.uint64(test_fraction * 2**64)
 
 class DataPreprocessing:
     def __init__(self, config):
@@ -17,6 +33,7 @@ class DataPreprocessing:
             - raw_data_file: path to raw synthetic data
             - train_data_file: path to save training data
             - test_data_file: path to save testing data
+            - training_mode: in_memory, or streaming for raw data larger than memory
         """
         self.config = config
 
@@ -25,254 +42,222 @@ class DataPreprocessing:
             logger.info("Splitting data into train and test sets...")
             logger.info("Data Preprocessing config type: %s", type(self.config))
             logger.info("Data Preprocessing config value: %s", self.config)
-            train, test = train_test_split(df, test_size=0.2, stratify=df['loan_approved'], random_state=42)
-            os.makedirs(os.path.dirname(self.config.train_data_file), exist_ok=True)
-            os.makedirs(os.path.dirname(self.config.test_data_file), exist_ok=True)
-            train.to_csv(self.config.train_data_file, index=False)
-            test.to_csv(self.config.test_data_file, index=False)
+            train, test = train_test_split(df, test_size=self.config.test_fraction, stratify=df['loan_approved'], random_state=42)
+            save_frame(train, self.config.train_data_file, self.config.artifact_format)
+            save_frame(test, self.config.test_data_file, self.config.artifact_format)
             logger.info("Train-test split complete and saved.")
             return train, test
         except Exception as e:
             logger.error("Error in train-test splitting")
             raise CustomException(e, sys)
 
-    def _base_preprocessing(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _base_preprocessing(self, df: pd.DataFrame, plan: TransformPlan):
         """
-        Preprocess the input DataFrame.
+        Preprocess the input DataFrame with a fitted transform plan.
         :param df: Input DataFrame (either train or test subset)
-        :param apply_smote: If True, apply SMOTE oversampling (recommended only on training data)
+        :param plan: TransformPlan fitted on the training subset
         :return: Tuple of (features X, target y)
         """
         try:
             logger.info("Starting data preprocessing on a subset...")
-
-
-            # === Step 3: One-Hot Encoding for 'reason_for_loan' ===
-            df = pd.get_dummies(df, columns=['reason_for_loan'], drop_first=True)
-
-            # === Step 4: Fraud Flag & Missing Value Handling for Fraud Cases ===
-            # If work_experience==0 and monthly_income is missing then force loan_approved=0
-            df.loc[(df['work_experience'] == 0) & (df['monthly_income'].isnull()), 'loan_approved'] = 0
-            df['fraud_flag'] = ((df['work_experience'] == 0) & (df['monthly_income'].isnull())).astype(int)
-            # Split fraud vs non-fraud
-            non_fraud_data = df[df['fraud_flag'] == 0].copy()
-            fraud_data = df[df['fraud_flag'] == 1].copy()
-            # For fraud cases, fill missing monthly_income with 0
-            fraud_data['monthly_income'] = fraud_data['monthly_income'].fillna(0)
-            # For non-fraud, use median for monthly_income and work_experience
-            non_fraud_data['monthly_income'].fillna(non_fraud_data['monthly_income'].median(), inplace=True)
-            non_fraud_data['work_experience'].fillna(non_fraud_data['work_experience'].median(), inplace=True)
-            # Also, if work_experience == 0, impute using median
-            non_fraud_data.loc[non_fraud_data['work_experience'] == 0, 'work_experience'] = non_fraud_data['work_experience'].median()
-            # Recombine the data
-            df = pd.concat([non_fraud_data, fraud_data], ignore_index=True)
-
-            # === Step 5: First-Time Applicants Flag & Credit Score Adjustment ===
-            df['first_time_applicant'] = ((df['work_experience'] == 0) & (df['existing_loans'] == 0)).astype(int)
-            df.loc[df['first_time_applicant'] == 1, 'credit_score'] = -1
-
-            # === Step 6: Further Missing Value Imputation ===
-            df['savings_balance'].fillna(df['savings_balance'].median(), inplace=True)
-            df['avg_monthly_expenses'].fillna(df['avg_monthly_expenses'].median(), inplace=True)
-            df['credit_score'].fillna(df['credit_score'].median(), inplace=True)
-            df['urban_rural'].fillna(df['urban_rural'].mode()[0], inplace=True)
-            df['family_dependents'].fillna(df['family_dependents'].mode()[0], inplace=True)
-            df['education_level'].fillna(df['education_level'].mode()[0], inplace=True)
-
-            # === Step 7: Process Platform Ratings ===
-            # Split the 'platform_ratings' string into key-value pairs
-            platform_ratings = df['platform_ratings'].str.split('; ', expand=True)
-            platform_ratings_dict = platform_ratings.applymap(lambda x: dict([x.split(':')]) if pd.notna(x) else {})
-            # Function to calculate average rating from a dictionary
-            def calculate_avg(ratings):
-                if isinstance(ratings, dict) and len(ratings) > 0:
-                    return sum(map(float, ratings.values())) / len(ratings)
-                return None
-            platform_ratings_dict['avg_platform_rating'] = platform_ratings_dict[[0,1,2]].applymap(calculate_avg).mean(axis=1)
-            platform_ratings_dict.drop([0,1,2], axis=1, inplace=True)
-            df = pd.concat([df, platform_ratings_dict], axis=1)
-
-            # === Step 8: Drop Unnecessary Columns ===
-            df.drop(columns=['first_time_applicant', 'fraud_flag', 'applicant_id', 'gig_platforms', 'platform_ratings', 'location'], inplace=True)
-
-            # === Step 9: Encode Categorical Variables 
-            df['education_level'] = df['education_level'].map({'High School': 0, 'Graduate': 1, 'Postgraduate': 2})
-            df['urban_rural'] = df['urban_rural'].map({'Urban': 1, 'Rural': 0})
-            df['alternative_income_source'] = df['alternative_income_source'].map({'Yes': 1, 'No': 0})
-            df['loan_coapplicant'] = df['loan_coapplicant'].map({'Yes': 1, 'No': 0})
-            df['education_level'] = df['education_level'].astype('int')
-            df['alternative_income_source'] = df['alternative_income_source'].astype('int')
-            df['loan_coapplicant'] = df['loan_coapplicant'].astype('int')
-            df['urban_rural'] = df['urban_rural'].astype('int')
-            df['family_dependents'] = df['family_dependents'].astype('int')
-
-            # === Step 11: Log-Transform Skewed Numerical Features ===
-            df['savings_balance'] = np.log1p(df['savings_balance'])
-            df['existing_loans'] = np.log1p(df['existing_loans'])
-            df['loan_amount_requested'] = np.log1p(df['loan_amount_requested'])
-            df['penalties'] = np.log1p(df['penalties'])
-            df['num_platforms'] = np.log1p(df['num_platforms'])
-            df['loan_coapplicant'] = np.log1p(df['loan_coapplicant'])
-
-            # === Step 12: Split Features and Target ===
-            X = df.drop('loan_approved', axis=1)
-            y = df['loan_approved']
-
+            X = plan.transform_frame(df)
+            # Suspected fraud (no experience, no reported income) is always rejected
+            y = plan.target(df)
             logger.info("Data preprocessing complete for this subset.")
             return X, y
 
         except Exception as e:
             logger.error("Error in data preprocessing")
             raise CustomException(e, sys)
-        
+
+    def _builder_params(self) -> dict:
+        return {
+            'platform_features': self.config.platform_features,
+            'sketch_k': self.config.sketch_k,
+            'sample_rows': self.config.power_transform_sample_rows,
+            'quantile_sketch': self.config.quantile_sketch
+        }
+
+    def _save_plan(self, builder: TransformPlanBuilder) -> TransformPlan:
+        """Finalize a sketched plan and save it with the sketch state it was built from."""
+        plan = builder.finalize()
+        plan_path = os.path.join(self.config.root_dir, self.config.plan_name)
+        plan.save(plan_path)
+        builder.save(os.path.join(self.config.root_dir, self.config.plan_sketches_name))
+        logger.info(f"Saved transform plan sketched from {builder.rows} rows at {plan_path}")
+        return plan
+
+    def _rebalance(self, X: pd.DataFrame, y: pd.Series, stats_path: str):
+        """Rebalance the training set and record the cost at stats_path."""
+        rows_in = len(X)
+        with PeakMemorySampler() as memory:
+            X, y = rebalance(X, y, self.config.rebalance, subset_rows=self.config.smote_subset_rows,
+                             k_neighbors=self.config.smote_k_neighbors)
+        stats = {
+            "rebalance_method": self.config.rebalance,
+            "rebalance_seconds": memory.seconds,
+            "rebalance_rss_increase_mb": memory.increase_mb,
+            "rebalance_rows_in": rows_in,
+            "rebalance_rows_out": len(X)
+        }
+        logger.info(f"Rebalanced with {self.config.rebalance}: {rows_in} -> {len(X)} rows in {memory.seconds:.2f}s")
+        with open(stats_path, "w") as f:
+            json.dump(stats, f, indent=4)
+        return X, y
+
     def preprocess_train(self, df: pd.DataFrame, apply_smote: bool = True):
         """
         Preprocess training data.
-        Fits the PowerTransformer on the training set.
+        Fits the transform plan (imputation statistics, encodings and the
+        credit_score PowerTransformer) on the training set and saves it.
+        With imputation_statistics: sketch the statistics come from mergeable
+        sketches built over chunks of the set, as in streaming mode.
         :param df: Training DataFrame.
-        :param apply_smote: Whether to apply SMOTE oversampling (recommended only on training data).
-        :return: Tuple (X_train, y_train, fitted PowerTransformer)
+        :param apply_smote: Whether to rebalance the classes with the configured rebalance method
+            (recommended only on training data).
+        :return: Tuple (X_train, y_train, fitted TransformPlan)
         """
         logger.info("Preprocessing training data...")
-        X, y = self._base_preprocessing(df)
-        # Fit PowerTransformer on 'credit_score'
-        pt = PowerTransformer(method='yeo-johnson')
-        X['credit_score'] = pt.fit_transform(X[['credit_score']])
-        transformer_path = os.path.join(self.config.root_dir, self.config.transformer_name)
-        os.makedirs(os.path.dirname(transformer_path), exist_ok=True)
-        joblib.dump(pt, transformer_path)
-        logger.info("Saved PowerTransformer")
+        if self.config.imputation_statistics == "sketch":
+            builder = TransformPlanBuilder.from_frame(df, chunk_rows=self.config.stream_chunk_rows,
+                                                      n_workers=self.config.sketch_workers, **self._builder_params())
+            plan = self._save_plan(builder)
+        else:
+            plan = TransformPlan.fit(df, platform_features=self.config.platform_features)
+            plan_path = os.path.join(self.config.root_dir, self.config.plan_name)
+            plan.save(plan_path)
+            logger.info(f"Saved transform plan at {plan_path}")
+        X, y = self._base_preprocessing(df, plan)
+        stats_path = os.path.join(self.config.root_dir, self.config.rebalance_stats_name)
         if apply_smote:
-            smote = SMOTE(random_state=42)
-            X, y = smote.fit_resample(X, y)
+            X, y = self._rebalance(X, y, stats_path)
+        elif os.path.exists(stats_path):
+            os.remove(stats_path)
         logger.info("Training data preprocessing complete.")
-        return X, y, pt
+        return X, y, plan
 
-    def preprocess_test(self, df: pd.DataFrame, pt: PowerTransformer):
+    def preprocess_test(self, df: pd.DataFrame, plan: TransformPlan):
         """
-        Preprocess test data using a fitted PowerTransformer.
+        Preprocess test data using the plan fitted on the training set.
         :param df: Test DataFrame.
-        :param pt: Fitted PowerTransformer from the training set.
+        :param plan: Fitted TransformPlan from the training set.
         :return: Tuple (X_test, y_test)
         """
         logger.info("Preprocessing test data...")
-        X, y = self._base_preprocessing(df)
-        X['credit_score'] = pt.transform(X[['credit_score']])
+        X, y = self._base_preprocessing(df, plan)
         logger.info("Test data preprocessing complete.")
         return X, y
 
     def preprocess_pipeline(self, df: pd.DataFrame, apply_smote: bool = True):
         """
         Complete preprocessing pipeline: split data, preprocess train and test sets.
-        :param df: Full dataset.
-        :param apply_smote: Whether to apply SMOTE on training data.
-        :return: Tuple (X_train, y_train, X_test, y_test)
+        :param df: Path of the raw data artifact.
+        :param apply_smote: Whether to rebalance the training data.
+        :return: Tuple (X_train, y_train, X_test, y_test, train_rows). The first train_rows rows
+            of X_train/y_train are the real training rows; rebalancing appends its rows after them.
         """
         logger.info("Running complete preprocessing pipeline...")
-        df = pd.read_csv(df)
+        df = load_frame(df, self.config.artifact_format, columns=SPLIT_COLUMNS)
         train_df, test_df = self.split_data(df)
-        X_train, y_train, pt = self.preprocess_train(train_df, apply_smote)
-        X_test, y_test = self.preprocess_test(test_df, pt)
+        X_train, y_train, plan = self.preprocess_train(train_df, apply_smote)
+        X_test, y_test = self.preprocess_test(test_df, plan)
         logger.info("Preprocessing pipeline complete.")
-        return X_train, y_train, X_test, y_test
-  
-    def prediction_preprocess(self, df: pd.DataFrame):
-                    try:
-                        logger.info("Running prediction preprocessing pipeline...")
-                        REASONS_FOR_LOAN = ['Debt Consolidation', 'Education', 'Home Renovation', 'Medical Emergency', 'Other', 'Vehicle Purchase']
-              
-                        # === Step 2: One-Hot Encoding for 'Reason for Loan' ===
-                        selected_reason = df['reason_for_loan'].iloc[0]
-                        for reason in REASONS_FOR_LOAN:
-                            df[f'reason_for_loan_{reason}'] = 1 if reason == selected_reason else 0
-
-
-                        # === Step 3: Handle Platform Ratings ===
-                        def calculate_average_platform_rating(rating_str: str) -> float:
-                            """
-                            Parses a platform ratings string and returns the average rating.
-                            Example input: "Zomato:4.7; Swiggy:3.3"
-                            """
-                            try:
-                                # Split the string by semicolon and strip whitespace
-                                items = [item.strip() for item in rating_str.split(';') if item.strip()]
-                                ratings = []
-                                for item in items:
-                                    # Split each item into platform and score
-                                    parts = item.split(':')
-                                    if len(parts) == 2:
-                                        try:
-                                            ratings.append(float(parts[1].strip()))
-                                        except ValueError:
-                                            continue
-                                # Return the average rating if ratings exist, otherwise 0
-                                return np.mean(ratings) if ratings else 0.0
-                            except Exception as e:
-                                # In case of any error, log and return 0.0
-                                logger.info(f"Error parsing platform ratings: {e}")
-                                return 0.0
-                            
-                        # === Step 4: Encode Categorical Variables ===
-                        df['education_level'] = df['education_level'].map({'High School': 0, 'Graduate': 1, 'Postgraduate': 2}).astype(int)
-                        df['urban_rural'] = df['urban_rural'].map({'Urban': 1, 'Rural': 0}).astype(int)
-                        df['alternative_income_source'] = df['alternative_income_source'].map({'Yes': 1, 'No': 0}).astype(int)
-                        df['loan_coapplicant'] = df['loan_coapplicant'].map({'Yes': 1, 'No': 0}).astype(int)
-
-                        # === Step 5: Log-Transform Skewed Numerical Features ===
-                        for col in ['savings_balance', 'existing_loans', 'loan_amount_requested', 'penalties', 'num_platforms']:
-                            if col in df.columns:
-                                df[col] = np.log1p(df[col])
-                        
-                        transformer_path = os.path.join(self.config.root_dir, self.config.transformer_name)
-                        if os.path.exists(transformer_path):
-                            pt = joblib.load(transformer_path)
-                            logger.info("Loaded PowerTransformer")
-                            df['credit_score'] = pt.transform(df[['credit_score']])
-                        else:
-                            raise CustomException("PowerTransformer not found at " + transformer_path, sys)
-                        
-                        df['avg_platform_rating'] = df['platform_ratings'].apply(calculate_average_platform_rating)
-
-                        # Drop column 
-                        df.drop(columns=['reason_for_loan','platform_ratings'], inplace=True)
-                        logger.info("Preprocessing Preprocessing pipeline complete.")
-                        return df
-                    
-                    except Exception as e:
-                        logger.error("Error in data preprocessing")
-                        raise CustomException(e, sys)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        return X_train, y_train, X_test, y_test, len(train_df)
 
+    def preprocess_stream(self, raw_data_file) -> dict:
+        """
+        Streaming counterpart of preprocess_pipeline for raw data larger than memory.
+        One pass over the raw artifact in chunks of stream_chunk_rows: each chunk is split
+        by applicant_id hash, written out as train/test parts, and its training rows are
+        folded into a TransformPlanBuilder. Only one chunk and the sketches are in memory.
+        :param raw_data_file: Path of the raw data artifact.
+        :return: Summary of the split; the model stages read the splits with iter_batches.
+        """
+        try:
+            logger.info(f"Streaming preprocessing of {raw_data_file} in chunks of {self.config.stream_chunk_rows} rows...")
+            builder = TransformPlanBuilder(**self._builder_params())
+            # Chunks are rebalanced one by one while the model is built; no whole-set stats to report
+            stats_path = os.path.join(self.config.root_dir, self.config.rebalance_stats_name)
+            if os.path.exists(stats_path):
+                os.remove(stats_path)
+            part_dir = os.path.join(os.path.dirname(self.config.train_data_file), "parts")
+            os.makedirs(part_dir, exist_ok=True)
+            parts = {"train": [], "test": []}
+            rows = {"train": 0, "test": 0}
+            n_chunks = 0
+            chunks = iter_frames(raw_data_file, self.config.artifact_format, self.config.stream_chunk_rows,
+                                 columns=['applicant_id'] + SPLIT_COLUMNS)
+            for chunk in chunks:
+                is_test = test_split_mask(chunk['applicant_id'], self.config.test_fraction)
+                chunk = chunk[SPLIT_COLUMNS]
+                for split, subset in (("train", chunk[~is_test]), ("test", chunk[is_test])):
+                    if subset.empty:
+                        continue
+                    part_path = os.path.join(part_dir, f"{split}_{n_chunks:05d}.{self.config.artifact_format}")
+                    save_frame(subset, part_path, self.config.artifact_format)
+                    parts[split].append(part_path)
+                    rows[split] += len(subset)
+                builder.update(chunk[~is_test])
+                n_chunks += 1
+
+            concat_artifacts(parts["train"], self.config.train_data_file, self.config.artifact_format)
+            concat_artifacts(parts["test"], self.config.test_data_file, self.config.artifact_format)
+            shutil.rmtree(part_dir)
+
+            self._save_plan(builder)
+            logger.info(f"Split {rows['train']} train / {rows['test']} test rows from {n_chunks} chunks")
+            return {"streaming": True, "train_rows": rows["train"], "test_rows": rows["test"], "n_chunks": n_chunks}
 
+        except Exception as e:
+            logger.error("Error in streaming data preprocessing")
+            raise CustomException(e, sys)
 
+    def iter_batches(self, path, plan: TransformPlan = None, apply_smote: bool = False):
+        """
+        Yield (X, y) for each chunk of a split written by preprocess_stream.
+        :param path: train_data_file or test_data_file.
+        :param plan: Fitted TransformPlan; loaded from disk when not supplied.
+        :param apply_smote: Rebalance the classes within each chunk (training batches only).
+        """
+        if plan is None:
+            plan = self.load_plan()
+        for chunk in iter_frames(path, self.config.artifact_format, self.config.stream_chunk_rows,
+                                 columns=SPLIT_COLUMNS):
+            X, y = self._base_preprocessing(chunk, plan)
+            # SMOTE needs more minority rows than neighbours; smaller chunks pass through as they are
+            if apply_smote and y.nunique() == 2 and y.value_counts().min() > self.config.smote_k_neighbors:
+                X, y = rebalance(X, y, self.config.rebalance, subset_rows=self.config.smote_subset_rows,
+                                 k_neighbors=self.config.smote_k_neighbors)
+            yield X, y
+
+    def load_plan(self) -> TransformPlan:
+        """Load the transform plan saved by the last training run."""
+        plan_path = os.path.join(self.config.root_dir, self.config.plan_name)
+        if not os.path.exists(plan_path):
+            raise FileNotFoundError("Transform plan not found at " + plan_path)
+        return TransformPlan.load(plan_path)
+
+    def prediction_preprocess(self, df: pd.DataFrame, plan: TransformPlan = None, timings: dict = None):
+        """
+        Preprocess raw applicant rows for scoring. Works on any number of rows at once.
+        :param df: Raw applicant DataFrame (one row per applicant).
+        :param plan: Fitted TransformPlan; loaded from disk when not supplied.
+        :param timings: Per-step seconds are added to this dict when given (see TransformPlan.transform).
+        :return: Feature DataFrame in the column order used for training.
+        :raises InvalidInputError: When the rows hold values the plan cannot transform.
+        """
+        try:
+            logger.info(f"Running prediction preprocessing pipeline on {len(df)} rows...")
+            if plan is None:
+                plan = self.load_plan()
+            try:
+                return plan.transform_frame(df, timings)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Invalid input rows: {e}")
+                raise InvalidInputError(str(e)) from e
+
+        except InvalidInputError:
+            raise
+        except Exception as e:
+            logger.error("Error in data preprocessing")
+            raise CustomException(e, sys)
@@ -1,45 +1,286 @@
 import json
 import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-import evidently
-from evidently.report import Report
-from evidently.metric_preset import DataDriftPreset
+import pyarrow as pa
+from scipy import stats
 from prometheus_client import Gauge
 from src.utils.logger import logger
 from src.utils.exception import CustomException
+from src.utils.serving_metrics import GAUGE_MULTIPROCESS_MODE
+
+# Text-like columns with more distinct values than this are not compared
+MAX_CATEGORIES = 50
+
+
+def _float_values(values: pd.Series) -> np.ndarray:
+    """Column values as floats with NaN for missing; float columns are not copied."""
+    if values.dtype.kind == 'f':
+        return values.to_numpy()
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _numeric_histogram(reference: np.ndarray, current: np.ndarray, n_bins: int):
+    """
+    Histograms of one numeric column on n_bins equal-width bins spanning both samples.
+    NaNs are left out; both samples must have values. A constant column puts everything in the first bin.
+    :return: (reference counts, current counts, bin width).
+    """
+    low = min(np.nanmin(reference), np.nanmin(current))
+    high = max(np.nanmax(reference), np.nanmax(current))
+    width = (float(high) - float(low)) / n_bins if high > low else 1.0
+
+    def counts(values):
+        bins = ((values[~np.isnan(values)] - low) / width).astype(np.int64)
+        return np.bincount(np.minimum(bins, n_bins - 1), minlength=n_bins)
+
+    return counts(reference), counts(current), width
+
+
+def _category_counts(reference: pd.Series, current: pd.Series):
+    """Counts of each level (union of both samples) in the reference and the current sample."""
+    ref_counts = reference.value_counts(dropna=True, sort=False)
+    cur_counts = current.value_counts(dropna=True, sort=False)
+    ref_counts.index, cur_counts.index = ref_counts.index.astype(str), cur_counts.index.astype(str)
+    levels = ref_counts.index.union(cur_counts.index)
+    return (ref_counts.groupby(level=0).sum().reindex(levels, fill_value=0).to_numpy(),
+            cur_counts.groupby(level=0).sum().reindex(levels, fill_value=0).to_numpy())
+
+
+def _psi(ref_share: np.ndarray, cur_share: np.ndarray, epsilon: float = 1e-4) -> np.ndarray:
+    """Population stability index along the last axis."""
+    ref_share, cur_share = np.maximum(ref_share, epsilon), np.maximum(cur_share, epsilon)
+    return np.sum((cur_share - ref_share) * np.log(cur_share / ref_share), axis=-1)
+
+
+def _drift_columns(reference: pd.DataFrame, current: pd.DataFrame, columns: list, reference_rows: int,
+                   n_bins: int = 1000, psi_bins: int = 10, small_sample_rows: int = 1000,
+                   p_value_threshold: float = 0.05, wasserstein_threshold: float = 0.1,
+                   psi_threshold: float = 0.2):
+    """
+    Drift of each of `columns` (present in both frames), independently of any other column.
+    :param reference_rows: Rows of the whole reference, which picks the stattest.
+    :return: (drift_by_columns, skipped column names).
+    """
+    # Columns without a single value on either side cannot be compared
+    skipped = [col for col in columns if reference[col].isna().all() or current[col].isna().all()]
+    compared = [col for col in columns if col not in skipped]
+    numeric = [col for col in compared if pd.api.types.is_numeric_dtype(reference[col])]
+    small = reference_rows <= small_sample_rows
+    drift_by_columns = {}
+
+    if numeric:
+        histograms, std = [], []
+        for col in numeric:
+            ref_values = _float_values(reference[col])
+            histograms.append(_numeric_histogram(ref_values, _float_values(current[col]), n_bins))
+            std.append(np.nanstd(ref_values, dtype=np.float64))
+        std = np.array(std)
+        ref_counts = np.stack([h[0] for h in histograms])
+        cur_counts = np.stack([h[1] for h in histograms])
+        width = np.array([h[2] for h in histograms])
+        n_ref, n_cur = ref_counts.sum(axis=1), cur_counts.sum(axis=1)
+        ref_cdf = np.cumsum(ref_counts, axis=1) / np.maximum(n_ref, 1)[:, None]
+        cur_cdf = np.cumsum(cur_counts, axis=1) / np.maximum(n_cur, 1)[:, None]
+
+        ks = np.abs(ref_cdf - cur_cdf).max(axis=1)
+        ks_pvalue = stats.kstwobign.sf(ks * np.sqrt(n_ref * n_cur / np.maximum(n_ref + n_cur, 1)))
+        wasserstein = np.abs(ref_cdf - cur_cdf).sum(axis=1) * width / np.where(std > 0, std, 1.0)
+
+        # PSI on psi_bins groups of the fine bins, cut at reference deciles
+        cuts = np.linspace(0, 1, psi_bins + 1)[1:-1]
+        groups = np.stack([np.searchsorted(cdf, cuts, side='left') for cdf in ref_cdf])
+        ref_cum = np.take_along_axis(np.cumsum(ref_counts, axis=1), groups, axis=1)
+        cur_cum = np.take_along_axis(np.cumsum(cur_counts, axis=1), groups, axis=1)
+        ref_share = np.diff(np.c_[np.zeros(len(numeric)), ref_cum, n_ref], axis=1) / np.maximum(n_ref, 1)[:, None]
+        cur_share = np.diff(np.c_[np.zeros(len(numeric)), cur_cum, n_cur], axis=1) / np.maximum(n_cur, 1)[:, None]
+        psi = _psi(ref_share, cur_share)
+
+        for i, col in enumerate(numeric):
+            score, threshold, test = ((ks_pvalue[i], p_value_threshold, 'ks') if small
+                                      else (wasserstein[i], wasserstein_threshold, 'wasserstein'))
+            drift_by_columns[col] = {
+                'column_type': 'num', 'stattest': test, 'drift_score': float(score), 'threshold': threshold,
+                'drift_detected': bool(score < threshold if test == 'ks' else score >= threshold),
+                'wasserstein': float(wasserstein[i]), 'ks': float(ks[i]), 'ks_pvalue': float(ks_pvalue[i]),
+                'psi': float(psi[i])
+            }
+
+    for col in compared:
+        if col in numeric:
+            continue
+        ref_counts, cur_counts = _category_counts(reference[col], current[col])
+        if len(ref_counts) > MAX_CATEGORIES:
+            skipped.append(col)
+            continue
+        n_ref, n_cur = ref_counts.sum(), cur_counts.sum()
+        table = np.vstack([ref_counts, cur_counts])
+        table = table[:, table.sum(axis=0) > 0]
+        expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / max(table.sum(), 1)
+        chi2 = float(np.sum((table - expected) ** 2 / np.where(expected > 0, expected, 1)))
+        chi2_pvalue = float(stats.chi2.sf(chi2, max(table.shape[1] - 1, 1)))
+        psi = float(_psi(ref_counts / max(n_ref, 1), cur_counts / max(n_cur, 1)))
+        score, threshold, test = (chi2_pvalue, p_value_threshold, 'chisquare') if small else (psi, psi_threshold, 'psi')
+        drift_by_columns[col] = {
+            'column_type': 'cat', 'stattest': test, 'drift_score': score, 'threshold': threshold,
+            'drift_detected': bool(score < threshold if test == 'chisquare' else score >= threshold),
+            'chisquare_pvalue': chi2_pvalue, 'psi': psi
+        }
+
+    # Report columns in frame order, whichever type they are
+    drift_by_columns = {col: drift_by_columns[col] for col in columns if col in drift_by_columns}
+    return drift_by_columns, [col for col in columns if col in skipped]
+
+
+def _drift_group(task):
+    """
+    Process-pool worker of native_drift: memory-maps the two Arrow files written by the
+    parent and computes the drift of its column group.
+    """
+    reference_path, current_path, columns, reference_rows, params = task
+    frames = []
+    for path in (reference_path, current_path):
+        with pa.memory_map(path, 'r') as source:
+            frames.append(pa.ipc.open_file(source).read_all().select(columns).to_pandas())
+    return _drift_columns(frames[0], frames[1], columns, reference_rows, **params)
+
+
+def _column_groups(columns: list, numeric: set, n_groups: int) -> list:
+    """Split columns into n_groups groups with a similar mix of numeric and categorical columns."""
+    ordered = [col for col in columns if col in numeric] + [col for col in columns if col not in numeric]
+    groups = [ordered[i::n_groups] for i in range(n_groups)]
+    return [group for group in groups if group]
+
+
+def native_drift(reference: pd.DataFrame, current: pd.DataFrame, n_bins: int = 1000, psi_bins: int = 10,
+                 small_sample_rows: int = 1000, p_value_threshold: float = 0.05,
+                 wasserstein_threshold: float = 0.1, psi_threshold: float = 0.2,
+                 drift_share_threshold: float = 0.5, n_workers: int = 1, shared_dir: str = None) -> dict:
+    """
+    Per-column drift of `current` against `reference` from fine histograms, one pass over each
+    column and the statistics of all numeric columns of a group computed together. Numeric
+    columns get the normed Wasserstein distance, KS statistic and p-value, and PSI; categorical
+    columns get the chi-square p-value and PSI. As in Evidently's defaults, small references
+    (up to small_sample_rows) are judged by the p-values and larger ones by Wasserstein
+    (numeric) or PSI (categorical).
+    With n_workers > 1 the columns are split into groups computed on a process pool. Both
+    frames are written once as Arrow IPC files in a scratch directory under shared_dir
+    (system temp when None), which the workers memory-map, reading only their columns,
+    instead of receiving pickled DataFrames.
+    :return: Compact report with one summary entry per column.
+    """
+    columns = [col for col in reference.columns if col in current.columns]
+    params = {'n_bins': n_bins, 'psi_bins': psi_bins, 'small_sample_rows': small_sample_rows,
+              'p_value_threshold': p_value_threshold, 'wasserstein_threshold': wasserstein_threshold,
+              'psi_threshold': psi_threshold}
+    if n_workers > 1 and len(columns) > 1:
+        numeric = {col for col in columns if pd.api.types.is_numeric_dtype(reference[col])}
+        groups = _column_groups(columns, numeric, min(n_workers, len(columns)))
+        with tempfile.TemporaryDirectory(prefix="drift-", dir=shared_dir) as scratch:
+            paths = []
+            for name, frame in (("reference", reference), ("current", current)):
+                path = os.path.join(scratch, f"{name}.arrow")
+                table = pa.Table.from_pandas(frame[columns], preserve_index=False)
+                with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                paths.append(path)
+                del table
+            tasks = [(paths[0], paths[1], group, len(reference), params) for group in groups]
+            with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+                partials = list(executor.map(_drift_group, tasks))
+        # Merge back into frame column order, as a single process reports them
+        merged = {col: result for partial in partials for col, result in partial[0].items()}
+        drift_by_columns = {col: merged[col] for col in columns if col in merged}
+        skipped = [col for col in columns if any(col in partial[1] for partial in partials)]
+    else:
+        drift_by_columns, skipped = _drift_columns(reference, current, columns, len(reference), **params)
+
+    drifted = sum(column['drift_detected'] for column in drift_by_columns.values())
+    share = drifted / max(len(drift_by_columns), 1)
+    return {
+        'engine': 'native',
+        'reference_rows': len(reference),
+        'current_rows': len(current),
+        'number_of_columns': len(drift_by_columns),
+        'number_of_drifted_columns': drifted,
+        'share_of_drifted_columns': share,
+        'dataset_drift': bool(share >= drift_share_threshold),
+        'skipped_columns': skipped,
+        'drift_by_columns': drift_by_columns
+    }
+
+
+def evidently_drift(reference: pd.DataFrame, current: pd.DataFrame) -> dict:
+    """Full Evidently DataDriftPreset report (optional dependency)."""
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
+    report = Report(metrics=[DataDriftPreset()])
+    report.run(reference_data=reference, current_data=current)
+    return report.as_dict()
+
 
 class DriftDetection:
     def __init__(self, config):
         self.config = config
 
-    def run_drift_detection(self, ref_data: pd.DataFrame, current_data: pd.DataFrame) -> pd.DataFrame:
+    def run_drift_detection(self, ref_data: pd.DataFrame, current_data: pd.DataFrame) -> dict:
+        """
+        Compare current_data with ref_data using the configured engine and save the report.
+        :return: The compact native report, or Evidently's full report with engine: evidently.
+        """
         try:
-            report = Report(metrics=[DataDriftPreset()])
-            report.run(reference_data=ref_data, current_data=current_data)
-            drift_report = report.as_dict()
-            
-            # Save the drift report to artifacts/drift/drift_report.json
+            if self.config.engine == "evidently":
+                drift_report = evidently_drift(ref_data, current_data)
+            else:
+                drift_report = native_drift(
+                    ref_data, current_data,
+                    n_bins=self.config.hist_bins,
+                    psi_bins=self.config.profile_bins,
+                    small_sample_rows=self.config.small_sample_rows,
+                    p_value_threshold=self.config.p_value_threshold,
+                    wasserstein_threshold=self.config.wasserstein_threshold,
+                    psi_threshold=self.config.psi_threshold,
+                    drift_share_threshold=self.config.drift_share_threshold,
+                    n_workers=self.config.n_workers,
+                    shared_dir=self.config.shared_dir
+                )
+
+            # Save the drift report to artifacts/drift/drift_report.json; readers never see a partial file
             drift_report_path = os.path.join(self.config.drift_dir, self.config.drift_name)
             os.makedirs(os.path.dirname(drift_report_path), exist_ok=True)
-            with open(drift_report_path, "w") as f:
+            with open(drift_report_path + ".tmp", "w") as f:
                 json.dump(drift_report, f, indent=4)
+            os.replace(drift_report_path + ".tmp", drift_report_path)
             logger.info(f"Drift report saved at {drift_report_path}")
             return drift_report
         except Exception as e:
             logger.error("Error in drift detection: " + str(e))
-            raise CustomException(e)
+            raise CustomException(e, sys)
         
     def update_drift_metrics(self, registry, drift_gauge, drift_gauges: dict):
         """
-        Update Prometheus drift gauges using values from drift_report.
+        Update Prometheus drift gauges using values from the saved drift report.
         """
         drift_report_path = os.path.join(self.config.drift_dir, self.config.drift_name)
-        if os.path.exists(drift_report_path):
-            with open(drift_report_path, "r") as f:
-                drift_report = json.load(f)
-        
+        if not os.path.exists(drift_report_path):
+            return
+        with open(drift_report_path, "r") as f:
+            drift_report = json.load(f)
+        self.publish_drift_metrics(drift_report, registry, drift_gauge, drift_gauges)
+
+    def publish_drift_metrics(self, drift_report: dict, registry, drift_gauge, drift_gauges: dict):
+        """
+        Update Prometheus drift gauges using values from drift_report (native or Evidently format).
+        """
+        # Native engine report
+        if "drift_by_columns" in drift_report:
+            self._set_column_gauges(registry, drift_gauge, drift_gauges, drift_report["share_of_drifted_columns"],
+                                    drift_report["drift_by_columns"])
         # Process the list of metrics if it exists
-        if "metrics" in drift_report:
+        elif "metrics" in drift_report:
             for item in drift_report["metrics"]:
                 metric_name = item.get("metric", "").strip()
                 result = item.get("result", {})
@@ -56,7 +297,8 @@ class DriftDetection:
                             drift_gauges["share_of_drifted_columns"] = Gauge(
                                 "share_of_drifted_columns",
                                 "Share of drifted columns",
-                                registry=registry
+                                registry=registry,
+                                multiprocess_mode=GAUGE_MULTIPROCESS_MODE
                             )
                         drift_gauges["share_of_drifted_columns"].set(share)
                     # Process per-column drift details
@@ -68,7 +310,8 @@ class DriftDetection:
                             drift_gauges[gauge_name] = Gauge(
                                 gauge_name,
                                 f"Drift score for {column}",
-                                registry=registry
+                                registry=registry,
+                                multiprocess_mode=GAUGE_MULTIPROCESS_MODE
                             )
                         drift_gauges[gauge_name].set(details.get("drift_score", 0))
                         
@@ -81,7 +324,8 @@ class DriftDetection:
                             drift_gauges[label] = Gauge(
                                 label,
                                 f"Drift metric for {label}",
-                                registry=registry
+                                registry=registry,
+                                multiprocess_mode=GAUGE_MULTIPROCESS_MODE
                             )
                         drift_gauges[label].set(sub_value)
                 else:
@@ -89,6 +333,30 @@ class DriftDetection:
                         drift_gauges[metric] = Gauge(
                             metric,
                             f"Drift metric for {metric}",
-                            registry=registry
+                            registry=registry,
+                            multiprocess_mode=GAUGE_MULTIPROCESS_MODE
                         )
                     drift_gauges[metric].set(value)
+
+    @staticmethod
+    def _set_column_gauges(registry, drift_gauge, drift_gauges: dict, share: float, drift_by_columns: dict):
+        """Same gauges as for an Evidently report: overall share and drift_score per column."""
+        drift_gauge.labels(metric="overall").set(share)
+        if "share_of_drifted_columns" not in drift_gauges:
+            drift_gauges["share_of_drifted_columns"] = Gauge(
+                "share_of_drifted_columns",
+                "Share of drifted columns",
+                registry=registry,
+                multiprocess_mode=GAUGE_MULTIPROCESS_MODE
+            )
+        drift_gauges["share_of_drifted_columns"].set(share)
+        for column, details in drift_by_columns.items():
+            gauge_name = f"drift_score_{column}"
+            if gauge_name not in drift_gauges:
+                drift_gauges[gauge_name] = Gauge(
+                    gauge_name,
+                    f"Drift score for {column}",
+                    registry=registry,
+                    multiprocess_mode=GAUGE_MULTIPROCESS_MODE
+                )
+            drift_gauges[gauge_name].set(details.get("drift_score", 0))
@@ -0,0 +1,269 @@
+import glob
+import json
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import psutil
+from src.constants import PREDICTION_INPUT_SCHEMA, RAW_DATA_DTYPES
+from src.utils.common import iter_frames
+from src.utils.sketches import KLLSketch
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+# Request fields monitored for drift; platform_ratings is free text
+DRIFT_COLUMNS = [col for col in PREDICTION_INPUT_SCHEMA if col != 'platform_ratings']
+# Floor for empty bins, so PSI stays finite
+PSI_EPSILON = 1e-4
+
+
+def psi(reference: np.ndarray, current: np.ndarray) -> float:
+    """Population stability index between two bin-proportion vectors."""
+    reference = np.maximum(reference, PSI_EPSILON)
+    current = np.maximum(current, PSI_EPSILON)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+class ReferenceProfile:
+    def __init__(self, numeric: dict, categorical: dict, rows: int):
+        """
+        Training-time distribution of each monitored column.
+        :param numeric: Per column: interior bin `edges` (reference quantiles), bin `proportions`
+            (one bin per gap, the two open ends, and a last bin for missing values) and the
+            column's KLL `sketch`.
+        :param categorical: Per column: `levels` and their `proportions`, with a last entry
+            for unseen levels and a missing-value entry after it.
+        :param rows: Reference row count.
+        """
+        self.numeric = numeric
+        self.categorical = categorical
+        self.rows = rows
+        self._edges = {col: np.asarray(spec['edges']) for col, spec in numeric.items()}
+        self._levels = {col: {level: i for i, level in enumerate(spec['levels'])} for col, spec in categorical.items()}
+
+    def bin_counts(self, df: pd.DataFrame) -> dict:
+        """Histogram of each monitored column of `df` on the reference bins."""
+        counts = {}
+        numeric_cols = list(self._edges)
+        try:
+            numeric = df[numeric_cols].to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            numeric = df[numeric_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        for j, (col, edges) in enumerate(self._edges.items()):
+            bins = np.searchsorted(edges, numeric[:, j], side='right')
+            bins[np.isnan(numeric[:, j])] = len(edges) + 1
+            counts[col] = np.bincount(bins, minlength=len(edges) + 2)
+
+        for col, levels in self._levels.items():
+            values = df[col]
+            missing = values.isna().to_numpy()
+            if len(values) <= 64:
+                # Dictionary lookups beat building a Categorical for the single rows of /predict
+                codes = np.fromiter((levels.get(str(value), len(levels)) for value in values),
+                                    dtype=np.int64, count=len(values))
+            else:
+                codes = pd.Categorical(values.astype(str), categories=list(levels)).codes.astype(np.int64)
+                codes[codes < 0] = len(levels)
+            codes[missing] = len(levels) + 1
+            counts[col] = np.bincount(codes, minlength=len(levels) + 2)
+        return counts
+
+    def proportions(self, col: str) -> np.ndarray:
+        spec = self.numeric.get(col) or self.categorical[col]
+        return np.asarray(spec['proportions'])
+
+    @classmethod
+    def from_file(cls, path, artifact_format: str, chunk_rows: int = 100_000, n_bins: int = 10,
+                  sketch_k: int = 200) -> "ReferenceProfile":
+        """
+        Profile a data artifact in two chunked passes: quantile sketches and category
+        levels first, then the histograms on the bins cut at the sketched quantiles.
+        """
+        numeric_cols = [col for col in DRIFT_COLUMNS if RAW_DATA_DTYPES[col] != 'category']
+        categorical_cols = [col for col in DRIFT_COLUMNS if RAW_DATA_DTYPES[col] == 'category']
+        sketches = {col: KLLSketch(sketch_k) for col in numeric_cols}
+        levels = {col: set() for col in categorical_cols}
+        for chunk in iter_frames(path, artifact_format, chunk_rows, columns=DRIFT_COLUMNS):
+            for col in numeric_cols:
+                sketches[col].update(chunk[col].to_numpy(dtype=float))
+            for col in categorical_cols:
+                levels[col].update(chunk[col].dropna().astype(str).unique())
+
+        numeric = {}
+        for col, sketch in sketches.items():
+            edges = np.unique([sketch.quantile(q) for q in np.linspace(0, 1, n_bins + 1)[1:-1]])
+            numeric[col] = {'edges': edges[~np.isnan(edges)].tolist(), 'sketch': sketch.to_dict()}
+        categorical = {col: {'levels': sorted(values)} for col, values in levels.items()}
+        profile = cls(numeric, categorical, 0)
+
+        totals = None
+        for chunk in iter_frames(path, artifact_format, chunk_rows, columns=DRIFT_COLUMNS):
+            counts = profile.bin_counts(chunk)
+            totals = counts if totals is None else {col: totals[col] + counts[col] for col in counts}
+            profile.rows += len(chunk)
+        for col, spec in {**numeric, **categorical}.items():
+            spec['proportions'] = (totals[col] / max(profile.rows, 1)).tolist()
+        return profile
+
+    def to_dict(self) -> dict:
+        return {'rows': self.rows, 'numeric': self.numeric, 'categorical': self.categorical}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReferenceProfile":
+        return cls(data['numeric'], data['categorical'], data['rows'])
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceProfile":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+
+class DriftMonitor:
+    def __init__(self, config, state_dir=None):
+        """
+        Running drift of scored traffic against the reference profile saved at training time.
+        Each scoring request adds its rows to per-column histograms on the reference bins;
+        snapshot() turns the counts into PSI per column without touching the data again.
+        :param config: DriftDetectionConfig.
+        :param state_dir: Directory the worker processes share their running counts through
+            (share()); None for a single process.
+        """
+        self.config = config
+        self.profile_path = os.path.join(config.drift_dir, config.profile_name)
+        self.share_dir = os.path.join(state_dir, "drift_monitor") if state_dir else None
+        self.profile = None
+        self.profile_mtime = None
+        self.counts = {}
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Load the reference profile if it is new or has changed, and restart the running
+        counts against it.
+        :return: True if a new profile was installed.
+        """
+        with self._lock:
+            if not os.path.exists(self.profile_path):
+                return False
+            mtime = os.path.getmtime(self.profile_path)
+            if mtime == self.profile_mtime:
+                return False
+            self.profile = ReferenceProfile.load(self.profile_path)
+            self.profile_mtime = mtime
+            self.counts = {col: np.zeros_like(self.profile.proportions(col), dtype=np.int64)
+                           for col in DRIFT_COLUMNS if col in self.profile.numeric or col in self.profile.categorical}
+            self.rows = 0
+            logger.info(f"Drift reference profile loaded from {self.profile_path}")
+            return True
+
+    def update(self, df: pd.DataFrame):
+        """Add scored rows to the running histograms; ignored until a profile exists."""
+        profile = self.profile
+        if profile is None:
+            return
+        counts = profile.bin_counts(df)
+        with self._lock:
+            # A refresh in between swapped the profile; these counts belong to the old bins
+            if profile is not self.profile:
+                return
+            for col, column_counts in counts.items():
+                self.counts[col] += column_counts
+            self.rows += len(df)
+
+    def share(self):
+        """Write this process's running counts to the shared directory, for snapshot() in the other workers."""
+        if self.share_dir is None or self.profile is None:
+            return
+        with self._lock:
+            data = {'profile_mtime': self.profile_mtime, 'rows': self.rows,
+                    'counts': {col: c.tolist() for col, c in self.counts.items()}}
+        os.makedirs(self.share_dir, exist_ok=True)
+        path = os.path.join(self.share_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+    def _shared_counts(self, profile_mtime):
+        """
+        Running counts last shared by the other live worker processes against the same profile.
+        gunicorn removes the file of a worker that exits (child_exit); files of processes that
+        are gone anyway (e.g. killed with the master) are skipped.
+        """
+        for path in glob.glob(os.path.join(self.share_dir, "*.json")):
+            pid = os.path.basename(path)[:-len(".json")]
+            if not pid.isdigit() or int(pid) == os.getpid() or not psutil.pid_exists(int(pid)):
+                continue
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data['profile_mtime'] == profile_mtime:
+                yield data
+
+    def snapshot(self) -> dict:
+        """
+        Current per-column PSI and the share of drifted columns. With a shared directory, the
+        counts the other workers last shared (at most one metrics collector interval old) are
+        added, so every worker reports on the traffic of all of them.
+        """
+        with self._lock:
+            profile, profile_mtime = self.profile, self.profile_mtime
+            counts, rows = {col: c.copy() for col, c in self.counts.items()}, self.rows
+        if profile is None:
+            raise FileNotFoundError(f"No drift reference profile at {self.profile_path}; run training first")
+        if self.share_dir is not None:
+            for shared in self._shared_counts(profile_mtime):
+                rows += shared['rows']
+                for col, column_counts in shared['counts'].items():
+                    if col in counts:
+                        counts[col] += np.asarray(column_counts, dtype=np.int64)
+
+        enough_rows = rows >= self.config.min_current_rows
+        columns = {}
+        for col, column_counts in counts.items():
+            current = column_counts / max(rows, 1)
+            score = psi(profile.proportions(col), current) if rows else 0.0
+            columns[col] = {
+                'type': 'numeric' if col in profile.numeric else 'categorical',
+                'psi': score,
+                'missing_share': float(current[-1]),
+                'drifted': bool(enough_rows and score >= self.config.psi_threshold)
+            }
+        drifted = sum(column['drifted'] for column in columns.values())
+        drift_share = drifted / max(len(columns), 1)
+        return {
+            'current_rows': rows,
+            'reference_rows': profile.rows,
+            'enough_rows': enough_rows,
+            'psi_threshold': self.config.psi_threshold,
+            'number_of_drifted_columns': drifted,
+            'drift_share': drift_share,
+            'dataset_drift': bool(enough_rows and drift_share >= self.config.drift_share_threshold),
+            'columns': columns
+        }
+
+
+class DriftProfiling:
+    def __init__(self, config):
+        self.config = config
+
+    def build_profile(self) -> ReferenceProfile:
+        """Profile the training split and save it as the drift reference."""
+        try:
+            profile = ReferenceProfile.from_file(self.config.train_data_file, self.config.artifact_format,
+                                                 n_bins=self.config.profile_bins)
+            profile_path = os.path.join(self.config.drift_dir, self.config.profile_name)
+            profile.save(profile_path)
+            logger.info(f"Drift reference profile of {profile.rows} rows saved at {profile_path}")
+            return profile
+        except Exception as e:
+            logger.error("Error building the drift reference profile")
+            raise CustomException(e, sys)
@@ -0,0 +1,171 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Rows walked together; keeps the (rows x trees) index arrays in cache
+DEFAULT_CHUNK_ROWS = 512
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, max_depth, classes,
+                 allow_missing: bool = False):
+        """
+        A fitted tree ensemble flattened into one node table.
+        Node i splits on feature[i] at threshold[i] and continues at left[i] or right[i];
+        leaves point at themselves with an infinite threshold, so every row can be
+        walked the same number of steps without masking. value holds each node's
+        normalised class distribution, as DecisionTreeClassifier.predict_proba reports it.
+        :param allow_missing: Whether rows with NaN are scored; when False they raise
+            ValueError, as the sklearn model they were compiled from does.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.allow_missing = allow_missing
+
+        # Traversal layout: children interleaved so one gather picks the branch, and float32
+        # thresholds rounded down so `x32 <= t32` decides exactly like sklearn's `x32 <= t64`
+        self._children = np.stack([left, right], axis=1).ravel().astype(np.int32)
+        threshold32 = threshold.astype(np.float32)
+        rounded_up = threshold32.astype(np.float64) > threshold
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+        self._threshold32 = threshold32
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """
+        Export a fitted RandomForestClassifier / ExtraTreesClassifier (or a single
+        DecisionTreeClassifier) into flat node arrays.
+        """
+        estimators = getattr(model, "estimators_", None) or [model]
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output classifiers can be compiled")
+
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n, dtype=np.int32)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+            go_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(np.zeros(n, dtype=bool) if go_left is None else go_left.astype(bool) & ~is_leaf)
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba, so results match bit for bit
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=int(max_depth),
+            classes=np.asarray(model.classes_),
+            allow_missing=cls._accepts_missing(model)
+        )
+
+    @staticmethod
+    def _accepts_missing(model) -> bool:
+        """Whether the sklearn model scores rows with NaN (its support depends on the estimator and version)."""
+        names = getattr(model, "feature_names_in_", None)
+        row = np.full((1, model.n_features_in_), np.nan)
+        probe = pd.DataFrame(row, columns=names) if names is not None else row
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                model.predict_proba(probe)
+        except ValueError:
+            return False
+        return True
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right,
+                                      self.missing_left, self.value, self.roots))
+
+    def _leaves(self, X) -> np.ndarray:
+        """Leaf reached by every row in every tree, as an (n_trees, n_rows) array."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        size = self.n_trees * n_rows
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int32) * n_features, self.n_trees)
+        node = np.repeat(self.roots, n_rows)
+        has_missing = np.isnan(flat).any()
+        if has_missing and not self.allow_missing:
+            raise ValueError("Input X contains NaN; the model does not accept missing values")
+
+        # One gather per array and level, into reused buffers; indices are in range by construction
+        index = np.empty(size, dtype=np.int32)
+        x = np.empty(size, dtype=np.float32)
+        threshold = np.empty(size, dtype=np.float32)
+        go_right = np.empty(size, dtype=bool)
+        for _ in range(self.max_depth):
+            np.take(self.feature, node, out=index, mode="clip")
+            index += row_offset
+            np.take(flat, index, out=x, mode="clip")
+            np.take(self._threshold32, node, out=threshold, mode="clip")
+            np.greater(x, threshold, out=go_right)
+            if has_missing:
+                # NaN compares False, i.e. goes left; send it right unless the split learnt otherwise
+                go_right |= np.isnan(x) & ~self.missing_left[node]
+            node *= 2
+            node += go_right
+            np.take(self._children, node, out=node, mode="clip")
+        return node.reshape(self.n_trees, n_rows)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf reached in every tree, numbered within its tree like sklearn's apply: (n_rows, n_trees)."""
+        return (self._leaves(X) - self.roots[:, np.newaxis]).T
+
+    def predict_proba(self, X, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        """Class probabilities averaged over the trees, identical to the sklearn forest's."""
+        X = np.asarray(X)
+        proba = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            # Summing over the leading tree axis adds tree by tree in estimator order,
+            # as the forest does, so the totals round identically
+            total = self.value[self._leaves(X[start:start + chunk_rows])].sum(axis=0)
+            total /= self.n_trees
+            proba[start:start + chunk_rows] = total
+        return proba
+
+    def predict(self, X, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X, chunk_rows), axis=1))
+
+    def save(self, path: str):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 missing_left=self.missing_left, value=self.value, roots=self.roots,
+                 max_depth=self.max_depth, classes=self.classes_, allow_missing=self.allow_missing)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            allow_missing = bool(data["allow_missing"]) if "allow_missing" in data.files else False
+            return cls(data["feature"], data["threshold"], data["left"], data["right"], data["missing_left"],
+                       data["value"], data["roots"], int(data["max_depth"]), data["classes"], allow_missing)
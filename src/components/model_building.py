@@ -1,35 +1,163 @@
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from src.utils.logger import logger
 from src.utils.exception import CustomException
+from src.utils.profiling import PeakMemorySampler
 import os
 import sys
+import json
 import joblib
 
+BACKENDS = {
+    "random_forest": RandomForestClassifier,
+    "hist_gradient_boosting": HistGradientBoostingClassifier,
+}
+
 class ModelBuilding:
     def __init__(self, config):
         self.config = config
         self.model = None
 
-    def build_model(self, X_train, y_train):
-        try:
-            logger.info("Building and training the model...")
-            params = self.config.model_params
-            self.model = RandomForestClassifier(
+    def _new_model(self, params):
+        """Fresh estimator of the configured backend."""
+        if self.config.backend == "random_forest":
+            return RandomForestClassifier(
                 n_estimators=params.get("n_estimators", 100),
                 max_depth=params.get("max_depth", None),
                 min_samples_split=params.get("min_samples_split", 2),
                 min_samples_leaf=params.get("min_samples_leaf", 1),
-                max_features=params.get("max_features", "auto")
+                max_features=params.get("max_features", "sqrt"),
+                n_jobs=self.config.n_jobs,
+                random_state=params.get("random_state", None)
             )
-            self.model.fit(X_train, y_train)
-            logger.info("Model training complete.")
+        if self.config.backend == "hist_gradient_boosting":
+            return HistGradientBoostingClassifier(**self.config.hist_params)
+        raise ValueError(f"Unknown model_building backend {self.config.backend!r}; choose from {list(BACKENDS)}")
+
+    def _warm_start_model(self, model_path, n_features, params):
+        """
+        Previous random forest extended by warm_start_increment trees, or None when there is
+        no compatible model to extend: new trees would be grown with the old model's settings,
+        so it must have been built with `params` (apart from its size and n_jobs).
+        """
+        if not self.config.warm_start or not os.path.exists(model_path):
+            return None
+        if self.config.backend != "random_forest":
+            # HistGradientBoosting rebuilds its bin mapper on every fit, so boosting iterations
+            # added on new data would follow thresholds the earlier trees were not grown on
+            logger.info(f"warm_start is not supported for the {self.config.backend} backend; full refit.")
+            return None
+        model = joblib.load(model_path)
+        if not isinstance(model, BACKENDS[self.config.backend]) or model.n_features_in_ != n_features:
+            logger.info("Existing model does not match the backend or features; training from scratch.")
+            return None
+        expected = self._new_model(params)
+        if self.config.class_weight:
+            expected.set_params(class_weight=self.config.class_weight)
+        current = model.get_params()
+        changed = {name: (current.get(name), value) for name, value in expected.get_params().items()
+                   if name not in ("n_estimators", "n_jobs", "warm_start") and current.get(name) != value}
+        if changed:
+            summary = ", ".join(f"{name} {old!r} -> {new!r}" for name, (old, new) in changed.items())
+            logger.info(f"Existing model was grown with other parameters ({summary}); training from scratch.")
+            return None
+        increment = self.config.warm_start_increment
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + increment, n_jobs=self.config.n_jobs)
+        logger.info(f"Warm start: adding {increment} trees to {len(model.estimators_)}")
+        return model
 
-            # Save model to artifacts/model
+    def _save(self, model_path, memory, train_rows):
+        """Save the model to model_dir, with its fit time, peak memory and size in training_stats_name."""
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        joblib.dump(self.model, model_path)
+        logger.info(f"Model saved at {model_path}")
+
+        stats = {
+            "fit_seconds": memory.seconds,
+            "fit_peak_rss_mb": memory.peak_mb,
+            "fit_rss_increase_mb": memory.increase_mb,
+            "model_size_mb": os.path.getsize(model_path) / 2**20,
+            "train_rows": train_rows,
+            "n_estimators": len(getattr(self.model, "estimators_", [])) or getattr(self.model, "n_iter_", 0)
+        }
+        stats_path = os.path.join(self.config.model_dir, self.config.training_stats_name)
+        with open(stats_path, "w") as f:
+            json.dump(stats, f, indent=4)
+        logger.info(f"Training stats stored at {stats_path}")
+
+    def build_model(self, X_train, y_train, params=None):
+        """
+        Train the model and save it to model_dir, with its fit time, peak memory
+        and size in training_stats_name next to it.
+        :param params: Tuned random forest hyperparameters; they override model_params from the config.
+        """
+        try:
+            logger.info("Building and training the model...")
+            if params and self.config.backend != "random_forest":
+                logger.info(f"Ignoring tuned random forest params for the {self.config.backend} backend")
+                params = None
+            params = {**self.config.model_params, **(params or {})}
             model_path = os.path.join(self.config.model_dir, self.config.model_name)
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            joblib.dump(self.model, model_path)
-            logger.info(f"Model saved at {model_path}")
+            self.model = self._warm_start_model(model_path, X_train.shape[1], params) or self._new_model(params)
+            if self.config.class_weight:
+                self.model.set_params(class_weight=self.config.class_weight)
+
+            with PeakMemorySampler() as memory:
+                self.model.fit(X_train, y_train)
+            logger.info(f"Model training complete in {memory.seconds:.2f}s, peak RSS {memory.peak_mb:.1f} MB.")
+            self._save(model_path, memory, X_train.shape[0])
+            return self.model
 
         except Exception as e:
             logger.error("Error in model building")
             raise CustomException(e, sys)
+
+    def build_model_streaming(self, batches, n_chunks: int, params=None):
+        """
+        Train on training data that arrives as a sequence of (X, y) chunks, holding one chunk
+        in memory at a time. The random forest is assembled from a sub-forest per chunk, with
+        n_estimators spread over the chunks; each tree sees only its own chunk. A skipped
+        chunk's trees go to the next one; with more chunks than n_estimators, every chunk
+        still gets one tree.
+        :param batches: Iterable of (X, y) chunks, e.g. DataPreprocessing.iter_batches.
+        :param n_chunks: Number of chunks, used to spread the trees.
+        :param params: Tuned random forest hyperparameters, as for build_model.
+        """
+        try:
+            if self.config.backend != "random_forest":
+                # HistGradientBoosting re-bins the data on every warm_start fit, which breaks
+                # the trees grown on earlier chunks
+                raise ValueError(f"Streaming training supports the random_forest backend, not {self.config.backend!r}")
+            logger.info(f"Building the model from {n_chunks} chunks...")
+            params = {**self.config.model_params, **(params or {})}
+            model_path = os.path.join(self.config.model_dir, self.config.model_name)
+            n_estimators = params.get("n_estimators", 100)
+            seed = params.get("random_state")
+            self.model, train_rows = None, 0
+            with PeakMemorySampler() as memory:
+                for i, (X, y) in enumerate(batches):
+                    if y.nunique() < 2:
+                        logger.info(f"Skipping chunk {i}: it holds a single class")
+                        continue
+                    # Chunk i brings the forest up to its share of the trees, with at least one
+                    grown = 0 if self.model is None else len(self.model.estimators_)
+                    trees = max(1, n_estimators * (i + 1) // n_chunks - grown)
+                    sub_forest = self._new_model({**params, "n_estimators": trees,
+                                                  "random_state": None if seed is None else seed + i})
+                    if self.config.class_weight:
+                        sub_forest.set_params(class_weight=self.config.class_weight)
+                    sub_forest.fit(X, y)
+                    if self.model is None:
+                        self.model = sub_forest
+                    else:
+                        self.model.estimators_ += sub_forest.estimators_
+                        self.model.n_estimators = len(self.model.estimators_)
+                    train_rows += len(X)
+            if self.model is None:
+                raise ValueError("No training chunk held both classes")
+            logger.info(f"Model training complete in {memory.seconds:.2f}s, peak RSS {memory.peak_mb:.1f} MB.")
+            self._save(model_path, memory, train_rows)
+            return self.model
+
+        except Exception as e:
+            logger.error("Error in streaming model building")
+            raise CustomException(e, sys)
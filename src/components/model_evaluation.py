@@ -12,14 +12,50 @@ class ModelEvaluation:
     def __init__(self, config):
         self.config = config
 
-    def evaluate(self, X_test, y_test):
+    def _load_model(self, model):
+        if model is not None:
+            logger.info("Using in-memory model")
+            return model
+        if os.path.exists(self.config.model_dir):
+            model = joblib.load(self.config.model_dir)
+            logger.info("Loaded Model")
+            return model
+        raise CustomException("Model not found at " + self.config.model_dir, sys)
+
+    def _write_metrics(self, metrics: dict) -> dict:
+        """Add the training and rebalancing stats to the metrics and write the metrics JSON."""
+        def default_converter(o):
+            if isinstance(o, np.integer):
+                return int(o)
+            if isinstance(o, np.floating):
+                return float(o)
+            raise TypeError(f"Object of type {type(o)} is not JSON serializable")
+        
+        # Training and rebalancing cost (time, peak memory, model size) is tracked alongside the scores
+        for stats_file in (self.config.training_stats_file, self.config.rebalance_stats_file):
+            if stats_file and os.path.exists(stats_file):
+                with open(stats_file) as f:
+                    metrics.update(json.load(f))
+
+        # Define the metrics folder path and file path
+        os.makedirs(self.config.metrics_dir, exist_ok=True)
+        metrics_file_path = os.path.join(self.config.metrics_dir, self.config.metrics_name)
+        
+        # Save the metrics dictionary to a JSON file
+        with open(metrics_file_path, "w") as f:
+            json.dump(metrics, f, indent=4, default=default_converter)
+        logger.info(f"Metrics stored at {metrics_file_path}")
+        return metrics
+
+    def evaluate(self, X_test, y_test, model=None):
+        """
+        Score the model on the test split and write the metrics JSON.
+        :param model: Fitted model handed over in-process; loaded from model_dir when None.
+        :return: The metrics dictionary.
+        """
         try:
             logger.info("Evaluating model performance...")
-            if os.path.exists(self.config.model_dir):
-                            model = joblib.load(self.config.model_dir)
-                            logger.info("Loaded Model")        
-            else:
-                 raise CustomException("Model not found at " + self.config.model_dir, sys)
+            model = self._load_model(model)
             y_pred = model.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
             report = classification_report(y_test, y_pred, output_dict=True)
@@ -39,23 +75,54 @@ class ModelEvaluation:
                 "true_positive": tp
             }
 
-            def default_converter(o):
-                if isinstance(o, np.integer):
-                    return int(o)
-                if isinstance(o, np.floating):
-                    return float(o)
-                raise TypeError(f"Object of type {type(o)} is not JSON serializable")
-            
-            # Define the metrics folder path and file path
-            os.makedirs(self.config.metrics_dir, exist_ok=True)
-            metrics_file_path = os.path.join(self.config.metrics_dir, self.config.metrics_name)
-            
-            # Save the metrics dictionary to a JSON file
-            with open(metrics_file_path, "w") as f:
-                json.dump(metrics, f, indent=4, default=default_converter)
-            logger.info(f"Metrics stored at {metrics_file_path}")
+            return self._write_metrics(metrics)
 
         except Exception as e:
             logger.error("Error in model evaluation", exc_info=True)
             raise CustomException(e, sys)
         
+
+    def evaluate_batches(self, batches, model=None):
+        """
+        Score the model on a test split that arrives as (X, y) chunks, accumulating the
+        confusion matrix, and write the same metrics JSON as evaluate.
+        :param batches: Iterable of (X, y) chunks, e.g. DataPreprocessing.iter_batches.
+        :param model: Fitted model handed over in-process; loaded from model_dir when None.
+        :return: The metrics dictionary.
+        """
+        try:
+            logger.info("Evaluating model performance chunk by chunk...")
+            model = self._load_model(model)
+            labels = list(model.classes_)
+            conf_matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+            for X, y in batches:
+                conf_matrix += confusion_matrix(y, model.predict(X), labels=labels)
+
+            # Weighted averages over the true class support, as classification_report computes them
+            support = conf_matrix.sum(axis=1)
+            predicted = conf_matrix.sum(axis=0)
+            correct = np.diag(conf_matrix)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                precision = np.nan_to_num(correct / predicted)
+                recall = np.nan_to_num(correct / support)
+                f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+            weights = support / support.sum()
+            accuracy = correct.sum() / conf_matrix.sum()
+            tn, fp, fn, tp = conf_matrix.ravel()
+            logger.info(f"Model Accuracy: {accuracy:.4f}")
+
+            metrics = {
+                "accuracy": accuracy,
+                "precision": float(weights @ precision),
+                "recall": float(weights @ recall),
+                "f1_score": float(weights @ f1),
+                "true_negative": tn,
+                "false_positive": fp,
+                "false_negative": fn,
+                "true_positive": tp
+            }
+            return self._write_metrics(metrics)
+
+        except Exception as e:
+            logger.error("Error in model evaluation", exc_info=True)
+            raise CustomException(e, sys)
@@ -11,13 +11,20 @@ class ModelRegister:
     def __init__(self, config):
         self.config = config
 
-    def register(self):
+    def register(self, model=None):
+        """
+        Log the model and its metrics to MLflow and register a new model version.
+        :param model: Fitted model handed over in-process; loaded from model_dir when None.
+        :return: The MLflow run id.
+        """
         try:
             mlflow.set_tracking_uri(self.config.tracking["tracking_uri"])
             experiment_name = self.config.tracking.get("experiment_name", "Default")
             mlflow.set_experiment(experiment_name)
             with mlflow.start_run():
-                            if os.path.exists(self.config.model_dir):
+                            if model is not None:
+                                logger.info("Using in-memory model")
+                            elif os.path.exists(self.config.model_dir):
                                 model = joblib.load(self.config.model_dir)
                                 logger.info("Loaded Model")
                             else:
@@ -26,13 +33,20 @@ class ModelRegister:
 
                             mlflow.sklearn.log_model(model, "model")
                             mlflow.log_param("model_name", self.config.model_name)
+                            for plan_file in self.config.plan_files:
+                                if os.path.exists(plan_file):
+                                    mlflow.log_artifact(plan_file, artifact_path="preprocessing")
 
                             # Load evaluation metrics from the artifacts folder if available
                             if os.path.exists(self.config.metrics_dir):
                                 with open(self.config.metrics_dir, "r") as f:
                                     metrics = json.load(f)
                                 for metric_name, metric_value in metrics.items():
-                                    mlflow.log_metric(metric_name, float(metric_value))
+                                    # Descriptive fields (e.g. rebalance_method) are run parameters, not metrics
+                                    if isinstance(metric_value, (int, float)):
+                                        mlflow.log_metric(metric_name, float(metric_value))
+                                    else:
+                                        mlflow.log_param(metric_name, metric_value)
                                 mlflow.log_artifact(self.config.metrics_dir, artifact_path="metrics")
                                 logger.info(f"Logged metrics from {self.config.metrics_dir}")  
                             else:
@@ -43,6 +57,7 @@ class ModelRegister:
 
                             # Register model in MLflow Model Registry 
                             mlflow.register_model(f"runs:/{run_id}/model", self.config.model_name)
+            return run_id
         except Exception as e:
             logger.error(f"Error during model registration: {e}")
             raise CustomException(e, sys)
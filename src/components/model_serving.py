@@ -0,0 +1,224 @@
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+import mlflow
+import mlflow.sklearn
+from mlflow.tracking import MlflowClient
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.forest_engine import CompiledForest
+from src.components.transform_plan import TransformPlan
+from src.constants import PREDICTION_INPUT_SCHEMA
+from src.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Everything a request needs to score, loaded together and swapped as one reference.
+    plan_source is where the plan came from (the model version's run, or a local file).
+    compiled is the model flattened into a CompiledForest, or None when the sklearn
+    engine is configured or the model cannot be compiled.
+    """
+    model: Any
+    plan: TransformPlan
+    model_version: str
+    plan_source: str
+    compiled: Optional[CompiledForest] = None
+
+
+class InferenceContext:
+    def __init__(self, dp_config, pr_config, mlflow_config):
+        """
+        Resident model, transform plan and preprocessing configuration for serving.
+        The plan is the one logged with the served model version, so a model trained
+        elsewhere or an older pinned version is never paired with the local plan.
+        Requests read `bundle` once and use it throughout, so a reload never mixes
+        a new model with an old plan.
+        """
+        self.dp_config = dp_config
+        self.pr_config = pr_config
+        self.mlflow_config = mlflow_config
+        self.preprocessor = DataPreprocessing(dp_config)
+        self.plan_path = os.path.join(dp_config.root_dir, dp_config.plan_name)
+        self.bundle: Optional[ModelBundle] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._retry_lock = threading.Lock()
+        self._next_load_at = 0.0
+        mlflow.set_tracking_uri(mlflow_config.tracking["tracking_uri"])
+
+    def _resolve_version(self) -> str:
+        """Return the model version to serve: the configured one, or the newest registered."""
+        if self.pr_config.model_version != "latest":
+            return self.pr_config.model_version
+        versions = MlflowClient().search_model_versions(f"name='{self.mlflow_config.model_name}'")
+        if not versions:
+            raise RuntimeError(f"No registered versions of {self.mlflow_config.model_name}")
+        return str(max(int(v.version) for v in versions))
+
+    def _load_plan(self, version: str):
+        """
+        The transform plan logged with the model version (preprocessing/<plan_name> in its run),
+        or the local plan file for versions registered before plans were logged.
+        :return: (plan, source)
+        """
+        client = MlflowClient()
+        run_id = client.get_model_version(self.mlflow_config.model_name, version).run_id
+        artifact = f"preprocessing/{os.path.basename(self.plan_path)}"
+        if artifact not in [item.path for item in client.list_artifacts(run_id, "preprocessing")]:
+            logger.info(f"Model version {version} has no logged transform plan; using {self.plan_path}")
+            return TransformPlan.load(self.plan_path), self.plan_path
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = mlflow.artifacts.download_artifacts(run_id=run_id, artifact_path=artifact, dst_path=tmp_dir)
+            return TransformPlan.load(path), f"runs:/{run_id}/{artifact}"
+
+    @staticmethod
+    def _check_plan(model, plan: TransformPlan, version: str):
+        """Refuse a plan whose features are not the ones the model was fitted on."""
+        expected = list(getattr(model, "feature_names_in_", []))
+        if expected and expected != list(plan.feature_names):
+            raise ValueError(f"Transform plan features {plan.feature_names} do not match the features "
+                             f"model version {version} was fitted on: {expected}")
+        if not expected and getattr(model, "n_features_in_", len(plan.feature_names)) != len(plan.feature_names):
+            raise ValueError(f"Transform plan has {len(plan.feature_names)} features, model version {version} "
+                             f"expects {model.n_features_in_}")
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Load the model and its transform plan if a newer registered version is available,
+        check that they agree and swap them in atomically. A mismatched pair is refused
+        (ValueError) and the current bundle keeps serving.
+        :return: True if a new bundle was installed.
+        """
+        with self._lock:
+            version = self._resolve_version()
+            current = self.bundle
+            if not force and current is not None and current.model_version == version:
+                return False
+
+            model = mlflow.sklearn.load_model(f"models:/{self.mlflow_config.model_name}/{version}")
+            plan, plan_source = self._load_plan(version)
+            self._check_plan(model, plan, version)
+            self.bundle = ModelBundle(model, plan, version, plan_source, compiled=self._compile(model))
+            logger.info(f"Serving model {self.mlflow_config.model_name} version {version} with plan {plan_source}")
+            return True
+
+    def _compile(self, model) -> Optional[CompiledForest]:
+        """Flatten the model into a CompiledForest when the compiled engine is configured."""
+        if self.pr_config.engine != "compiled":
+            return None
+        try:
+            forest = CompiledForest.from_sklearn(model)
+        except (AttributeError, ValueError) as e:
+            logger.info(f"Model cannot be compiled, serving it with sklearn: {e}")
+            return None
+        logger.info(f"Compiled {forest.n_trees} trees into {forest.nbytes / 1e6:.2f} MB of node arrays")
+        return forest
+
+    def _scorer(self, bundle: ModelBundle, n_rows: int):
+        """
+        The compiled forest for small inputs, where sklearn's per-call overhead dominates;
+        the sklearn model for chunks above compiled_max_rows, where its compiled loop is faster.
+        """
+        if bundle.compiled is not None and n_rows <= self.pr_config.compiled_max_rows:
+            return bundle.compiled
+        return bundle.model
+
+    def get_bundle(self) -> ModelBundle:
+        """
+        Return the resident bundle, loading it first if startup loading failed.
+        While nothing is loaded, a load is attempted at most once per `reload_interval`
+        (once a second when the watcher is off); requests in between fail immediately
+        instead of each waiting on the registry.
+        """
+        bundle = self.bundle
+        if bundle is not None:
+            return bundle
+        with self._retry_lock:
+            now = time.monotonic()
+            if now < self._next_load_at:
+                raise RuntimeError(f"No model loaded; next load attempt in {self._next_load_at - now:.0f}s")
+            self._next_load_at = now + max(self.pr_config.reload_interval, 1)
+        self.refresh()
+        return self.bundle
+
+    def start_watcher(self):
+        """Poll the model registry every `reload_interval` seconds in a daemon thread."""
+        if self._watcher is not None or self.pr_config.reload_interval <= 0:
+            return
+
+        def watch():
+            while not self._stop.wait(self.pr_config.reload_interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Model reload check failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="model-reload", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    @staticmethod
+    def _add_timing(timings: Optional[dict], stage: str, started: float):
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+    def predict(self, df: pd.DataFrame, timings: dict = None):
+        """
+        Preprocess raw applicant rows and return the model's class predictions.
+        :param timings: When given, seconds per serving step are added to it: prediction_preprocess
+            (power_transform included and also reported on its own) and model_predict.
+        """
+        bundle = self.get_bundle()
+        started = time.perf_counter()
+        features = self.preprocessor.prediction_preprocess(df, plan=bundle.plan, timings=timings)
+        self._add_timing(timings, 'prediction_preprocess', started)
+        started = time.perf_counter()
+        predictions = self._scorer(bundle, len(features)).predict(features)
+        self._add_timing(timings, 'model_predict', started)
+        return predictions
+
+    def predict_batch(self, df: pd.DataFrame, timings: dict = None) -> pd.DataFrame:
+        """
+        Score many applicants at once. Rows are preprocessed and passed to
+        model.predict_proba in chunks of `batch_chunk_size`.
+        :param df: Raw applicant rows; extra columns are ignored, `applicant_id` is echoed back if present.
+        :param timings: As for `predict`, summed over the chunks.
+        :return: DataFrame with approval_probability and loan_approved per row.
+        """
+        if len(df) > self.pr_config.max_batch_rows:
+            raise ValueError(f"Batch of {len(df)} rows exceeds max_batch_rows={self.pr_config.max_batch_rows}")
+        missing = [col for col in PREDICTION_INPUT_SCHEMA if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing input columns: {missing}")
+
+        bundle = self.get_bundle()
+        model = bundle.model
+        inputs = df[list(PREDICTION_INPUT_SCHEMA)]
+        probabilities = np.empty((len(df), len(model.classes_)), dtype=float)
+        chunk_size = self.pr_config.batch_chunk_size
+        for start in range(0, len(df), chunk_size):
+            chunk = inputs.iloc[start:start + chunk_size]
+            started = time.perf_counter()
+            features = self.preprocessor.prediction_preprocess(chunk, plan=bundle.plan, timings=timings)
+            self._add_timing(timings, 'prediction_preprocess', started)
+            started = time.perf_counter()
+            probabilities[start:start + chunk_size] = self._scorer(bundle, len(features)).predict_proba(features)
+            self._add_timing(timings, 'model_predict', started)
+
+        result = pd.DataFrame({
+            'approval_probability': probabilities[:, list(model.classes_).index(1)],
+            'loan_approved': model.classes_.take(np.argmax(probabilities, axis=1))
+        })
+        if 'applicant_id' in df.columns:
+            result.insert(0, 'applicant_id', df['applicant_id'].to_numpy())
+        logger.info(f"Batch prediction complete for {len(df)} rows.")
+        return result
@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+import optuna
+from concurrent.futures import ProcessPoolExecutor
+from optuna.pruners import SuccessiveHalvingPruner
+from optuna.samplers import TPESampler
+from optuna.storages import JournalStorage
+from optuna.storages.journal import JournalFileBackend
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.utils.class_weight import compute_class_weight
+from src.components.rebalancing import rebalance
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+
+def tree_rungs(min_trees: int, reduction_factor: int, n_estimators: int) -> list:
+    """Forest sizes a trial is scored at: min_trees * reduction_factor^k, then n_estimators."""
+    rungs, trees = [], min_trees
+    while trees < n_estimators:
+        rungs.append(trees)
+        trees *= reduction_factor
+    return rungs + [n_estimators]
+
+
+def suggest_params(trial, search_space: dict) -> dict:
+    """Sample one point of the search space: {low, high} mappings are integer ranges, lists are choices."""
+    params = {}
+    for name, spec in search_space.items():
+        if isinstance(spec, dict):
+            params[name] = trial.suggest_int(name, spec['low'], spec['high'], log=spec.get('log', False))
+        else:
+            params[name] = trial.suggest_categorical(name, list(spec))
+    return params
+
+
+def load_folds(fold_dir: str, n_folds: int) -> list:
+    """Memory-map the shared fold arrays, so every trial process reads the same pages."""
+    folds = []
+    for k in range(n_folds):
+        folds.append(tuple(np.load(os.path.join(fold_dir, f"{part}_{k}.npy"), mmap_mode='r')
+                           for part in ("X_train", "y_train", "X_valid", "y_valid")))
+    return folds
+
+
+def fold_class_weight(class_weight, y):
+    """'balanced' resolved to explicit weights for one training fold, which a warm-started forest keeps."""
+    if class_weight != 'balanced':
+        return class_weight
+    classes = np.unique(y)
+    return dict(zip(classes.tolist(), compute_class_weight('balanced', classes=classes, y=y)))
+
+
+def _storage(config) -> JournalStorage:
+    return JournalStorage(JournalFileBackend(str(config.storage)))
+
+
+def _objective(trial, folds: list, config) -> float:
+    """
+    Cross-validated score of one parameter set. Each fold's forest is grown with
+    warm_start through the tree rungs, and the trial is pruned at a rung where it
+    falls behind (successive halving over the number of trees). With rebalance: class_weight
+    the forests weight the classes, as the final model does.
+    """
+    params = suggest_params(trial, config.search_space)
+    n_estimators = params.pop('n_estimators', 100)
+    scorer = get_scorer(config.scoring)
+    models = [RandomForestClassifier(warm_start=True, n_jobs=1, random_state=config.seed,
+                                     class_weight=fold_class_weight(config.class_weight, fold[1]), **params)
+              for fold in folds]
+    score = float('nan')
+    for trees in tree_rungs(config.min_trees, config.reduction_factor, n_estimators):
+        scores = []
+        for model, (X_train, y_train, X_valid, y_valid) in zip(models, folds):
+            model.set_params(n_estimators=trees).fit(X_train, y_train)
+            scores.append(scorer(model, X_valid, y_valid))
+        score = float(np.mean(scores))
+        trial.report(score, step=trees)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return score
+
+
+def run_trials(config, study_name: str, fold_dir: str, worker_index: int):
+    """Trial loop of one worker process; workers share the study through the journal file."""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    folds = load_folds(fold_dir, config.cv_folds)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_storage(config),
+        sampler=TPESampler(seed=config.seed + worker_index),
+        pruner=SuccessiveHalvingPruner(min_resource=config.min_trees, reduction_factor=config.reduction_factor)
+    )
+    # Stop every worker once the study holds n_trials trials in total
+    study.optimize(lambda trial: _objective(trial, folds, config), n_trials=config.n_trials,
+                   callbacks=[MaxTrialsCallback(config.n_trials, states=None)])
+
+
+class ModelTuning:
+    def __init__(self, config):
+        self.config = config
+
+    def _prepare_folds(self, X, y) -> str:
+        """
+        Split the training matrix into CV folds once and store them as .npy files for all trials.
+        Only the training part of each fold is rebalanced, so validation rows are all real
+        and no synthetic training row is interpolated from one of them.
+        """
+        fold_dir = os.path.join(self.config.root_dir, "folds")
+        os.makedirs(fold_dir, exist_ok=True)
+        X = pd.DataFrame(X).reset_index(drop=True)
+        y = pd.Series(np.asarray(y), name=getattr(y, "name", None))
+        splitter = StratifiedKFold(n_splits=self.config.cv_folds, shuffle=True, random_state=self.config.seed)
+        for k, (train_idx, valid_idx) in enumerate(splitter.split(X, y)):
+            X_fold, y_fold = rebalance(X.iloc[train_idx].reset_index(drop=True),
+                                       y.iloc[train_idx].reset_index(drop=True), self.config.rebalance, subset_rows=self.config.smote_subset_rows,
+                                       k_neighbors=self.config.smote_k_neighbors, seed=self.config.seed)
+            np.save(os.path.join(fold_dir, f"X_train_{k}.npy"), np.asarray(X_fold, dtype=np.float32))
+            np.save(os.path.join(fold_dir, f"y_train_{k}.npy"), np.asarray(y_fold))
+            np.save(os.path.join(fold_dir, f"X_valid_{k}.npy"), X.iloc[valid_idx].to_numpy(dtype=np.float32))
+            np.save(os.path.join(fold_dir, f"y_valid_{k}.npy"), y.iloc[valid_idx].to_numpy())
+        return fold_dir
+
+    def tune(self, X_train, y_train) -> dict:
+        """
+        Search the random forest's hyperparameters with trials spread over worker processes.
+        :param X_train: Training matrix before rebalancing; each CV training fold is rebalanced on its own.
+        :param y_train: Its labels.
+        :return: Best parameters, ready to pass to ModelBuilding.build_model.
+        """
+        try:
+            start = time.perf_counter()
+            os.makedirs(os.path.dirname(str(self.config.storage)) or ".", exist_ok=True)
+            fold_dir = self._prepare_folds(X_train, y_train)
+
+            # A fresh study per run; earlier studies stay in the journal for comparison
+            study_name = f"{self.config.study_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+            optuna.create_study(study_name=study_name, storage=_storage(self.config), direction="maximize")
+            n_workers = self.config.n_workers or os.cpu_count() or 1
+            n_workers = max(1, min(n_workers, self.config.n_trials))
+            logger.info(f"Running {self.config.n_trials} trials of {study_name} on {n_workers} processes...")
+            if n_workers == 1:
+                run_trials(self.config, study_name, fold_dir, 0)
+            else:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    futures = [executor.submit(run_trials, self.config, study_name, fold_dir, index)
+                               for index in range(n_workers)]
+                    for future in futures:
+                        future.result()
+
+            study = optuna.load_study(study_name=study_name, storage=_storage(self.config))
+            states = [trial.state for trial in study.trials]
+            best = study.best_trial
+            summary = {
+                "study_name": study_name,
+                "params": best.params,
+                "cv_score": best.value,
+                "scoring": self.config.scoring,
+                "n_trials": len(states),
+                "n_complete": states.count(TrialState.COMPLETE),
+                "n_pruned": states.count(TrialState.PRUNED),
+                "n_workers": n_workers,
+                "seconds": time.perf_counter() - start
+            }
+            best_params_path = os.path.join(self.config.root_dir, self.config.best_params_name)
+            with open(best_params_path, "w") as f:
+                json.dump(summary, f, indent=4)
+            logger.info(f"Best {self.config.scoring} {best.value:.4f} with {best.params}; "
+                        f"{summary['n_pruned']} of {len(states)} trials pruned in {summary['seconds']:.1f}s")
+            return best.params
+
+        except Exception as e:
+            logger.error("Error in model tuning")
+            raise CustomException(e, sys)
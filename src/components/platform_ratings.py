@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from itertools import compress, repeat
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+
+
+@dataclass
+class PlatformRatings:
+    """
+    Parsed `platform_ratings` column.
+    average: mean rating per row, NaN where nothing parsed.
+    platforms: platform names, in block column order.
+    ratings / presence: per-platform rating and 0/1 presence blocks (n_rows x n_platforms),
+    dense ndarrays or CSR matrices; None unless requested.
+    """
+    average: np.ndarray
+    platforms: List[str]
+    ratings: Optional[object] = None
+    presence: Optional[object] = None
+
+
+def parse_platform_ratings(values, platforms: Optional[List[str]] = None, per_platform: bool = False,
+                           sparse: bool = False, fill_value: float = np.nan) -> PlatformRatings:
+    """
+    Parse "Zomato:4.7; Swiggy:3.3"-style strings for any number of platforms per row.
+    Items without exactly one ':' or with a non-numeric rating are skipped.
+    :param values: Sequence or Series of rating strings (NaN/None allowed).
+    :param platforms: Fixed platform vocabulary for the blocks; unknown platforms are left out of
+        the blocks but still count towards the average. Defaults to the sorted platforms seen.
+    :param per_platform: Also build the per-platform rating and presence blocks.
+    :param sparse: Return the blocks as scipy CSR matrices instead of dense arrays.
+    :param fill_value: Dense rating block value where a row has no rating for a platform.
+    """
+    values = np.array(values, dtype=object)
+    n = len(values)
+    values[pd.isna(values)] = ''
+    strings = values.tolist()
+
+    # Split every row at once: one join, one split, and the ';' count per row gives the owning row
+    items_per_row = np.fromiter(map(str.count, strings, repeat(';')), dtype=np.int64, count=n) + 1
+    items = ';'.join(strings).split(';')
+    rows = np.repeat(np.arange(n), items_per_row)
+
+    valid = np.fromiter(map(str.count, items, repeat(':')), dtype=np.int64, count=len(items)) == 1
+    pairs = ':'.join(compress(items, valid)).split(':') if valid.any() else []
+    rows = rows[valid]
+    try:
+        scores = np.fromiter(map(float, pairs[1::2]), dtype=float, count=len(pairs) // 2)
+    except ValueError:
+        # Some rating is not a number; parse item by item and drop the bad ones
+        scores = pd.to_numeric(pd.Series(pairs[1::2], dtype=object).str.strip(), errors='coerce').to_numpy(dtype=float)
+    parsed = ~np.isnan(scores)
+    rows, scores = rows[parsed], scores[parsed]
+
+    counts = np.bincount(rows, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.bincount(rows, weights=scores, minlength=n) / counts
+
+    if not per_platform:
+        return PlatformRatings(average=average, platforms=list(platforms or []))
+
+    names = np.array(list(map(str.strip, pairs[0::2])), dtype=object)[parsed]
+    if platforms is None:
+        platforms = sorted(set(names))
+    codes = pd.Index(platforms).get_indexer(names)
+    known = codes >= 0
+    rows, codes, scores = rows[known], codes[known], scores[known]
+
+    # Average duplicate mentions of a platform within a row
+    n_platforms = len(platforms)
+    cells, inverse = np.unique(rows * n_platforms + codes, return_inverse=True)
+    cell_ratings = np.bincount(inverse, weights=scores) / np.bincount(inverse)
+    cell_rows, cell_cols = np.divmod(cells, n_platforms)
+
+    if sparse:
+        shape = (n, n_platforms)
+        ratings = sp.csr_matrix((cell_ratings, (cell_rows, cell_cols)), shape=shape)
+        presence = sp.csr_matrix((np.ones(len(cells), dtype=np.int8), (cell_rows, cell_cols)), shape=shape)
+    else:
+        ratings = np.full((n, n_platforms), fill_value, dtype=float)
+        ratings[cell_rows, cell_cols] = cell_ratings
+        presence = np.zeros((n, n_platforms), dtype=np.int8)
+        presence[cell_rows, cell_cols] = 1
+    return PlatformRatings(average=average, platforms=list(platforms), ratings=ratings, presence=presence)
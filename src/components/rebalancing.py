@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+from sklearn.random_projection import GaussianRandomProjection
+from imblearn.over_sampling import SMOTE, RandomOverSampler
+
+# Ways to handle the minority class in the training set; class_weight resamples nothing
+# and has the model weight the classes instead
+REBALANCE_METHODS = ["smote", "smote_subset", "random_oversample", "class_weight", "none"]
+
+
+class ProjectedNeighbors:
+    """
+    Approximate nearest neighbours: an exact kd-tree search in a random
+    low-dimensional projection of the rows. The tree stays fast where the
+    full feature space (one-hot columns included) is too wide for it, and the
+    projection roughly preserves distances (Johnson-Lindenstrauss).
+    """
+
+    def __init__(self, n_neighbors: int = 5, n_components: int = 8, seed: int = 0):
+        self.n_neighbors = n_neighbors
+        self.projection = GaussianRandomProjection(n_components=n_components, random_state=seed)
+        self.index = NearestNeighbors(n_neighbors=n_neighbors + 1, algorithm="kd_tree")
+
+    def fit(self, X: np.ndarray) -> "ProjectedNeighbors":
+        # Standardize first, so wide-range columns (income, balances) do not dominate the projection
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1
+        self.index.fit(self.projection.fit_transform((X - self.mean) / self.scale))
+        return self
+
+    def kneighbors(self, X: np.ndarray) -> np.ndarray:
+        """Indices of the n_neighbors nearest fitted rows to each row of X, excluding the row itself."""
+        _, indices = self.index.kneighbors(self.projection.transform((X - self.mean) / self.scale))
+        return indices[:, 1:]
+
+
+def smote_subset(X: pd.DataFrame, y: pd.Series, subset_rows: int, k_neighbors: int = 5, seed: int = 42):
+    """
+    SMOTE that indexes at most `subset_rows` minority rows with ProjectedNeighbors, and
+    interpolates new rows between those and their approximate neighbours until the
+    classes are balanced. Only the subset and the synthetic rows are materialized;
+    synthetic rows take each column's dtype.
+    :return: (X, y) with the synthetic minority rows appended.
+    """
+    rng = np.random.default_rng(seed)
+    labels, counts = np.unique(y, return_counts=True)
+    minority = labels[np.argmin(counts)]
+    n_new = counts.max() - counts.min()
+    minority_rows = np.flatnonzero(y.to_numpy() == minority)
+    if n_new == 0 or len(minority_rows) <= k_neighbors:
+        return X, y
+    if len(minority_rows) > subset_rows:
+        minority_rows = rng.choice(minority_rows, subset_rows, replace=False)
+    subset = X.to_numpy(dtype=np.float64)[minority_rows]
+
+    neighbors = ProjectedNeighbors(k_neighbors, n_components=min(8, subset.shape[1]), seed=seed)
+    neighbors = neighbors.fit(subset).kneighbors(subset)
+    anchors = rng.integers(len(subset), size=n_new)
+    partners = neighbors[anchors, rng.integers(k_neighbors, size=n_new)]
+    gaps = rng.random((n_new, 1))
+    synthetic = subset[anchors] + gaps * (subset[partners] - subset[anchors])
+
+    X_new = pd.DataFrame(synthetic, columns=X.columns).astype(X.dtypes.to_dict(), copy=False)
+    y_new = pd.Series(np.full(n_new, minority, dtype=y.dtype), name=y.name)
+    return pd.concat([X, X_new], ignore_index=True), pd.concat([y, y_new], ignore_index=True)
+
+
+def rebalance(X: pd.DataFrame, y: pd.Series, method: str, subset_rows: int = 20000, k_neighbors: int = 5,
+              seed: int = 42):
+    """
+    Rebalance a training set with one of REBALANCE_METHODS.
+    :param subset_rows: Minority rows indexed by smote_subset.
+    :return: (X, y): the original rows first, unchanged and in order, then the added rows;
+        unchanged for class_weight and none.
+    """
+    if method == "smote":
+        return SMOTE(k_neighbors=k_neighbors, random_state=seed).fit_resample(X, y)
+    if method == "smote_subset":
+        return smote_subset(X, y, subset_rows, k_neighbors, seed)
+    if method == "random_oversample":
+        return RandomOverSampler(random_state=seed).fit_resample(X, y)
+    if method in ("class_weight", "none"):
+        return X, y
+    raise ValueError(f"Unknown rebalance method {method!r}; choose from {REBALANCE_METHODS}")
@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import time
+import mlflow
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+# Stage measurements logged to MLflow, as profile.<stage>.<field>
+MLFLOW_FIELDS = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "read_bytes", "write_bytes")
+
+
+class RunReport:
+    def __init__(self, config, mlflow_config):
+        """
+        Structured report of one training run: the StageProfiler measurements of every
+        stage, saved as JSON next to metrics.json and logged to MLflow.
+        :param config: ProfilingConfig.
+        :param mlflow_config: MlflowConfig, for the tracking server and experiment.
+        """
+        self.config = config
+        self.mlflow_config = mlflow_config
+        self.report_path = os.path.join(config.report_dir, config.report_name)
+
+    def cprofile_path(self, stage: str):
+        """Where the stage's cProfile goes, or None when the stage is not configured for one."""
+        if stage not in self.config.cprofile_stages:
+            return None
+        return os.path.join(self.config.cprofile_dir, f"{stage}.prof")
+
+    def save(self, stages: list, status: str, started_at: float) -> dict:
+        """Write the run report atomically and return it."""
+        try:
+            report = {
+                "status": status,
+                "started_at": started_at,
+                "finished_at": time.time(),
+                "wall_seconds": sum(stage.get("wall_seconds", 0.0) for stage in stages),
+                "stages": stages
+            }
+            os.makedirs(self.config.report_dir, exist_ok=True)
+            with open(self.report_path + ".tmp", "w") as f:
+                json.dump(report, f, indent=4)
+            os.replace(self.report_path + ".tmp", self.report_path)
+            logger.info(f"Run report saved at {self.report_path}")
+            return report
+        except Exception as e:
+            logger.error("Error saving the run report")
+            raise CustomException(e, sys)
+
+    def log_to_mlflow(self, report: dict, run_id: str = None):
+        """
+        Log the stage measurements as metrics, and the report and any cProfile files as artifacts,
+        to the run that registered the model, or to a new run of the experiment when there is none.
+        """
+        try:
+            mlflow.set_tracking_uri(self.mlflow_config.tracking["tracking_uri"])
+            mlflow.set_experiment(self.mlflow_config.tracking.get("experiment_name", "Default"))
+            metrics = {}
+            for stage in report["stages"]:
+                for field in MLFLOW_FIELDS:
+                    if stage.get(field) is not None:
+                        metrics[f"profile.{stage['stage']}.{field}"] = float(stage[field])
+                for name, rows in stage.get("rows", {}).items():
+                    metrics[f"profile.{stage['stage']}.rows.{name}"] = float(rows)
+            with mlflow.start_run(run_id=run_id, run_name=None if run_id else "training-run-profile"):
+                mlflow.log_metrics(metrics)
+                mlflow.log_artifact(self.report_path, artifact_path="profiling")
+                for stage in report["stages"]:
+                    if "cprofile" in stage and os.path.exists(stage["cprofile"]["path"]):
+                        mlflow.log_artifact(stage["cprofile"]["path"], artifact_path="profiling")
+            logger.info(f"Logged {len(metrics)} profiling metrics to MLflow")
+        except Exception as e:
+            logger.error("Error logging the run report to MLflow")
+            raise CustomException(e, sys)
@@ -0,0 +1,179 @@
+import glob
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from src.constants import PREDICTION_INPUT_SCHEMA
+from src.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single serving process
+    fcntl = None
+
+# Segment files are named by the sequence number of their first row and their row count
+SEGMENT_PATTERN = re.compile(r"segment-(\d{12})-(\d+)\.parquet$")
+
+
+class TrafficRecorder:
+    def __init__(self, config):
+        """
+        Captures scored requests (raw inputs plus predictions) to a bounded ring of
+        parquet segments in traffic_dir, for drift detection on live traffic.
+        record() only enqueues; a writer thread batches rows into segments of
+        segment_rows (or whatever arrived within flush_interval seconds) and drops
+        the oldest segments beyond max_segments. Several worker processes can record into
+        the same traffic_dir: segments are numbered and rotated under a lock file.
+        :param config: TrafficCaptureConfig.
+        """
+        self.config = config
+        self.lock_path = os.path.join(config.traffic_dir, ".segments.lock")
+        self._queue = queue.Queue(maxsize=config.max_queue_batches)
+        self._stop = threading.Event()
+        self._writer = None
+        self.dropped_rows = 0
+        os.makedirs(config.traffic_dir, exist_ok=True)
+        segments = self.segments()
+        self.next_seq = segments[-1][1] + segments[-1][2] if segments else 0
+
+    def segments(self) -> list:
+        """(path, first_seq, rows) of every complete segment, oldest first."""
+        found = []
+        for path in glob.glob(os.path.join(self.config.traffic_dir, "segment-*.parquet")):
+            match = SEGMENT_PATTERN.search(path)
+            if match:
+                found.append((path, int(match.group(1)), int(match.group(2))))
+        return sorted(found, key=lambda segment: segment[1])
+
+    def record(self, inputs: pd.DataFrame, predictions: pd.DataFrame):
+        """
+        Queue scored rows for capture without blocking; rows are dropped if the writer falls behind.
+        Only references are queued, so the frames must not be modified afterwards.
+        """
+        if not self.config.enabled:
+            return
+        try:
+            self._queue.put_nowait((inputs, predictions, time.time()))
+        except queue.Full:
+            if not self.dropped_rows:
+                logger.error("Traffic capture queue full; dropping scored rows until the writer catches up")
+            self.dropped_rows += len(inputs)
+
+    @staticmethod
+    def _rows(batches: list) -> pd.DataFrame:
+        """Captured frame of queued batches: the request fields, the prediction columns and the scoring time."""
+        inputs = pd.concat([batch[0] for batch in batches], ignore_index=True)
+        predictions = pd.concat([batch[1] for batch in batches], ignore_index=True)
+        rows = inputs[[col for col in PREDICTION_INPUT_SCHEMA if col in inputs.columns]].copy()
+        for col in predictions.columns:
+            if col != 'applicant_id':
+                rows[col] = predictions[col].to_numpy()
+        rows['scored_at'] = np.repeat([batch[2] for batch in batches], [len(batch[0]) for batch in batches])
+        return rows
+
+    def start(self):
+        """Start the writer thread."""
+        if self._writer is not None or not self.config.enabled:
+            return
+        self._writer = threading.Thread(target=self._write_loop, name="traffic-writer", daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """Flush what is queued and stop the writer thread."""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def _write_loop(self):
+        pending, pending_rows, reported_drops = [], 0, 0
+        deadline = time.monotonic() + self.config.flush_interval
+        while True:
+            try:
+                batch = self._queue.get(timeout=max(0.0, min(1.0, deadline - time.monotonic())))
+                pending.append(batch)
+                pending_rows += len(batch[0])
+            except queue.Empty:
+                pass
+            stopping = self._stop.is_set() and self._queue.empty()
+            if pending and (pending_rows >= self.config.segment_rows or time.monotonic() >= deadline or stopping):
+                try:
+                    self._write_segment(self._rows(pending))
+                except Exception as e:
+                    logger.error(f"Error writing traffic segment: {e}")
+                pending, pending_rows = [], 0
+                if self.dropped_rows > reported_drops:
+                    logger.error(f"Traffic capture has dropped {self.dropped_rows} rows so far")
+                    reported_drops = self.dropped_rows
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.config.flush_interval
+            if stopping:
+                return
+
+    @contextmanager
+    def _segments_locked(self):
+        """Exclusive access to the segment sequence across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_segment(self, rows: pd.DataFrame):
+        """Write one segment (temp file, then rename) and drop the oldest beyond max_segments."""
+        # One storage type per column, whatever the request format delivered
+        for col, cast in PREDICTION_INPUT_SCHEMA.items():
+            if col in rows.columns:
+                if cast is str:
+                    rows[col] = rows[col].map(lambda value: None if pd.isna(value) else str(value))
+                else:
+                    rows[col] = pd.to_numeric(rows[col], errors='coerce').astype(np.float32)
+        with self._segments_locked():
+            # Other processes may have written segments since this one's last
+            segments = self.segments()
+            if segments:
+                self.next_seq = max(self.next_seq, segments[-1][1] + segments[-1][2])
+            path = os.path.join(self.config.traffic_dir, f"segment-{self.next_seq:012d}-{len(rows)}.parquet")
+            rows.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+            self.next_seq += len(rows)
+
+            segments = self.segments()
+            for old_path, _, _ in segments[:max(0, len(segments) - self.config.max_segments)]:
+                os.remove(old_path)
+
+    def window(self, rows: int = None, mode: str = None) -> pd.DataFrame:
+        """
+        Recent captured traffic as a DataFrame.
+        :param rows: Window size; window_rows from the config when None.
+        :param mode: sliding (the latest `rows` rows) or tumbling (the latest complete
+            block of `rows` rows, counted from the first captured row); config window_mode when None.
+        """
+        rows = rows or self.config.window_rows
+        mode = mode or self.config.window_mode
+        segments = self.segments()
+        if not segments:
+            return pd.DataFrame()
+        end = segments[-1][1] + segments[-1][2]
+        if mode == "tumbling":
+            end = end // rows * rows
+        elif mode != "sliding":
+            raise ValueError(f"Unknown window mode {mode!r}; choose sliding or tumbling")
+        start = max(end - rows, segments[0][1])
+        frames = []
+        for path, first, count in segments:
+            if first + count <= start or first >= end:
+                continue
+            frame = pd.read_parquet(path)
+            frames.append(frame.iloc[max(0, start - first):end - first])
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,394 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import PowerTransformer
+from src.components.platform_ratings import parse_platform_ratings
+from src.utils.sketches import FrequencySketch, ReservoirSample, QUANTILE_SKETCHES, quantile_sketch_from_dict
+
+# Raw columns copied through unchanged, in training column order
+PASSTHROUGH_COLUMNS = [
+    'age', 'seasonal_variation', 'income_volatility', 'debt_to_income_ratio',
+    'transaction_frequency', 'credit_card_utilization', 'subscription_services',
+    'financial_emergencies_last_year', 'inflation_rate', 'customer_feedback_score',
+    'work_consistency', 'avg_platform_tenure', 'cost_of_living_index'
+]
+# Model feature order before the reason dummies and the platform rating
+BASE_FEATURES = [
+    'age', 'education_level', 'num_platforms', 'work_experience', 'monthly_income',
+    'seasonal_variation', 'income_volatility', 'savings_balance', 'debt_to_income_ratio',
+    'credit_score', 'existing_loans', 'loan_amount_requested', 'transaction_frequency',
+    'avg_monthly_expenses', 'credit_card_utilization', 'subscription_services',
+    'financial_emergencies_last_year', 'inflation_rate', 'customer_feedback_score',
+    'work_consistency', 'penalties', 'alternative_income_source', 'loan_coapplicant',
+    'urban_rural', 'avg_platform_tenure', 'family_dependents', 'cost_of_living_index'
+]
+CATEGORY_MAPS = {
+    'education_level': {'High School': 0, 'Graduate': 1, 'Postgraduate': 2},
+    'urban_rural': {'Urban': 1, 'Rural': 0},
+    'alternative_income_source': {'Yes': 1, 'No': 0},
+    'loan_coapplicant': {'Yes': 1, 'No': 0}
+}
+MODE_COLUMNS = ['urban_rural', 'family_dependents', 'education_level']
+# Columns summarised by quantile sketches when a plan is built from chunks
+QUANTILE_STATISTICS = ['monthly_income', 'work_experience', 'savings_balance', 'avg_monthly_expenses',
+                       'avg_platform_rating', 'credit_score', 'credit_score_zero_experience']
+# Raw columns a plan reads; everything else in the input frame is ignored
+INPUT_COLUMNS = BASE_FEATURES + ['reason_for_loan', 'platform_ratings']
+
+
+def yeo_johnson(x: np.ndarray, lmbda: float) -> np.ndarray:
+    """Yeo-Johnson power transform, as in sklearn's PowerTransformer."""
+    out = np.zeros_like(x, dtype=float)
+    pos = x >= 0
+    eps = np.spacing(1.0)
+    if abs(lmbda) < eps:
+        out[pos] = np.log1p(x[pos])
+    else:
+        out[pos] = (np.power(x[pos] + 1, lmbda) - 1) / lmbda
+    if abs(lmbda - 2) > eps:
+        out[~pos] = -(np.power(-x[~pos] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+    else:
+        out[~pos] = -np.log1p(-x[~pos])
+    return out
+
+
+def _encode(values: np.ndarray, mapping: dict, column: str) -> np.ndarray:
+    """Map category labels to codes; NaN stays NaN, unknown labels raise."""
+    codes = pd.Index(list(mapping)).get_indexer(values)
+    known = pd.isna(values) | (codes >= 0)
+    if not known.all():
+        raise ValueError(f"Unknown {column} values: {sorted(set(values[~known].astype(str)))}")
+    out = np.array(list(mapping.values()), dtype=float)[codes]
+    out[codes < 0] = np.nan
+    return out
+
+
+def _reason_categories(levels) -> list:
+    """reason_for_loan levels that get a dummy: pd.get_dummies(drop_first=True) drops the alphabetically first."""
+    return sorted(levels)[1:]
+
+
+def _feature_names(reason_categories: list, platforms: list) -> list:
+    names = BASE_FEATURES + [f'reason_for_loan_{r}' for r in reason_categories] + ['avg_platform_rating']
+    names += [f'platform_rating_{p}' for p in platforms]
+    names += [f'platform_on_{p}' for p in platforms]
+    return names
+
+
+def _fit_power_transform(credit: np.ndarray) -> dict:
+    """Yeo-Johnson lambda and standardisation fitted by sklearn's PowerTransformer."""
+    pt = PowerTransformer(method='yeo-johnson')
+    pt.fit(credit.reshape(-1, 1))
+    return {
+        'lambda': float(pt.lambdas_[0]),
+        'mean': float(pt._scaler.mean_[0]),
+        'scale': float(pt._scaler.scale_[0])
+    }
+
+
+class TransformPlan:
+    def __init__(self, medians: dict, modes: dict, reason_categories: list, feature_names: list, power_transform: dict,
+                 platforms: list = None):
+        """
+        Fitted preprocessing shared by training and serving.
+        :param medians: Imputation medians (monthly_income and work_experience are non-fraud medians).
+        :param modes: Imputation modes for categorical and count columns.
+        :param reason_categories: reason_for_loan levels that get a dummy column (first level dropped).
+        :param feature_names: Output column order expected by the model.
+        :param power_transform: Yeo-Johnson lambda and standardisation mean/scale for credit_score.
+        :param platforms: Platforms that get per-platform rating and presence columns (none by default).
+        """
+        self.medians = medians
+        self.modes = modes
+        self.reason_categories = reason_categories
+        self.feature_names = feature_names
+        self.power_transform = power_transform
+        self.platforms = platforms or []
+        self._index = {name: i for i, name in enumerate(feature_names)}
+
+    @staticmethod
+    def _fraud_mask(df: pd.DataFrame) -> np.ndarray:
+        """Applicants with no work experience and no reported income."""
+        return ((df['work_experience'] == 0) & df['monthly_income'].isnull()).to_numpy()
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, platform_features: bool = False) -> "TransformPlan":
+        """
+        Learn imputation statistics, category levels and the credit_score power transform from training rows.
+        :param platform_features: Add per-platform rating and presence columns for every platform seen.
+        """
+        fraud = cls._fraud_mask(df)
+        non_fraud = df.loc[~fraud]
+        medians = {
+            'monthly_income': float(non_fraud['monthly_income'].median()),
+            'work_experience': float(non_fraud['work_experience'].median()),
+            'savings_balance': float(df['savings_balance'].median()),
+            'avg_monthly_expenses': float(df['avg_monthly_expenses'].median())
+        }
+        modes = {col: df[col].mode()[0] for col in MODE_COLUMNS}
+        modes['family_dependents'] = float(modes['family_dependents'])
+        ratings = parse_platform_ratings(df['platform_ratings'], per_platform=platform_features)
+        medians['avg_platform_rating'] = float(np.nanmedian(ratings.average))
+
+        # credit_score median is taken after first-time applicants are set to -1
+        first_time = cls._first_time_mask(df, fraud, medians['work_experience'])
+        credit = df['credit_score'].to_numpy(dtype=float).copy()
+        credit[first_time] = -1
+        medians['credit_score'] = float(np.nanmedian(credit))
+        credit[np.isnan(credit)] = medians['credit_score']
+
+        power_transform = _fit_power_transform(credit)
+
+        reason_categories = _reason_categories(df['reason_for_loan'].dropna().unique().tolist())
+        feature_names = _feature_names(reason_categories, ratings.platforms)
+        return cls(medians, modes, reason_categories, feature_names, power_transform, ratings.platforms)
+
+    @staticmethod
+    def _first_time_mask(df: pd.DataFrame, fraud: np.ndarray, work_experience_median: float) -> np.ndarray:
+        """No work experience after imputation and no existing loans."""
+        work_experience = df['work_experience'].to_numpy(dtype=float)
+        if work_experience_median == 0:
+            zero_experience = fraud | (work_experience == 0) | np.isnan(work_experience)
+        else:
+            zero_experience = fraud
+        return zero_experience & (df['existing_loans'].to_numpy(dtype=float) == 0)
+
+    def transform(self, df: pd.DataFrame, timings: dict = None) -> np.ndarray:
+        """
+        Apply the plan to raw rows in a single pass.
+        :param timings: When given, seconds spent in the credit_score power transform are added under 'power_transform'.
+        :return: float32 matrix with columns in `feature_names` order.
+        """
+        n = len(df)
+        out = np.empty((n, len(self.feature_names)), dtype=np.float32)
+        col = self._index
+        fraud = self._fraud_mask(df)
+
+        def raw(name):
+            return df[name].to_numpy(dtype=float)
+
+        def fill(values, value):
+            return np.where(np.isnan(values), value, values)
+
+        for name in PASSTHROUGH_COLUMNS:
+            out[:, col[name]] = raw(name)
+
+        work_experience = fill(raw('work_experience'), self.medians['work_experience'])
+        work_experience[work_experience == 0] = self.medians['work_experience']
+        out[:, col['work_experience']] = np.where(fraud, raw('work_experience'), work_experience)
+
+        monthly_income = raw('monthly_income')
+        out[:, col['monthly_income']] = np.where(fraud, 0.0, fill(monthly_income, self.medians['monthly_income']))
+
+        first_time = self._first_time_mask(df, fraud, self.medians['work_experience'])
+        credit = fill(np.where(first_time, -1.0, raw('credit_score')), self.medians['credit_score'])
+        pt = self.power_transform
+        started = time.perf_counter()
+        out[:, col['credit_score']] = (yeo_johnson(credit, pt['lambda']) - pt['mean']) / pt['scale']
+        if timings is not None:
+            timings['power_transform'] = timings.get('power_transform', 0.0) + time.perf_counter() - started
+
+        out[:, col['savings_balance']] = np.log1p(fill(raw('savings_balance'), self.medians['savings_balance']))
+        out[:, col['avg_monthly_expenses']] = fill(raw('avg_monthly_expenses'), self.medians['avg_monthly_expenses'])
+        out[:, col['family_dependents']] = fill(raw('family_dependents'), self.modes['family_dependents'])
+        for name in ['existing_loans', 'loan_amount_requested', 'penalties', 'num_platforms']:
+            out[:, col[name]] = np.log1p(raw(name))
+
+        for name, mapping in CATEGORY_MAPS.items():
+            values = df[name].to_numpy(dtype=object)
+            if name in self.modes:
+                values = np.where(pd.isna(values), self.modes[name], values)
+            out[:, col[name]] = _encode(values, mapping, name)
+        out[:, col['loan_coapplicant']] = np.log1p(out[:, col['loan_coapplicant']])
+
+        reasons = df['reason_for_loan'].to_numpy(dtype=object)
+        for reason in self.reason_categories:
+            out[:, col[f'reason_for_loan_{reason}']] = reasons == reason
+
+        ratings = parse_platform_ratings(df['platform_ratings'], platforms=self.platforms or None,
+                                         per_platform=bool(self.platforms), fill_value=0.0)
+        out[:, col['avg_platform_rating']] = fill(ratings.average, self.medians['avg_platform_rating'])
+        if self.platforms:
+            first = col[f'platform_rating_{self.platforms[0]}']
+            out[:, first:first + len(self.platforms)] = ratings.ratings
+            first = col[f'platform_on_{self.platforms[0]}']
+            out[:, first:first + len(self.platforms)] = ratings.presence
+        return out
+
+    def transform_frame(self, df: pd.DataFrame, timings: dict = None) -> pd.DataFrame:
+        """Same as `transform`, labelled with the feature names."""
+        return pd.DataFrame(self.transform(df, timings), columns=self.feature_names)
+
+    def target(self, df: pd.DataFrame) -> pd.Series:
+        """loan_approved with suspected fraud cases forced to rejected."""
+        y = df['loan_approved'].to_numpy().copy()
+        y[self._fraud_mask(df)] = 0
+        return pd.Series(y.astype(int), name='loan_approved')
+
+    def to_dict(self) -> dict:
+        return {
+            'medians': self.medians,
+            'modes': self.modes,
+            'reason_categories': self.reason_categories,
+            'feature_names': self.feature_names,
+            'power_transform': self.power_transform,
+            'platforms': self.platforms
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransformPlan":
+        return cls(data['medians'], data['modes'], data['reason_categories'], data['feature_names'],
+                   data['power_transform'], data.get('platforms'))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str) -> "TransformPlan":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+
+class TransformPlanBuilder:
+    def __init__(self, platform_features: bool = False, sketch_k: int = 400, sample_rows: int = 100_000,
+                 seed: int = 0, quantile_sketch: str = "kll"):
+        """
+        Single-pass, mergeable version of TransformPlan.fit for data that arrives in chunks.
+        Medians come from quantile sketches, modes and category levels from exact counts,
+        and the credit_score power transform is fitted on a uniform reservoir sample.
+        :param sketch_k: Sketch accuracy: k for KLL (rank error about 1.7 / k), compression for t-digest.
+        :param sample_rows: Reservoir size for the power transform fit.
+        :param quantile_sketch: kll or tdigest.
+        """
+        if quantile_sketch not in QUANTILE_SKETCHES:
+            raise ValueError(f"Unknown quantile_sketch {quantile_sketch!r}; choose from {list(QUANTILE_SKETCHES)}")
+        self.platform_features = platform_features
+        self.rows = 0
+        self.quantiles = {name: QUANTILE_SKETCHES[quantile_sketch](sketch_k, seed) for name in QUANTILE_STATISTICS}
+        self.frequencies = {name: FrequencySketch() for name in MODE_COLUMNS + ['reason_for_loan']}
+        self.platforms = set()
+        # Columns: credit_score with first-time applicants at -1, for a non-zero and a zero
+        # work_experience median (which one applies is known only once all rows are seen)
+        self.credit_sample = ReservoirSample(sample_rows, n_columns=2, seed=seed)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunk_rows: int = 100_000, n_workers: int = 1,
+                   **kwargs) -> "TransformPlanBuilder":
+        """
+        Sketch an in-memory frame chunk by chunk, spreading the chunks over n_workers
+        processes and merging the partial builders.
+        :param kwargs: TransformPlanBuilder arguments.
+        """
+        seed = kwargs.pop('seed', 0)
+        chunks = [(df.iloc[start:start + chunk_rows], {**kwargs, 'seed': seed + i})
+                  for i, start in enumerate(range(0, len(df), chunk_rows))]
+        if n_workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(chunks))) as executor:
+                partials = list(executor.map(_build_chunk, chunks))
+        else:
+            partials = [_build_chunk(chunk) for chunk in chunks]
+        builder = partials[0]
+        for partial in partials[1:]:
+            builder.merge(partial)
+        return builder
+
+    def update(self, df: pd.DataFrame) -> "TransformPlanBuilder":
+        """Add a chunk of training rows."""
+        fraud = TransformPlan._fraud_mask(df)
+        q = self.quantiles
+        q['monthly_income'].update(df['monthly_income'].to_numpy(dtype=float)[~fraud])
+        q['work_experience'].update(df['work_experience'].to_numpy(dtype=float)[~fraud])
+        q['savings_balance'].update(df['savings_balance'].to_numpy(dtype=float))
+        q['avg_monthly_expenses'].update(df['avg_monthly_expenses'].to_numpy(dtype=float))
+
+        ratings = parse_platform_ratings(df['platform_ratings'], per_platform=self.platform_features)
+        q['avg_platform_rating'].update(ratings.average)
+        self.platforms.update(ratings.platforms)
+
+        for name, sketch in self.frequencies.items():
+            sketch.update(df[name].to_numpy(dtype=object))
+
+        credit = df['credit_score'].to_numpy(dtype=float)
+        credit_nonzero = np.where(TransformPlan._first_time_mask(df, fraud, 1.0), -1.0, credit)
+        credit_zero = np.where(TransformPlan._first_time_mask(df, fraud, 0.0), -1.0, credit)
+        q['credit_score'].update(credit_nonzero)
+        q['credit_score_zero_experience'].update(credit_zero)
+        self.credit_sample.update(np.column_stack([credit_nonzero, credit_zero]))
+        self.rows += len(df)
+        return self
+
+    def merge(self, other: "TransformPlanBuilder") -> "TransformPlanBuilder":
+        """Fold in a builder that saw other chunks (e.g. on another worker)."""
+        for name, sketch in self.quantiles.items():
+            sketch.merge(other.quantiles[name])
+        for name, sketch in self.frequencies.items():
+            sketch.merge(other.frequencies[name])
+        self.platforms |= other.platforms
+        self.credit_sample.merge(other.credit_sample)
+        self.rows += other.rows
+        return self
+
+    def finalize(self) -> TransformPlan:
+        """Turn the accumulated statistics into a TransformPlan."""
+        if self.rows == 0:
+            raise ValueError("TransformPlanBuilder has seen no rows")
+        q = self.quantiles
+        medians = {name: q[name].median() for name in
+                   ['monthly_income', 'work_experience', 'savings_balance', 'avg_monthly_expenses',
+                    'avg_platform_rating']}
+        zero_experience = medians['work_experience'] == 0
+        medians['credit_score'] = q['credit_score_zero_experience' if zero_experience else 'credit_score'].median()
+
+        modes = {name: self.frequencies[name].mode() for name in MODE_COLUMNS}
+        modes['family_dependents'] = float(modes['family_dependents'])
+
+        credit = self.credit_sample.rows[:, int(zero_experience)].copy()
+        credit[np.isnan(credit)] = medians['credit_score']
+        power_transform = _fit_power_transform(credit)
+
+        reason_categories = _reason_categories(list(self.frequencies['reason_for_loan'].counts))
+        platforms = sorted(self.platforms) if self.platform_features else []
+        return TransformPlan(medians, modes, reason_categories, _feature_names(reason_categories, platforms),
+                             power_transform, platforms)
+
+    def to_dict(self) -> dict:
+        return {
+            'platform_features': self.platform_features,
+            'rows': self.rows,
+            'quantiles': {name: sketch.to_dict() for name, sketch in self.quantiles.items()},
+            'frequencies': {name: sketch.to_dict() for name, sketch in self.frequencies.items()},
+            'platforms': sorted(self.platforms),
+            'credit_sample': self.credit_sample.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransformPlanBuilder":
+        builder = cls(platform_features=data['platform_features'])
+        builder.rows = data['rows']
+        builder.quantiles = {name: quantile_sketch_from_dict(sketch) for name, sketch in data['quantiles'].items()}
+        builder.frequencies = {name: FrequencySketch.from_dict(sketch) for name, sketch in data['frequencies'].items()}
+        builder.platforms = set(data['platforms'])
+        builder.credit_sample = ReservoirSample.from_dict(data['credit_sample'])
+        return builder
+
+    def save(self, path: str):
+        """Persist the sketch state next to the plan, so later data can be merged in."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "TransformPlanBuilder":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+
+def _build_chunk(task) -> TransformPlanBuilder:
+    """Process-pool worker of TransformPlanBuilder.from_frame."""
+    df, kwargs = task
+    return TransformPlanBuilder(**kwargs).update(df)
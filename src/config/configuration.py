@@ -1,27 +1,64 @@
+import os
 from src.utils.common import read_yaml, create_directories
 from src.entity.config_entity import (
     DataIngestionConfig, 
     DataPreprocessingConfig, 
     ModelBuildingConfig, 
+    ModelTuningConfig,
     ModelEvaluationConfig, 
     DriftDetectionConfig,  
-    MlflowConfig
+    MlflowConfig,
+    PredictionConfig,
+    ServingConfig,
+    TrafficCaptureConfig,
+    DriftScheduleConfig,
+    MetricsCollectorConfig,
+    ProfilingConfig,
+    CacheConfig
 )
-from src.constants import CONFIG_FILE_PATH
+from src.constants import CONFIG_FILE_PATH, ARTIFACT_EXTENSIONS
 from src.utils.logger import logger
 
+# Config entries naming data artifacts stored in `artifact_format`
+DATA_FILE_KEYS = {
+    'data_ingestion': ('data_file',),
+    'data_preprocessing': ('raw_data_file', 'train_data_file', 'test_data_file'),
+    'drift_detection': ('train_data_file', 'test_data_file'),
+}
+
 
 class ConfigurationManager:
     def __init__(self):
         logger.info("Reading configuration file...")
         self.config = read_yaml(str(CONFIG_FILE_PATH))
         create_directories([self.config['artifacts_dir']])
+        self._apply_artifact_format()
+
+    def _apply_artifact_format(self):
+        """
+        Give the data file paths the extension of `artifact_format`, so switching the format
+        in config.yaml cannot leave a path whose extension names a different one.
+        """
+        artifact_format = self.config['artifact_format']
+        if artifact_format not in ARTIFACT_EXTENSIONS:
+            raise ValueError(f"Unsupported artifact format: {artifact_format}; "
+                             f"expected one of {', '.join(ARTIFACT_EXTENSIONS)}")
+        for section, keys in DATA_FILE_KEYS.items():
+            for key in keys:
+                path = self.config[section][key]
+                self.config[section][key] = os.path.splitext(path)[0] + ARTIFACT_EXTENSIONS[artifact_format]
     
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         di_config = self.config['data_ingestion']
         return DataIngestionConfig(
             root_dir=di_config['root_dir'],
-            data_file=di_config['data_file']
+            data_file=di_config['data_file'],
+            n_samples=di_config['n_samples'],
+            chunk_size=di_config['chunk_size'],
+            seed=di_config['seed'],
+            num_workers=di_config['num_workers'],
+            shards_dir=di_config['shards_dir'],
+            artifact_format=self.config['artifact_format']
         )
     
     def get_data_preprocessing_config(self) -> DataPreprocessingConfig:
@@ -31,7 +68,22 @@ class ConfigurationManager:
             raw_data_file=dp_config['raw_data_file'],
             train_data_file=dp_config['train_data_file'],
             test_data_file=dp_config['test_data_file'],
-            transformer_name=dp_config['transformer_name']
+            plan_name=dp_config['plan_name'],
+            platform_features=dp_config.get('platform_features', False),
+            artifact_format=self.config['artifact_format'],
+            training_mode=dp_config.get('training_mode', 'in_memory'),
+            test_fraction=dp_config.get('test_fraction', 0.2),
+            stream_chunk_rows=dp_config.get('stream_chunk_rows', 100000),
+            sketch_k=dp_config.get('sketch_k', 400),
+            power_transform_sample_rows=dp_config.get('power_transform_sample_rows', 100000),
+            imputation_statistics=dp_config.get('imputation_statistics', 'sketch'),
+            quantile_sketch=dp_config.get('quantile_sketch', 'kll'),
+            sketch_workers=dp_config.get('sketch_workers', 1),
+            plan_sketches_name=dp_config.get('plan_sketches_name', 'transform_plan_sketches.json'),
+            rebalance=dp_config.get('rebalance', 'smote'),
+            smote_subset_rows=dp_config.get('smote_subset_rows', 20000),
+            smote_k_neighbors=dp_config.get('smote_k_neighbors', 5),
+            rebalance_stats_name=dp_config.get('rebalance_stats_name', 'rebalance_stats.json')
         )
     
     def get_model_building_config(self) -> ModelBuildingConfig:
@@ -39,7 +91,40 @@ class ConfigurationManager:
         return ModelBuildingConfig(
             model_dir=mb_config['model_dir'],
             model_params=mb_config['model_params'],
-            model_name=mb_config['model_name']
+            model_name=mb_config['model_name'],
+            backend=mb_config.get('backend', 'random_forest'),
+            n_jobs=mb_config.get('n_jobs', -1),
+            warm_start=mb_config.get('warm_start', False),
+            warm_start_increment=mb_config.get('warm_start_increment', 20),
+            hist_params=mb_config.get('hist_params', {'max_iter': 200, 'learning_rate': 0.1, 'max_leaf_nodes': 31,
+                                                      'early_stopping': 'auto', 'random_state': 42}),
+            training_stats_name=mb_config.get('training_stats_name', 'training_stats.json'),
+            # data_preprocessing.rebalance: class_weight weights the classes in the model instead of resampling
+            class_weight='balanced' if self.config['data_preprocessing'].get('rebalance') == 'class_weight' else None
+        )
+    
+    def get_model_tuning_config(self) -> ModelTuningConfig:
+        mt_config = self.config['model_tuning']
+        dp_config = self.config['data_preprocessing']
+        return ModelTuningConfig(
+            enabled=mt_config.get('enabled', False),
+            root_dir=mt_config['root_dir'],
+            storage=mt_config['storage'],
+            study_name=mt_config['study_name'],
+            best_params_name=mt_config['best_params_name'],
+            n_trials=mt_config['n_trials'],
+            n_workers=mt_config['n_workers'],
+            cv_folds=mt_config['cv_folds'],
+            scoring=mt_config['scoring'],
+            seed=mt_config['seed'],
+            min_trees=mt_config['min_trees'],
+            reduction_factor=mt_config['reduction_factor'],
+            search_space=mt_config['search_space'],
+            # Each training fold is rebalanced as data_preprocessing rebalances the training set
+            rebalance=dp_config.get('rebalance', 'smote'),
+            smote_subset_rows=dp_config.get('smote_subset_rows', 20000),
+            smote_k_neighbors=dp_config.get('smote_k_neighbors', 5),
+            class_weight='balanced' if dp_config.get('rebalance') == 'class_weight' else None
         )
     
     def get_model_evaluation_config(self) -> ModelEvaluationConfig:
@@ -47,7 +132,9 @@ class ConfigurationManager:
         return ModelEvaluationConfig(
             model_dir=me_config['model_dir'],
             metrics_dir=me_config['metrics_dir'],
-            metrics_name=me_config['metrics_name']
+            metrics_name=me_config['metrics_name'],
+            training_stats_file=me_config.get('training_stats_file', 'artifacts/model/training_stats.json'),
+            rebalance_stats_file=me_config.get('rebalance_stats_file', 'artifacts/model/rebalance_stats.json')
         )
     
     def get_model_drift_config(self) -> DriftDetectionConfig:
@@ -56,7 +143,21 @@ class ConfigurationManager:
             drift_dir=md_config['drift_dir'],
             train_data_file=md_config['train_data_file'],
             test_data_file=md_config['test_data_file'],
-            drift_name=md_config['drift_name']
+            drift_name=md_config['drift_name'],
+            artifact_format=self.config['artifact_format'],
+            profile_name=md_config.get('profile_name', 'reference_profile.json'),
+            profile_bins=md_config.get('profile_bins', 10),
+            psi_threshold=md_config.get('psi_threshold', 0.2),
+            drift_share_threshold=md_config.get('drift_share_threshold', 0.5),
+            min_current_rows=md_config.get('min_current_rows', 100),
+            current_source=md_config.get('current_source', 'traffic'),
+            engine=md_config.get('engine', 'native'),
+            hist_bins=md_config.get('hist_bins', 1000),
+            small_sample_rows=md_config.get('small_sample_rows', 1000),
+            p_value_threshold=md_config.get('p_value_threshold', 0.05),
+            wasserstein_threshold=md_config.get('wasserstein_threshold', 0.1),
+            n_workers=md_config.get('n_workers', 1),
+            shared_dir=md_config.get('shared_dir')
         )
     
     def get_mlflow_config(self) -> MlflowConfig:
@@ -64,7 +165,83 @@ class ConfigurationManager:
         return MlflowConfig( metrics_dir=ml_config['metrics_dir'],
                              model_name=ml_config['model_name'],
                              model_dir=ml_config['model_dir'],
-                             tracking=ml_config['tracking']
+                             tracking=ml_config['tracking'],
+                             plan_files=ml_config.get('plan_files', ['artifacts/model/transform_plan.json',
+                                                                     'artifacts/model/transform_plan_sketches.json'])
+        )
+    
+    def get_prediction_config(self) -> PredictionConfig:
+        pr_config = self.config['prediction']
+        return PredictionConfig(
+            batch_chunk_size=pr_config['batch_chunk_size'],
+            max_batch_rows=pr_config['max_batch_rows'],
+            model_version=str(pr_config.get('model_version', 'latest')),
+            reload_interval=pr_config.get('reload_interval', 300),
+            engine=pr_config.get('engine', 'compiled'),
+            compiled_max_rows=pr_config.get('compiled_max_rows', 512)
+        )
+
+    def get_serving_config(self) -> ServingConfig:
+        sv_config = self.config.get('serving', {})
+        return ServingConfig(
+            bind=sv_config.get('bind', '0.0.0.0:1417'),
+            workers=sv_config.get('workers', 2),
+            threads=sv_config.get('threads', 4),
+            timeout=sv_config.get('timeout', 120),
+            graceful_timeout=sv_config.get('graceful_timeout', 30),
+            keepalive=sv_config.get('keepalive', 5),
+            max_requests=sv_config.get('max_requests', 0),
+            max_requests_jitter=sv_config.get('max_requests_jitter', 0),
+            prometheus_multiproc_dir=sv_config.get('prometheus_multiproc_dir', '/tmp/prometheus-multiproc'),
+            state_dir=sv_config.get('state_dir', '/tmp/gigloan-serving')
+        )
+    
+    def get_traffic_capture_config(self) -> TrafficCaptureConfig:
+        tc_config = self.config.get('traffic_capture', {})
+        return TrafficCaptureConfig(
+            enabled=tc_config.get('enabled', True),
+            traffic_dir=tc_config.get('traffic_dir', 'artifacts/traffic'),
+            segment_rows=tc_config.get('segment_rows', 5000),
+            flush_interval=tc_config.get('flush_interval', 30),
+            max_segments=tc_config.get('max_segments', 200),
+            max_queue_batches=tc_config.get('max_queue_batches', 1000),
+            window_rows=tc_config.get('window_rows', 5000),
+            window_mode=tc_config.get('window_mode', 'sliding')
+        )
+
+    def get_drift_schedule_config(self) -> DriftScheduleConfig:
+        ds_config = self.config.get('drift_schedule', {})
+        return DriftScheduleConfig(
+            enabled=ds_config.get('enabled', True),
+            interval_seconds=ds_config.get('interval_seconds', 3600),
+            new_rows_trigger=ds_config.get('new_rows_trigger', 5000),
+            poll_seconds=ds_config.get('poll_seconds', 5),
+            run_on_start=ds_config.get('run_on_start', False)
+        )
+
+    def get_metrics_collector_config(self) -> MetricsCollectorConfig:
+        mc_config = self.config.get('metrics_collector', {})
+        return MetricsCollectorConfig(
+            interval_seconds=mc_config.get('interval_seconds', 5)
+        )
+
+    def get_profiling_config(self) -> ProfilingConfig:
+        pf_config = self.config.get('profiling', {})
+        return ProfilingConfig(
+            enabled=pf_config.get('enabled', True),
+            report_dir=pf_config.get('report_dir', 'artifacts/metrics'),
+            report_name=pf_config.get('report_name', 'run_report.json'),
+            log_to_mlflow=pf_config.get('log_to_mlflow', True),
+            cprofile_stages=pf_config.get('cprofile_stages') or [],
+            cprofile_dir=pf_config.get('cprofile_dir', 'artifacts/profiles'),
+            cprofile_top=pf_config.get('cprofile_top', 25)
+        )
+
+    def get_cache_config(self) -> CacheConfig:
+        cache_config = self.config.get('cache', {})
+        return CacheConfig(
+            cache_dir=cache_config.get('cache_dir', 'artifacts/cache'),
+            enabled=cache_config.get('enabled', True)
         )
     
     def get_aws_config(self) -> dict:
@@ -1,3 +1,87 @@
 from pathlib import Path
 
 CONFIG_FILE_PATH = Path("config/config.yaml")
+
+# Raw applicant fields expected by the prediction endpoints, with the type
+# each one is cast to before preprocessing.
+PREDICTION_INPUT_SCHEMA = {
+    'age': int,
+    'education_level': str,
+    'num_platforms': float,
+    'work_experience': float,
+    'monthly_income': float,
+    'seasonal_variation': float,
+    'income_volatility': int,
+    'savings_balance': float,
+    'debt_to_income_ratio': float,
+    'credit_score': int,
+    'existing_loans': float,
+    'loan_amount_requested': float,
+    'transaction_frequency': int,
+    'avg_monthly_expenses': float,
+    'credit_card_utilization': int,
+    'subscription_services': int,
+    'financial_emergencies_last_year': int,
+    'inflation_rate': float,
+    'customer_feedback_score': float,
+    'work_consistency': int,
+    'penalties': float,
+    'alternative_income_source': str,
+    'loan_coapplicant': str,
+    'urban_rural': str,
+    'avg_platform_tenure': float,
+    'family_dependents': int,
+    'cost_of_living_index': float,
+    'reason_for_loan': str,
+    'platform_ratings': str
+}
+
+# Storage dtypes for the raw applicant data and the train/test splits.
+# Numerics are stored as float32 (integer columns carry NaNs), categoricals
+# with fixed levels where the generator defines them.
+RAW_DATA_DTYPES = {
+    'applicant_id': 'int64',
+    'age': 'float32',
+    'education_level': 'category',
+    'gig_platforms': 'category',
+    'num_platforms': 'float32',
+    'work_experience': 'float32',
+    'monthly_income': 'float32',
+    'seasonal_variation': 'float32',
+    'income_volatility': 'float32',
+    'savings_balance': 'float32',
+    'debt_to_income_ratio': 'float32',
+    'credit_score': 'float32',
+    'existing_loans': 'float32',
+    'loan_amount_requested': 'float32',
+    'transaction_frequency': 'float32',
+    'avg_monthly_expenses': 'float32',
+    'credit_card_utilization': 'float32',
+    'subscription_services': 'float32',
+    'financial_emergencies_last_year': 'float32',
+    'inflation_rate': 'float32',
+    'reason_for_loan': 'category',
+    'platform_ratings': 'object',
+    'customer_feedback_score': 'float32',
+    'work_consistency': 'float32',
+    'penalties': 'float32',
+    'alternative_income_source': 'category',
+    'loan_coapplicant': 'category',
+    'location': 'category',
+    'urban_rural': 'category',
+    'avg_platform_tenure': 'float32',
+    'family_dependents': 'float32',
+    'cost_of_living_index': 'float32',
+    'loan_approved': 'int8'
+}
+CATEGORY_LEVELS = {
+    'education_level': ['High School', 'Graduate', 'Postgraduate'],
+    'reason_for_loan': ['Business Expansion', 'Debt Consolidation', 'Education', 'Home Renovation',
+                        'Medical Emergency', 'Other', 'Vehicle Purchase'],
+    'alternative_income_source': ['No', 'Yes'],
+    'loan_coapplicant': ['No', 'Yes'],
+    'location': ['Bihar', 'Delhi', 'Gujarat', 'Karnataka', 'Maharashtra', 'Rajasthan', 'Tamil Nadu',
+                 'Telangana', 'Uttar Pradesh', 'West Bengal'],
+    'urban_rural': ['Rural', 'Urban']
+}
+ARTIFACT_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
@@ -1,11 +1,17 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 @dataclass(frozen=True)
 class DataIngestionConfig:
     root_dir: Path
     data_file: Path
+    n_samples: int
+    chunk_size: int
+    seed: int
+    num_workers: int
+    shards_dir: Path
+    artifact_format: str
 
 @dataclass(frozen=True)
 class DataPreprocessingConfig:
@@ -13,19 +19,63 @@ class DataPreprocessingConfig:
     raw_data_file: Path
     train_data_file: Path
     test_data_file: Path
-    transformer_name: str
+    plan_name: str
+    platform_features: bool
+    artifact_format: str
+    training_mode: str
+    test_fraction: float
+    stream_chunk_rows: int
+    sketch_k: int
+    power_transform_sample_rows: int
+    imputation_statistics: str
+    quantile_sketch: str
+    sketch_workers: int
+    plan_sketches_name: str
+    rebalance: str
+    smote_subset_rows: int
+    smote_k_neighbors: int
+    rebalance_stats_name: str
 
 @dataclass(frozen=True)
 class ModelBuildingConfig:
       model_dir: str
       model_params: Dict[str, Optional[Any]]
       model_name: str
+      backend: str
+      n_jobs: int
+      warm_start: bool
+      warm_start_increment: int
+      hist_params: Dict[str, Any]
+      training_stats_name: str
+      class_weight: Optional[str]
+
+@dataclass(frozen=True)
+class ModelTuningConfig:
+    enabled: bool
+    root_dir: Path
+    storage: Path
+    study_name: str
+    best_params_name: str
+    n_trials: int
+    n_workers: int
+    cv_folds: int
+    scoring: str
+    seed: int
+    min_trees: int
+    reduction_factor: int
+    search_space: Dict[str, Any]
+    rebalance: str
+    smote_subset_rows: int
+    smote_k_neighbors: int
+    class_weight: Optional[str]
 
 @dataclass(frozen=True)
 class ModelEvaluationConfig:
       model_dir: Path
       metrics_dir: str
       metrics_name: str
+      training_stats_file: Path
+      rebalance_stats_file: Path
 
 @dataclass(frozen=True)
 class MlflowConfig:
@@ -33,10 +83,85 @@ class MlflowConfig:
     model_dir: Path
     model_name: str
     tracking: Dict[str, Any]
+    plan_files: List[str]
 
 @dataclass(frozen=True)
 class DriftDetectionConfig:
     drift_dir: str
     train_data_file: Path
     test_data_file: Path
-    drift_name: str
\ No newline at end of file
+    drift_name: str
+    artifact_format: str
+    profile_name: str
+    profile_bins: int
+    psi_threshold: float
+    drift_share_threshold: float
+    min_current_rows: int
+    current_source: str
+    engine: str
+    hist_bins: int
+    small_sample_rows: int
+    p_value_threshold: float
+    wasserstein_threshold: float
+    n_workers: int
+    shared_dir: str
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    batch_chunk_size: int
+    max_batch_rows: int
+    model_version: str
+    reload_interval: int
+    engine: str
+    compiled_max_rows: int
+
+@dataclass(frozen=True)
+class ServingConfig:
+    bind: str
+    workers: int
+    threads: int
+    timeout: int
+    graceful_timeout: int
+    keepalive: int
+    max_requests: int
+    max_requests_jitter: int
+    prometheus_multiproc_dir: Path
+    state_dir: Path
+
+@dataclass(frozen=True)
+class TrafficCaptureConfig:
+    enabled: bool
+    traffic_dir: Path
+    segment_rows: int
+    flush_interval: float
+    max_segments: int
+    max_queue_batches: int
+    window_rows: int
+    window_mode: str
+
+@dataclass(frozen=True)
+class DriftScheduleConfig:
+    enabled: bool
+    interval_seconds: float
+    new_rows_trigger: int
+    poll_seconds: float
+    run_on_start: bool
+
+@dataclass(frozen=True)
+class MetricsCollectorConfig:
+    interval_seconds: float
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    enabled: bool
+    report_dir: Path
+    report_name: str
+    log_to_mlflow: bool
+    cprofile_stages: list
+    cprofile_dir: Path
+    cprofile_top: int
+
+@dataclass(frozen=True)
+class CacheConfig:
+    cache_dir: Path
+    enabled: bool
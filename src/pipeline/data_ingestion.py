@@ -14,8 +14,9 @@ class DataIngestionPipeline:
             config_manager = ConfigurationManager()
             di_config = config_manager.get_data_ingestion_config()
             data_ingestor = DataIngestion(di_config)
-            data_ingestor.generate_synthetic_data()
+            data_file = data_ingestor.generate_synthetic_data()
             logger.info("Data Ingestion complete.")
+            return data_file
 
         except Exception as e:
             logger.error("Data Ingestion failed.")
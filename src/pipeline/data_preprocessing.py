@@ -9,15 +9,24 @@ class DataPreprocessingPipeline:
         pass
 
     def main(self):
+        """
+        :return: (X_train, y_train, X_test, y_test, train_rows) in memory, or the split summary
+            from preprocess_stream when training_mode is streaming.
+        """
         try:
             config_manager = ConfigurationManager()
             dp_config = config_manager.get_data_preprocessing_config()
             data_preprocessor = DataPreprocessing(dp_config)
             raw_data = dp_config.raw_data_file
+            if dp_config.training_mode == "streaming":
+                # Splits and plan go to disk; model stages read them back chunk by chunk
+                summary = data_preprocessor.preprocess_stream(raw_data)
+                logger.info("Data preprocessing complete.")
+                return summary
             # Preprocess the full dataset using complete pipeline that returns train/test splits
-            X_train, y_train, X_test, y_test = data_preprocessor.preprocess_pipeline(raw_data)
+            X_train, y_train, X_test, y_test, train_rows = data_preprocessor.preprocess_pipeline(raw_data)
             logger.info("Data preprocessing complete.")
-            return X_train, y_train, X_test, y_test
+            return X_train, y_train, X_test, y_test, train_rows
 
         except Exception as e:
             logger.error("Data preprocessing failed.")
@@ -1,7 +1,9 @@
 from src.components.drift_detection import DriftDetection
 from src.config.configuration import ConfigurationManager
+from src.constants import PREDICTION_INPUT_SCHEMA
+from src.components.traffic_recorder import TrafficRecorder
+from src.utils.common import load_frame, apply_schema
 from src.utils.logger import logger
-import pandas as pd
 
 STAGE_NAME = "Drift Detection stage"
 
@@ -17,8 +19,19 @@ class DriftDetectionPipeline:
             drift_detection = DriftDetection(md_config)
             
             # Read reference and current datasets
-            ref_data = pd.read_csv(str(md_config.train_data_file))
-            current_data = pd.read_csv(str(md_config.test_data_file))
+            ref_data = load_frame(md_config.train_data_file, md_config.artifact_format)
+            current_data = None
+            if md_config.current_source == "traffic":
+                traffic = TrafficRecorder(config_manager.get_traffic_capture_config()).window()
+                if len(traffic) >= md_config.min_current_rows:
+                    # Compare the request fields only, with the training storage dtypes
+                    columns = [col for col in ref_data.columns if col in PREDICTION_INPUT_SCHEMA and col in traffic.columns]
+                    ref_data, current_data = ref_data[columns], apply_schema(traffic[columns])
+                    logger.info(f"Drift of {len(current_data)} captured scoring rows against the training split")
+                else:
+                    logger.info(f"Only {len(traffic)} captured scoring rows; comparing the test split instead")
+            if current_data is None:
+                current_data = load_frame(md_config.test_data_file, md_config.artifact_format)
             
             # Run drift detection
             drift_report = drift_detection.run_drift_detection(ref_data, current_data)
@@ -26,4 +39,5 @@ class DriftDetectionPipeline:
             return  drift_report
         
         except Exception as e:
-            logger.error(f"Error during drift detection: {e}")
\ No newline at end of file
+            logger.error(f"Error during drift detection: {e}")
+            raise e
@@ -0,0 +1,25 @@
+from src.components.drift_monitor import DriftMonitor
+from src.config.configuration import ConfigurationManager
+from src.utils.logger import logger
+
+
+class DriftMonitorPipeline:
+    def __init__(self):
+        pass
+
+    def main(self, state_dir=None) -> DriftMonitor:
+        """
+        Build the running drift monitor once per process, with the latest reference profile.
+        :param state_dir: Directory the worker processes share their running counts through; None for a single process.
+        """
+        try:
+            config_manager = ConfigurationManager()
+            md_config = config_manager.get_model_drift_config()
+            monitor = DriftMonitor(md_config, state_dir=state_dir)
+            if not monitor.refresh():
+                logger.info("No drift reference profile yet; drift monitoring starts after the next training run.")
+            return monitor
+
+        except Exception as e:
+            logger.error("Drift monitor setup failed.")
+            raise e
@@ -0,0 +1,22 @@
+from src.components.drift_monitor import DriftProfiling
+from src.config.configuration import ConfigurationManager
+from src.utils.logger import logger
+
+STAGE_NAME = "Drift Profile stage"
+
+class DriftProfilePipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        """Build the drift reference profile from the training split; returns its row count."""
+        try:
+            config_manager = ConfigurationManager()
+            md_config = config_manager.get_model_drift_config()
+            profile = DriftProfiling(md_config).build_profile()
+            logger.info("Drift profile complete.")
+            return profile.rows
+
+        except Exception as e:
+            logger.error("Drift profile failed.")
+            raise e
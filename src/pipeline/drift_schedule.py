@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+from src.components.drift_detection import DriftDetection
+from src.config.configuration import ConfigurationManager
+from src.pipeline.drift_detection import DriftDetectionPipeline
+from src.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process runs its own schedule
+    fcntl = None
+
+
+class DriftScheduler:
+    def __init__(self, registry, drift_gauge, drift_gauges: dict):
+        """
+        Reruns the full drift report on a background thread, every interval_seconds or once
+        new_rows_trigger scored rows have arrived since the last run, whichever comes first.
+        Each run saves the report (atomically) and publishes the drift gauges once, so /drift
+        and /metrics only read the cached result.
+        When several worker processes serve the app, the one holding the scheduler lock file
+        runs the reports; the others forward run requests (and row triggers) to it through a
+        request file and republish its report whenever the file on disk changes.
+        :param registry: Prometheus registry of the drift gauges.
+        :param drift_gauge: Labelled gauge of the overall drift share.
+        :param drift_gauges: Per-column gauges, created on first use.
+        """
+        config_manager = ConfigurationManager()
+        self.config = config_manager.get_drift_schedule_config()
+        self.drift_detection = DriftDetection(config_manager.get_model_drift_config())
+        self.report_path = os.path.join(self.drift_detection.config.drift_dir, self.drift_detection.config.drift_name)
+        self.lock_path = os.path.join(self.drift_detection.config.drift_dir, ".drift-scheduler.lock")
+        self.request_path = os.path.join(self.drift_detection.config.drift_dir, ".drift-run-requested")
+        self.registry, self.drift_gauge, self.drift_gauges = registry, drift_gauge, drift_gauges
+        self.latest: Optional[dict] = None
+        self.generation = 0
+        self.last_run: Optional[float] = None
+        # mtime of the report file this scheduler last wrote or loaded
+        self.report_mtime: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.rows_since_run = 0
+        self.running = False
+        self._last_attempt: Optional[float] = None
+        self._requested = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_file = None
+
+    def load_saved(self):
+        """Serve and publish the report left on disk by an earlier run until the first run here."""
+        if not os.path.exists(self.report_path):
+            return
+        with open(self.report_path, "r") as f:
+            report = json.load(f)
+        self._install(report, os.path.getmtime(self.report_path))
+
+    def _install(self, report: dict, finished_at: float):
+        self.drift_detection.publish_drift_metrics(report, self.registry, self.drift_gauge, self.drift_gauges)
+        report_mtime = os.path.getmtime(self.report_path) if os.path.exists(self.report_path) else None
+        with self._lock:
+            self.report_mtime = report_mtime
+            self.latest = report
+            self.generation += 1
+            self.last_run = finished_at
+            self._last_attempt = max(self._last_attempt or 0.0, finished_at)
+
+    def notify_rows(self, rows: int):
+        """Count newly scored rows; wakes the scheduler once new_rows_trigger is reached."""
+        with self._lock:
+            self.rows_since_run += rows
+            due = self.config.new_rows_trigger and self.rows_since_run >= self.config.new_rows_trigger
+        if due:
+            self._wake.set()
+
+    def request_run(self):
+        """Ask for a run as soon as possible, e.g. after a new model and reference are registered."""
+        with self._lock:
+            self._requested = True
+        self._wake.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.config.enabled,
+                "generation": self.generation,
+                "last_run": self.last_run,
+                "last_duration": self.last_duration,
+                "last_error": self.last_error,
+                "running": self.running,
+                "leader": self._lock_file is not None,
+                "rows_since_run": self.rows_since_run,
+                "interval_seconds": self.config.interval_seconds,
+                "new_rows_trigger": self.config.new_rows_trigger
+            }
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread is not None or not self.config.enabled:
+            return
+        self._thread = threading.Thread(target=self._loop, name="drift-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _lead(self) -> bool:
+        """Whether this process runs the reports: it holds (or now takes) the scheduler lock file."""
+        if self._lock_file is not None or fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held until the process exits; another worker takes over on its next poll
+        self._lock_file = lock_file
+        logger.info(f"Drift scheduler lock taken by process {os.getpid()}")
+        return True
+
+    def _follow(self):
+        """Forward a due run to the leading process and publish its latest report."""
+        with self._lock:
+            forward = self._requested or bool(
+                self.config.new_rows_trigger and self.rows_since_run >= self.config.new_rows_trigger)
+            if forward:
+                self._requested = False
+                self.rows_since_run = 0
+        if forward:
+            open(self.request_path, "a").close()
+        if os.path.exists(self.report_path) and os.path.getmtime(self.report_path) != self.report_mtime:
+            self.load_saved()
+
+    def _due(self) -> bool:
+        with self._lock:
+            if self._requested:
+                return True
+            if self.config.new_rows_trigger and self.rows_since_run >= self.config.new_rows_trigger:
+                return True
+            last_attempt = self._last_attempt
+        if os.path.exists(self.request_path):
+            return True
+        if last_attempt is None:
+            return self.config.run_on_start
+        return time.time() - last_attempt >= self.config.interval_seconds
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if not self._lead():
+                    self._follow()
+                elif self._due():
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"Drift scheduler error: {e}")
+            self._wake.wait(timeout=self.config.poll_seconds)
+            self._wake.clear()
+
+    def run_once(self):
+        """Run the drift report now (on the calling thread) and publish it; failures keep the last report."""
+        with self._lock:
+            self._requested = False
+            rows_seen = self.rows_since_run
+            self.running = True
+        started = time.time()
+        self._last_attempt = started
+        try:
+            if os.path.exists(self.request_path):
+                os.remove(self.request_path)
+            report = DriftDetectionPipeline().main()
+            self._install(report, time.time())
+            with self._lock:
+                self.rows_since_run -= rows_seen
+                self.last_error = None
+            logger.info(f"Scheduled drift report {self.generation} published in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Scheduled drift detection failed: {e}")
+            with self._lock:
+                # Retry at the next interval rather than spinning on the row trigger
+                self.rows_since_run = 0
+                self.last_error = str(e)
+        finally:
+            with self._lock:
+                self.running = False
+                self.last_duration = time.time() - started
+
+
+class DriftSchedulePipeline:
+    def __init__(self):
+        pass
+
+    def main(self, registry, drift_gauge, drift_gauges: dict, start: bool = True) -> DriftScheduler:
+        """
+        Build the drift scheduler once per process, publish the saved report and start the thread.
+        :param start: False to leave starting the thread to the caller (e.g. after a fork).
+        """
+        try:
+            scheduler = DriftScheduler(registry, drift_gauge, drift_gauges)
+            try:
+                scheduler.load_saved()
+            except Exception as e:
+                logger.error(f"Saved drift report could not be published: {e}")
+            if start:
+                scheduler.start()
+            logger.info(f"Drift scheduler {'ready' if scheduler.config.enabled else 'disabled'}.")
+            return scheduler
+
+        except Exception as e:
+            logger.error("Drift scheduler setup failed.")
+            raise e
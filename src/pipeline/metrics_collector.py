@@ -0,0 +1,103 @@
+import os
+import threading
+import psutil
+from prometheus_client import Gauge
+from src.config.configuration import ConfigurationManager
+from src.components.drift_detection import DriftDetection
+from src.utils.logger import logger
+from src.utils.serving_metrics import GAUGE_MULTIPROCESS_MODE
+
+
+class MetricsCollector:
+    def __init__(self, registry, drift_gauge, drift_gauges: dict, drift_monitor, drift_scheduler):
+        """
+        Refreshes the system and drift gauges on a background thread every interval_seconds,
+        so a Prometheus scrape of /metrics only serializes the registry.
+        CPU usage is the non-blocking psutil reading since the previous collection. The
+        full-report drift gauges are reloaded from drift.json only when the file changes
+        outside the drift scheduler (which publishes its own runs).
+        :param drift_monitor: DriftMonitor whose running PSI is exported per column.
+        :param drift_scheduler: DriftScheduler, to recognise report files it already published.
+        """
+        config_manager = ConfigurationManager()
+        self.config = config_manager.get_metrics_collector_config()
+        self.drift_detection = DriftDetection(config_manager.get_model_drift_config())
+        self.report_path = os.path.join(self.drift_detection.config.drift_dir, self.drift_detection.config.drift_name)
+        self.registry, self.drift_gauge, self.drift_gauges = registry, drift_gauge, drift_gauges
+        self.drift_monitor = drift_monitor
+        self.drift_scheduler = drift_scheduler
+        self.cpu_usage_gauge = Gauge('system_cpu_usage_percent', 'System CPU usage percent', registry=registry,
+                                     multiprocess_mode=GAUGE_MULTIPROCESS_MODE)
+        self.memory_usage_gauge = Gauge('system_memory_usage_percent', 'System memory usage percent',
+                                        registry=registry, multiprocess_mode=GAUGE_MULTIPROCESS_MODE)
+        self.running_drift_gauge = Gauge('running_drift_psi', 'PSI of scored traffic against the training reference',
+                                         ['column'], registry=registry, multiprocess_mode=GAUGE_MULTIPROCESS_MODE)
+        self.report_mtime = None
+        self._stop = threading.Event()
+        self._thread = None
+        # The first cpu_percent(None) call only sets the baseline
+        psutil.cpu_percent(interval=None)
+
+    def collect(self):
+        """Refresh every gauge once."""
+        self.cpu_usage_gauge.set(psutil.cpu_percent(interval=None))
+        self.memory_usage_gauge.set(psutil.virtual_memory().percent)
+
+        if os.path.exists(self.report_path):
+            mtime = os.path.getmtime(self.report_path)
+            if mtime != self.report_mtime:
+                if mtime != self.drift_scheduler.report_mtime:
+                    self.drift_detection.update_drift_metrics(self.registry, self.drift_gauge, self.drift_gauges)
+                self.report_mtime = mtime
+
+        # Pick up a profile trained by another worker and share this worker's running counts
+        self.drift_monitor.refresh()
+        self.drift_monitor.share()
+        if self.drift_monitor.profile is not None:
+            running = self.drift_monitor.snapshot()
+            self.drift_gauge.labels(metric="running_drift_share").set(running["drift_share"])
+            for column, details in running["columns"].items():
+                self.running_drift_gauge.labels(column=column).set(details["psi"])
+
+    def start(self):
+        """Start the collector thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="metrics-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.collect()
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {e}")
+            self._stop.wait(self.config.interval_seconds)
+
+
+class MetricsCollectorPipeline:
+    def __init__(self):
+        pass
+
+    def main(self, registry, drift_gauge, drift_gauges: dict, drift_monitor, drift_scheduler,
+             start: bool = True) -> MetricsCollector:
+        """
+        Build the metrics collector once per process and start its thread.
+        :param start: False to leave starting the thread to the caller (e.g. after a fork).
+        """
+        try:
+            collector = MetricsCollector(registry, drift_gauge, drift_gauges, drift_monitor, drift_scheduler)
+            if start:
+                collector.start()
+            logger.info(f"Metrics collector ready (every {collector.config.interval_seconds}s).")
+            return collector
+
+        except Exception as e:
+            logger.error("Metrics collector setup failed.")
+            raise e
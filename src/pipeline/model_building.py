@@ -1,4 +1,5 @@
 from src.components.model_building import ModelBuilding
+from src.components.data_preprocessing import DataPreprocessing
 from src.config.configuration import ConfigurationManager
 from src.utils.logger import logger
 
@@ -8,15 +9,31 @@ class ModelBuildingPipeline:
     def __init__(self):
         pass
 
-    def main(self, X_train, y_train):
+    def main(self, X_train, y_train, params=None):
         try:
             config_manager = ConfigurationManager()
             mb_config = config_manager.get_model_building_config()
             model_builder = ModelBuilding(mb_config)
-            model = model_builder.build_model(X_train, y_train)
+            model = model_builder.build_model(X_train, y_train, params=params)
             logger.info("Model Building complete.")
+            return model
+
+        except Exception as e:
+            logger.error("Model Building failed.")
+            raise e
+
+    def main_streaming(self, train_rows, params=None):
+        """Train on the training split written by streaming preprocessing, one chunk at a time."""
+        try:
+            config_manager = ConfigurationManager()
+            dp_config = config_manager.get_data_preprocessing_config()
+            mb_config = config_manager.get_model_building_config()
+            batches = DataPreprocessing(dp_config).iter_batches(dp_config.train_data_file, apply_smote=True)
+            n_chunks = -(-train_rows // dp_config.stream_chunk_rows)
+            model = ModelBuilding(mb_config).build_model_streaming(batches, n_chunks, params=params)
+            logger.info("Model Building complete.")
+            return model
 
         except Exception as e:
             logger.error("Model Building failed.")
             raise e
-        
\ No newline at end of file
@@ -1,4 +1,5 @@
 from src.components.model_evaluation import ModelEvaluation
+from src.components.data_preprocessing import DataPreprocessing
 from src.config.configuration import ConfigurationManager
 from src.utils.logger import logger
 
@@ -8,17 +9,31 @@ class ModelEvaluationPipeline:
     def __init__(self):
         pass
 
-    def main(self, X_test, y_test):
+    def main(self, X_test, y_test, model=None):
 
         try:
             config_manager = ConfigurationManager()
             mb_config = config_manager.get_model_evaluation_config()
             evaluator = ModelEvaluation(mb_config)
-            evaluator.evaluate(X_test, y_test)
+            metrics = evaluator.evaluate(X_test, y_test, model=model)
             logger.info("Model Evaluation complete.")
-            return 
+            return metrics
+
+        except Exception as e:
+            logger.error("Model Evaluation failed.")
+            raise e
+
+    def main_streaming(self, model=None):
+        """Score the model on the test split written by streaming preprocessing, one chunk at a time."""
+        try:
+            config_manager = ConfigurationManager()
+            dp_config = config_manager.get_data_preprocessing_config()
+            me_config = config_manager.get_model_evaluation_config()
+            batches = DataPreprocessing(dp_config).iter_batches(dp_config.test_data_file)
+            metrics = ModelEvaluation(me_config).evaluate_batches(batches, model=model)
+            logger.info("Model Evaluation complete.")
+            return metrics
 
         except Exception as e:
             logger.error("Model Evaluation failed.")
             raise e
-        
\ No newline at end of file
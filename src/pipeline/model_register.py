@@ -8,13 +8,14 @@ class ModelRegisterPipeline:
     def __init__(self):
         pass
 
-    def main(self):
+    def main(self, model=None):
         try:
             config_manager = ConfigurationManager()
             mlflow_config = config_manager.get_mlflow_config()
             model_register = ModelRegister(mlflow_config)
-            model_register.register()
+            run_id = model_register.register(model=model)
             logger.info("Model Register complete.")
+            return run_id
 
         except Exception as e:
             logger.error("Model Register failed.")
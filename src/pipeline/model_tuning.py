@@ -0,0 +1,26 @@
+from src.components.model_tuning import ModelTuning
+from src.config.configuration import ConfigurationManager
+from src.utils.logger import logger
+
+STAGE_NAME = "Model Tuning stage"
+
+class ModelTuningPipeline:
+    def __init__(self):
+        pass
+
+    def main(self, X_train, y_train):
+        """Return the best hyperparameters found, or None when tuning is disabled."""
+        try:
+            config_manager = ConfigurationManager()
+            mt_config = config_manager.get_model_tuning_config()
+            if not mt_config.enabled:
+                logger.info("Model tuning disabled; using model_building.model_params.")
+                return None
+            tuner = ModelTuning(mt_config)
+            best_params = tuner.tune(X_train, y_train)
+            logger.info("Model Tuning complete.")
+            return best_params
+
+        except Exception as e:
+            logger.error("Model Tuning failed.")
+            raise e
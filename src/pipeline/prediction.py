@@ -1,22 +1,34 @@
-from src.components.data_preprocessing import DataPreprocessing
+from src.components.model_serving import InferenceContext
 from src.config.configuration import ConfigurationManager
 from src.utils.logger import logger
-import pandas as pd
 
 
 class PredictionPipeline:
     def __init__(self):
         pass
 
-    def main(self, df: pd.DataFrame):
+    def main(self, start: bool = True) -> InferenceContext:
+        """
+        Build the resident inference context once per process: reads the config,
+        loads the model and transform plan, and starts the registry watcher.
+        :param start: False to leave starting the watcher to the caller (e.g. after a fork).
+        """
         try:
             config_manager = ConfigurationManager()
             dp_config = config_manager.get_data_preprocessing_config()
-            data_preprocessor = DataPreprocessing(dp_config)
-            processed_input = data_preprocessor.prediction_preprocess(df)
-            logger.info("Prediction complete.")
-            return processed_input
-        
+            pr_config = config_manager.get_prediction_config()
+            mlflow_config = config_manager.get_mlflow_config()
+            context = InferenceContext(dp_config, pr_config, mlflow_config)
+            try:
+                context.get_bundle()
+            except Exception as e:
+                # Keep serving; requests retry the load once per reload_interval, as does the watcher.
+                logger.error(f"Error loading model at startup: {e}")
+            if start:
+                context.start_watcher()
+            logger.info("Inference context ready.")
+            return context
+
         except Exception as e:
-            logger.error("Prediction failed.")
+            logger.error("Prediction pipeline setup failed.")
             raise e
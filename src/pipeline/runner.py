@@ -0,0 +1,147 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.utils.cache import StageCache, code_digest, file_digest
+from src.utils.logger import logger
+from src.utils.profiling import StageProfiler, output_rows
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline graph.
+    fn receives a dict mapping each dependency's name to that stage's return value.
+    config_sections, code and packages make up the stage's cache key together with
+    its inputs; artifacts(config) lists the files the stage writes, which are cached
+    and restored alongside its return value. file_inputs(config) lists files the stage
+    reads from outside the graph (e.g. a model it extends); their contents join the key.
+    """
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = field(default_factory=tuple)
+    config_sections: Tuple[str, ...] = field(default_factory=tuple)
+    code: Tuple[str, ...] = field(default_factory=tuple)
+    packages: Tuple[str, ...] = field(default_factory=tuple)
+    artifacts: Optional[Callable[[dict], List[str]]] = None
+    file_inputs: Optional[Callable[[dict], List[str]]] = None
+
+
+class PipelineRunner:
+    def __init__(self, stages: Iterable[Stage]):
+        """
+        Runs stages in dependency order inside the current process, handing each
+        stage's return value straight to the stages that depend on it.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        # Per-stage measurements of the last run, when it was profiled
+        self.profiles: List[dict] = []
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Stage names sorted so every stage comes after its dependencies (declaration order otherwise)."""
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline graph: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def plan(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Stages to run, in order: the targets and everything they depend on.
+        :param targets: Stage names to reach; all stages when None.
+        """
+        if targets is None:
+            return list(self.order)
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage {name}; known stages: {self.order}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.order if name in needed]
+
+    def _cache_key(self, stage: Stage, config: dict, digests: Dict[str, str]) -> str:
+        sections = {section: config.get(section) for section in stage.config_sections}
+        inputs = {dep: digests[dep] for dep in stage.deps}
+        for path in (stage.file_inputs(config) if stage.file_inputs else []):
+            inputs[path] = file_digest(path) if os.path.exists(path) else None
+        return StageCache.stage_key(stage.name, sections, inputs, code_digest(stage.code, stage.packages))
+
+    def run(self, targets: Optional[Iterable[str]] = None,
+            progress: Optional[Callable[[str, str, float], None]] = None,
+            cache: Optional[StageCache] = None, config: Optional[dict] = None,
+            profiler: Optional[Callable[[str], StageProfiler]] = None) -> Dict[str, Any]:
+        """
+        Run the planned stages and return every stage's output by name.
+        :param targets: Stage names to reach; all stages when None.
+        :param progress: Called as progress(stage, status, elapsed_seconds) with status
+            "started", "cached", "completed" or "failed".
+        :param cache: Stage cache; a stage whose key is already cached is loaded instead of run.
+        :param config: Full configuration dict the stages' config_sections are taken from.
+        :param profiler: profiler(stage_name) returns the StageProfiler each executed stage runs in;
+            the measurements are collected in `self.profiles`.
+        """
+        progress = progress or (lambda stage, status, elapsed: None)
+        results, digests = {}, {}
+        self.profiles = []
+        for name in self.plan(targets):
+            stage = self.stages[name]
+            start = time.perf_counter()
+            key = None
+            if cache is not None:
+                key = self._cache_key(stage, config or {}, digests)
+                hit = cache.load(name, key)
+                if hit is not None:
+                    results[name], manifest = hit
+                    digests[name] = manifest["output_digest"]
+                    elapsed = time.perf_counter() - start
+                    progress(name, "cached", elapsed)
+                    if profiler is not None:
+                        self.profiles.append({"stage": name, "status": "cached", "wall_seconds": elapsed,
+                                              "rows": output_rows(results[name])})
+                    logger.info(f" {name} stage loaded from cache ({key[:12]}) ")
+                    continue
+
+            logger.info(f" {name} stage started ")
+            progress(name, "started", 0.0)
+            stage_profile = profiler(name) if profiler is not None else None
+            try:
+                if stage_profile is not None:
+                    with stage_profile:
+                        results[name] = stage.fn({dep: results[dep] for dep in stage.deps})
+                else:
+                    results[name] = stage.fn({dep: results[dep] for dep in stage.deps})
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                if stage_profile is not None:
+                    self.profiles.append(stage_profile.record)
+                progress(name, "failed", elapsed)
+                logger.exception(e)
+                raise e
+            if stage_profile is not None:
+                self.profiles.append({**stage_profile.record, "rows": output_rows(results[name])})
+            elapsed = time.perf_counter() - start
+            if cache is not None:
+                artifacts = stage.artifacts(config or {}) if stage.artifacts else []
+                digests[name] = cache.save(name, key, results[name], artifacts, {"seconds": elapsed})
+            progress(name, "completed", elapsed)
+            logger.info(f" {name} stage completed in {elapsed:.2f}s ")
+        return results
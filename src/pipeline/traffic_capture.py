@@ -0,0 +1,26 @@
+from src.components.traffic_recorder import TrafficRecorder
+from src.config.configuration import ConfigurationManager
+from src.utils.logger import logger
+
+
+class TrafficCapturePipeline:
+    def __init__(self):
+        pass
+
+    def main(self, start: bool = True) -> TrafficRecorder:
+        """
+        Build the traffic recorder once per process and start its writer thread.
+        :param start: False to leave starting the thread to the caller (e.g. after a fork).
+        """
+        try:
+            config_manager = ConfigurationManager()
+            tc_config = config_manager.get_traffic_capture_config()
+            recorder = TrafficRecorder(tc_config)
+            if start:
+                recorder.start()
+            logger.info(f"Traffic capture {'enabled' if tc_config.enabled else 'disabled'} ({tc_config.traffic_dir}).")
+            return recorder
+
+        except Exception as e:
+            logger.error("Traffic capture setup failed.")
+            raise e
@@ -0,0 +1,185 @@
+import os
+import time
+from src.config.configuration import ConfigurationManager
+from src.pipeline.runner import PipelineRunner, Stage
+from src.pipeline.data_ingestion import DataIngestionPipeline
+from src.pipeline.data_preprocessing import DataPreprocessingPipeline
+from src.pipeline.drift_profile import DriftProfilePipeline
+from src.pipeline.model_tuning import ModelTuningPipeline
+from src.pipeline.model_building import ModelBuildingPipeline
+from src.pipeline.model_evaluation import ModelEvaluationPipeline
+from src.pipeline.model_register import ModelRegisterPipeline
+from src.components.run_report import RunReport
+from src.utils.cache import StageCache
+from src.utils.logger import logger
+from src.utils.profiling import StageProfiler
+
+
+def _preprocess(inputs):
+    result = DataPreprocessingPipeline().main()
+    if isinstance(result, dict):
+        # Streaming mode: a summary of the splits written to disk
+        return result
+    X_train, y_train, X_test, y_test, train_rows = result
+    # train_rows: the real training rows, ahead of those added by rebalancing
+    return {"X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test, "train_rows": train_rows}
+
+
+def _tune(inputs):
+    data = inputs["data_preprocessing"]
+    if data.get("streaming"):
+        # Cross-validated search needs the training matrix in memory
+        logger.info("Model tuning is not available in streaming mode; using model_building.model_params.")
+        return None
+    # Cross-validate on the rows before rebalancing; the tuner rebalances each training fold,
+    # so no synthetic row is interpolated from a validation row
+    rows = data["train_rows"]
+    return ModelTuningPipeline().main(data["X_train"].iloc[:rows], data["y_train"].iloc[:rows])
+
+
+def _build(inputs):
+    data = inputs["data_preprocessing"]
+    if data.get("streaming"):
+        return ModelBuildingPipeline().main_streaming(data["train_rows"], params=inputs["model_tuning"])
+    return ModelBuildingPipeline().main(data["X_train"], data["y_train"], params=inputs["model_tuning"])
+
+
+def _evaluate(inputs):
+    data = inputs["data_preprocessing"]
+    if data.get("streaming"):
+        return ModelEvaluationPipeline().main_streaming(model=inputs["model_building"])
+    return ModelEvaluationPipeline().main(data["X_test"], data["y_test"], model=inputs["model_building"])
+
+
+def _register(inputs):
+    return ModelRegisterPipeline().main(model=inputs["model_building"])
+
+
+def _preprocessing_artifacts(config):
+    dp = config["data_preprocessing"]
+    artifacts = [dp["train_data_file"], dp["test_data_file"], os.path.join(dp["root_dir"], dp["plan_name"])]
+    if dp.get("imputation_statistics") == "sketch" or dp.get("training_mode") == "streaming":
+        artifacts.append(os.path.join(dp["root_dir"], dp.get("plan_sketches_name", "transform_plan_sketches.json")))
+    if dp.get("training_mode", "in_memory") == "in_memory":
+        artifacts.append(os.path.join(dp["root_dir"], dp.get("rebalance_stats_name", "rebalance_stats.json")))
+    return artifacts
+
+
+def _tuning_artifacts(config):
+    mt = config["model_tuning"]
+    return [os.path.join(mt["root_dir"], mt["best_params_name"])] if mt.get("enabled") else []
+
+
+def _model_artifacts(config):
+    mb = config["model_building"]
+    return [os.path.join(mb["model_dir"], mb["model_name"]),
+            os.path.join(mb["model_dir"], mb["training_stats_name"])]
+
+
+def _warm_start_inputs(config):
+    """The saved model a warm start extends is an input of model_building."""
+    mb = config["model_building"]
+    return [os.path.join(mb["model_dir"], mb["model_name"])] if mb.get("warm_start") else []
+
+
+def _profile_artifacts(config):
+    md = config["drift_detection"]
+    return [os.path.join(md["drift_dir"], md.get("profile_name", "reference_profile.json"))]
+
+
+def _metrics_artifacts(config):
+    me = config["model_evaluation"]
+    return [os.path.join(me["metrics_dir"], me["metrics_name"])]
+
+
+# Source every stage's output depends on besides its own modules: the config defaults and
+# derived settings, and the stage functions in this module
+COMMON_CODE = ("src.config.configuration", "src.entity.config_entity", "src.pipeline.training")
+
+TRAINING_STAGES = [
+    Stage("data_ingestion", lambda inputs: DataIngestionPipeline().main(),
+          config_sections=("data_ingestion", "artifact_format"),
+          code=COMMON_CODE + ("src.pipeline.data_ingestion", "src.components.data_ingestion", "src.utils.common",
+                              "src.constants"),
+          packages=("numpy", "pandas", "pyarrow"),
+          artifacts=lambda config: [config["data_ingestion"]["data_file"]]),
+    Stage("data_preprocessing", _preprocess, deps=("data_ingestion",),
+          config_sections=("data_preprocessing", "artifact_format"),
+          code=COMMON_CODE + ("src.pipeline.data_preprocessing", "src.components.data_preprocessing",
+                              "src.components.transform_plan", "src.components.platform_ratings",
+                              "src.components.rebalancing", "src.utils.sketches", "src.utils.common",
+                              "src.constants"),
+          packages=("numpy", "pandas", "scikit-learn", "scipy", "imbalanced-learn"),
+          artifacts=_preprocessing_artifacts),
+    Stage("drift_profile", lambda inputs: DriftProfilePipeline().main(), deps=("data_preprocessing",),
+          config_sections=("drift_detection", "artifact_format"),
+          code=COMMON_CODE + ("src.pipeline.drift_profile", "src.components.drift_monitor", "src.utils.sketches",
+                              "src.utils.common", "src.constants"),
+          packages=("numpy", "pandas", "pyarrow"),
+          artifacts=_profile_artifacts),
+    Stage("model_tuning", _tune, deps=("data_preprocessing",),
+          config_sections=("model_tuning", "data_preprocessing"),
+          code=COMMON_CODE + ("src.pipeline.model_tuning", "src.components.model_tuning",
+                              "src.components.rebalancing"),
+          packages=("scikit-learn", "optuna", "imbalanced-learn"),
+          artifacts=_tuning_artifacts),
+    Stage("model_building", _build, deps=("data_preprocessing", "model_tuning"),
+          config_sections=("model_building", "data_preprocessing"),
+          code=COMMON_CODE + ("src.pipeline.model_building", "src.components.model_building",
+                              "src.components.data_preprocessing", "src.components.rebalancing"),
+          packages=("scikit-learn", "imbalanced-learn"),
+          artifacts=_model_artifacts,
+          file_inputs=_warm_start_inputs),
+    Stage("model_evaluation", _evaluate, deps=("data_preprocessing", "model_building"),
+          config_sections=("model_evaluation", "data_preprocessing"),
+          code=COMMON_CODE + ("src.pipeline.model_evaluation", "src.components.model_evaluation",
+                              "src.components.data_preprocessing"),
+          packages=("scikit-learn",),
+          artifacts=_metrics_artifacts),
+    Stage("model_register", _register, deps=("model_building", "model_evaluation"),
+          config_sections=("mlflow",),
+          code=COMMON_CODE + ("src.pipeline.model_register", "src.components.model_register")),
+]
+
+
+class TrainingPipeline:
+    def __init__(self):
+        self.runner = PipelineRunner(TRAINING_STAGES)
+
+    def main(self, targets=None, progress=None, use_cache=True):
+        """
+        Run the training graph in this process.
+        :param targets: Stage names to run (with their dependencies); every stage when None.
+        :param progress: Optional progress(stage, status, elapsed_seconds) callback.
+        :param use_cache: Reuse cached stage outputs whose config, inputs and code are unchanged.
+        :return: Stage outputs by name.
+        """
+        config_manager = ConfigurationManager()
+        cache_config = config_manager.get_cache_config()
+        cache = StageCache(cache_config) if use_cache and cache_config.enabled else None
+        profiling_config = config_manager.get_profiling_config()
+        if not profiling_config.enabled:
+            return self.runner.run(targets=targets, progress=progress, cache=cache, config=config_manager.config)
+
+        run_report = RunReport(profiling_config, config_manager.get_mlflow_config())
+        profiler = lambda stage: StageProfiler(stage, run_report.cprofile_path(stage), profiling_config.cprofile_top)
+        started_at, results, status = time.time(), {}, "failed"
+        try:
+            results = self.runner.run(targets=targets, progress=progress, cache=cache,
+                                      config=config_manager.config, profiler=profiler)
+            status = "completed"
+            return results
+        finally:
+            self._report(run_report, profiling_config, status, started_at, results.get("model_register"))
+
+    def _report(self, run_report: RunReport, profiling_config, status: str, started_at: float, run_id):
+        """Save the run report and log it to MLflow; profiling never fails a training run."""
+        try:
+            report = run_report.save(self.runner.profiles, status, started_at)
+            # A cached model_register returns the id of an earlier run; that run is left alone
+            registered = any(stage["stage"] == "model_register" and stage["status"] == "completed"
+                             for stage in report["stages"])
+            if profiling_config.log_to_mlflow:
+                run_report.log_to_mlflow(report, run_id if registered else None)
+        except Exception as e:
+            logger.error(f"Run report failed: {e}")
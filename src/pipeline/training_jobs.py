@@ -0,0 +1,258 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from src.pipeline.training import TrainingPipeline
+from src.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single serving process
+    fcntl = None
+
+# Seconds between reads of the job files of other worker processes
+STATE_POLL_SECONDS = 1.0
+
+
+@dataclass
+class TrainingJob:
+    """Status of one background training run, as returned by GET /train/<job_id>."""
+    job_id: str
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    current_stage: Optional[str] = None
+    events: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "current_stage": self.current_stage,
+            "events": list(self.events),
+            "error": self.error
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrainingJob":
+        return cls(**data)
+
+
+class TrainingJobManager:
+    def __init__(self, on_success: Optional[Callable[[], None]] = None, max_history: int = 20,
+                 state_dir: Optional[str] = None):
+        """
+        Runs the training graph on a single background worker thread so the web
+        process keeps serving while a model trains. Only one job runs at a time;
+        submitting while one is queued or running returns that job.
+        With a state_dir shared by several worker processes, every job is also kept there as
+        a JSON file, so any worker answers for any job; a lock file held for the whole run
+        lets one process train at a time, and start() runs on_success in the other workers
+        once a job completes.
+        :param on_success: Called after a job completes, e.g. to reload the served model.
+        :param max_history: Number of finished jobs kept for polling.
+        :param state_dir: Directory shared by the worker processes; None for a single process.
+        """
+        self.on_success = on_success
+        self.max_history = max_history
+        self.jobs_dir = os.path.join(state_dir, "training_jobs") if state_dir else None
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training")
+        self._notified_until = time.time()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def submit(self, targets=None) -> TrainingJob:
+        """Queue a training run, or return the one already in flight (in any worker process)."""
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status in ("queued", "running"):
+                    return job
+            run_lock = None
+            if self.jobs_dir:
+                run_lock = self._take_run_lock()
+                if run_lock is None:
+                    return self._shared_active_job()
+            job = TrainingJob(job_id=uuid.uuid4().hex)
+            self.jobs[job.job_id] = job
+            while len(self.jobs) > self.max_history:
+                self.jobs.popitem(last=False)
+            self._save(job)
+        self._executor.submit(self._run, job, targets, run_lock)
+        logger.info(f"Training job {job.job_id} queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Snapshot of a job's status, or None if unknown."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return job.to_dict()
+        return self._shared_job(job_id)
+
+    def _take_run_lock(self):
+        """The training lock file, locked, or None when another process holds it."""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.jobs_dir, ".training.lock"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return None
+        return lock_file
+
+    def _save(self, job: TrainingJob):
+        """Write the job file (temp file, then rename) and drop the oldest beyond max_history."""
+        if not self.jobs_dir:
+            return
+        path = os.path.join(self.jobs_dir, f"{job.job_id}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(path + ".tmp", path)
+        if job.status == "queued":
+            for old in self._shared_jobs()[:-self.max_history]:
+                os.remove(os.path.join(self.jobs_dir, f"{old['job_id']}.json"))
+
+    def _shared_jobs(self) -> list:
+        """Every job file in the shared directory, oldest first."""
+        jobs = []
+        for path in glob.glob(os.path.join(self.jobs_dir, "*.json")):
+            try:
+                with open(path, "r") as f:
+                    jobs.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def _shared_job(self, job_id: str) -> Optional[dict]:
+        """A job of another worker process, from its file; reported failed if that process died."""
+        if not self.jobs_dir or not job_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self.jobs_dir, f"{job_id}.json"), "r") as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if job["status"] in ("queued", "running"):
+            # The owner holds the lock from submit until the job is finished; a free lock means it exited
+            run_lock = self._take_run_lock()
+            if run_lock is not None:
+                run_lock.close()
+                job.update(status="failed", error="The worker process running this job exited")
+        return job
+
+    def _shared_active_job(self) -> TrainingJob:
+        """The job being trained by the process that holds the lock."""
+        deadline = time.monotonic() + 5 * STATE_POLL_SECONDS
+        while True:
+            active = [job for job in self._shared_jobs() if job["status"] in ("queued", "running")]
+            if active:
+                return TrainingJob.from_dict(active[-1])
+            if time.monotonic() >= deadline:
+                raise RuntimeError("The training lock is held but no job is in flight")
+            # The lock holder writes its job file right after taking the lock
+            time.sleep(0.05)
+
+    def start(self):
+        """Run on_success here when a job of another worker process completes."""
+        if self._watcher is not None or not self.jobs_dir or self.on_success is None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name="training-jobs", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(STATE_POLL_SECONDS):
+            try:
+                with self._lock:
+                    local = set(self.jobs)
+                finished = [job["finished_at"] for job in self._shared_jobs()
+                            if job["status"] == "completed" and job["job_id"] not in local
+                            and job["finished_at"] > self._notified_until]
+                if finished:
+                    self._notified_until = max(finished)
+                    self.on_success()
+            except Exception as e:
+                logger.error(f"Error watching training jobs: {e}")
+
+    def wait_for_update(self, job_id: str, seen_events: int, seen_status: Optional[str],
+                        timeout: float = 15.0) -> Optional[dict]:
+        """
+        Block until the job has more than `seen_events` events or its status is no longer
+        `seen_status`, then return its snapshot. Used to stream progress without busy polling
+        (jobs of other worker processes are read from their file every STATE_POLL_SECONDS).
+        """
+        def changed():
+            job = self.jobs.get(job_id)
+            return job is None or len(job.events) > seen_events or job.status != seen_status
+
+        with self._lock:
+            local = job_id in self.jobs
+        if not local and self.jobs_dir:
+            deadline = time.monotonic() + timeout
+            while True:
+                job = self._shared_job(job_id)
+                if (job is None or len(job["events"]) > seen_events or job["status"] != seen_status
+                        or time.monotonic() >= deadline):
+                    return job
+                time.sleep(STATE_POLL_SECONDS)
+
+        with self._changed:
+            self._changed.wait_for(changed, timeout=timeout)
+            job = self.jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def _update(self, job: TrainingJob, **changes):
+        with self._changed:
+            for key, value in changes.items():
+                setattr(job, key, value)
+            self._save(job)
+            self._changed.notify_all()
+
+    def _record(self, job: TrainingJob, stage: str, status: str, elapsed: float):
+        with self._changed:
+            job.current_stage = stage
+            job.events.append({"stage": stage, "status": status, "elapsed": round(elapsed, 3), "time": time.time()})
+            self._save(job)
+            self._changed.notify_all()
+
+    def _run(self, job: TrainingJob, targets, run_lock=None):
+        try:
+            self._update(job, status="running", started_at=time.time())
+            try:
+                TrainingPipeline().main(targets=targets, progress=lambda *event: self._record(job, *event))
+            except Exception as e:
+                logger.error(f"Training job {job.job_id} failed: {e}")
+                self._update(job, status="failed", error=str(e), finished_at=time.time())
+                return
+            # Run the hook before reporting completion so pollers see the new model once the job is done
+            if self.on_success is not None:
+                try:
+                    self.on_success()
+                except Exception as e:
+                    logger.error(f"Post-training hook failed: {e}")
+            self._update(job, status="completed", finished_at=time.time())
+            logger.info(f"Training job {job.job_id} completed")
+        finally:
+            # Released only once the final status is on disk
+            if run_lock is not None:
+                run_lock.close()
@@ -0,0 +1,216 @@
+"""
+Content-addressed cache of pipeline stage outputs.
+
+An entry is keyed by the stage's config sections, the digests of its inputs'
+outputs and a hash of the stage's source code, so it is reused only while all
+three are unchanged. Inspect and evict entries with:
+
+    python -m src.utils.cache list
+    python -m src.utils.cache evict --stage model_building
+    python -m src.utils.cache clear
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+CHUNK_BYTES = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_digest(modules, packages=()) -> str:
+    """
+    Hash of the source files of `modules` plus the installed versions of `packages`.
+    :param modules: Dotted module names whose source defines the stage.
+    :param packages: Distributions whose version changes the stage output (e.g. scikit-learn).
+    """
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        with open(importlib.import_module(name).__file__, "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    for package in sorted(packages):
+        try:
+            digest.update(f"{package}=={version(package)}".encode())
+        except PackageNotFoundError:
+            digest.update(f"{package}==missing".encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    def __init__(self, config):
+        """
+        Stores each stage's return value (pickled) and the artifact files it writes
+        under cache_dir/<stage>/<key>/.
+        """
+        self.config = config
+        self.cache_dir = str(config.cache_dir)
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    @staticmethod
+    def stage_key(stage: str, config: Dict[str, Any], inputs: Dict[str, str], code: str) -> str:
+        """Cache key of a stage run: hash of its config sections, input digests and code hash."""
+        payload = json.dumps({"stage": stage, "config": config, "inputs": inputs, "code": code},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def load(self, stage: str, key: str) -> Optional[Tuple[Any, dict]]:
+        """
+        Return (output, manifest) for a cached stage run, restoring its artifact files
+        to their original paths when missing or modified; None on a miss.
+        """
+        entry = self._entry_dir(stage, key)
+        manifest_path = os.path.join(entry, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            for artifact in manifest["artifacts"]:
+                path = artifact["path"]
+                if not os.path.exists(path) or file_digest(path) != artifact["sha256"]:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    shutil.copyfile(os.path.join(entry, artifact["stored"]), path + ".tmp")
+                    os.replace(path + ".tmp", path)
+                    logger.info(f"Restored {path} from cache")
+            with open(os.path.join(entry, "output.pkl"), "rb") as f:
+                output = pickle.load(f)
+        except Exception as e:
+            # A damaged entry is treated as a miss and recomputed
+            logger.error(f"Ignoring unreadable cache entry {entry}: {e}")
+            return None
+        return output, manifest
+
+    def save(self, stage: str, key: str, output: Any, artifacts: List[str], meta: dict) -> str:
+        """
+        Store a stage's output and artifact files.
+        :return: Content digest of the output and artifacts, used as the input hash of dependent stages.
+        """
+        try:
+            entry = self._entry_dir(stage, key)
+            staging = entry + ".tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+
+            payload = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+            digest = hashlib.sha256(payload)
+            with open(os.path.join(staging, "output.pkl"), "wb") as f:
+                f.write(payload)
+
+            stored = []
+            for index, path in enumerate(artifacts):
+                name = f"{index}_{os.path.basename(path)}"
+                shutil.copyfile(path, os.path.join(staging, name))
+                sha = file_digest(path)
+                digest.update(sha.encode())
+                stored.append({"path": path, "stored": name, "sha256": sha, "size": os.path.getsize(path)})
+
+            manifest = dict(meta, stage=stage, key=key, created_at=time.time(),
+                            output_digest=digest.hexdigest(), artifacts=stored)
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f, indent=4, default=str)
+
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+            return manifest["output_digest"]
+        except Exception as e:
+            logger.error(f"Error caching {stage} output")
+            raise CustomException(e, sys)
+
+    def entries(self, stage: Optional[str] = None) -> List[dict]:
+        """Manifests of the cached entries, optionally for one stage, oldest first."""
+        manifests = []
+        if stage is not None:
+            stages = [stage]
+        else:
+            stages = os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []
+        for name in stages:
+            stage_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                if key.endswith(".tmp"):
+                    continue
+                manifest_path = os.path.join(stage_dir, key, "manifest.json")
+                if os.path.exists(manifest_path):
+                    with open(manifest_path) as f:
+                        manifest = json.load(f)
+                    manifest["bytes"] = sum(entry.stat().st_size for entry in os.scandir(os.path.join(stage_dir, key)))
+                    manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["created_at"])
+
+    def evict(self, stage: Optional[str] = None, key: Optional[str] = None,
+              older_than: Optional[float] = None) -> int:
+        """
+        Delete matching entries; with no filters, delete everything.
+        :param key: Full key or key prefix.
+        :param older_than: Only entries created more than this many seconds ago.
+        :return: Number of entries removed.
+        """
+        removed = 0
+        for manifest in self.entries(stage):
+            if key and not manifest["key"].startswith(key):
+                continue
+            if older_than is not None and time.time() - manifest["created_at"] < older_than:
+                continue
+            shutil.rmtree(self._entry_dir(manifest["stage"], manifest["key"]), ignore_errors=True)
+            removed += 1
+        return removed
+
+
+def main(argv=None):
+    from src.config.configuration import ConfigurationManager
+
+    parser = argparse.ArgumentParser(description="Inspect and evict cached pipeline stage outputs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="List cached entries")
+    list_parser.add_argument("--stage")
+    show_parser = commands.add_parser("show", help="Print an entry's manifest")
+    show_parser.add_argument("key", help="Key or unique key prefix")
+    evict_parser = commands.add_parser("evict", help="Delete matching entries")
+    evict_parser.add_argument("--stage")
+    evict_parser.add_argument("--key", help="Key or key prefix")
+    evict_parser.add_argument("--older-than-days", type=float)
+    commands.add_parser("clear", help="Delete every entry")
+    args = parser.parse_args(argv)
+
+    cache = StageCache(ConfigurationManager().get_cache_config())
+    if args.command == "list":
+        for m in cache.entries(args.stage):
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(m["created_at"]))
+            print(f"{m['stage']:<20} {m['key'][:12]}  {created}  {m['bytes'] / 1e6:9.2f} MB  "
+                  f"{m.get('seconds', 0):8.2f} s")
+    elif args.command == "show":
+        matches = [m for m in cache.entries() if m["key"].startswith(args.key)]
+        if len(matches) != 1:
+            parser.error(f"{len(matches)} entries match {args.key}")
+        print(json.dumps(matches[0], indent=4))
+    elif args.command == "evict":
+        older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+        if args.stage is None and args.key is None and older_than is None:
+            parser.error("evict needs --stage, --key or --older-than-days; use clear to drop everything")
+        print(f"Removed {cache.evict(args.stage, args.key, older_than)} entries")
+    elif args.command == "clear":
+        print(f"Removed {cache.evict()} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import yaml
 import os 
+import shutil
+import pandas as pd
 from pathlib import Path
 from ensure import ensure_annotations
+from src.constants import RAW_DATA_DTYPES, CATEGORY_LEVELS
 from src.utils.logger import logger
 
 @ensure_annotations
@@ -21,4 +24,117 @@ def create_directories(path_to_directories: list, verbose=True):
     for path in path_to_directories:
         os.makedirs(path, exist_ok=True)
         if verbose:
-            logger.info(f"created directory at: {path}")
\ No newline at end of file
+            logger.info(f"created directory at: {path}")
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the known raw-data columns of `df` to their storage dtypes (see RAW_DATA_DTYPES)."""
+    dtypes = {}
+    for col in df.columns:
+        if col not in RAW_DATA_DTYPES:
+            continue
+        if col in CATEGORY_LEVELS:
+            dtypes[col] = pd.CategoricalDtype(CATEGORY_LEVELS[col])
+        else:
+            dtypes[col] = RAW_DATA_DTYPES[col]
+    return df.astype(dtypes)
+
+
+def save_frame(df: pd.DataFrame, path, artifact_format: str):
+    """Write a data artifact as csv, parquet or feather, with the storage dtypes applied."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = apply_schema(df)
+    if artifact_format == "csv":
+        df.to_csv(path, index=False)
+    elif artifact_format == "parquet":
+        df.to_parquet(path, index=False)
+    elif artifact_format == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Unsupported artifact format: {artifact_format}")
+
+
+def load_frame(path, artifact_format: str, columns: list = None) -> pd.DataFrame:
+    """Read a data artifact, optionally only `columns`, with the storage dtypes applied."""
+    if artifact_format == "csv":
+        df = pd.read_csv(path, usecols=columns)
+    elif artifact_format == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    elif artifact_format == "feather":
+        df = pd.read_feather(path, columns=columns)
+    else:
+        raise ValueError(f"Unsupported artifact format: {artifact_format}")
+    return apply_schema(df)
+
+
+def concat_artifacts(part_paths: list, path, artifact_format: str):
+    """
+    Stream part files into one artifact without loading them all at once.
+    CSV parts are appended byte-wise, keeping only the first part's header.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if artifact_format == "csv":
+        with open(path, "wb") as out:
+            for i, part_path in enumerate(part_paths):
+                with open(part_path, "rb") as part:
+                    if i > 0:
+                        part.readline()
+                    shutil.copyfileobj(part, out)
+        return
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    read = pq.read_table if artifact_format == "parquet" else feather.read_table
+    writer = None
+    try:
+        for part_path in part_paths:
+            table = read(part_path)
+            if writer is None:
+                schema = table.schema
+                if artifact_format == "parquet":
+                    writer = pq.ParquetWriter(path, schema)
+                else:
+                    # IPC files allow one dictionary per field, but each part builds its own;
+                    # store those columns as plain values (load_frame restores the categoricals)
+                    for i, field in enumerate(schema):
+                        if pa.types.is_dictionary(field.type):
+                            schema = schema.set(i, field.with_type(field.type.value_type))
+                    writer = pa.ipc.new_file(path, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def iter_frames(path, artifact_format: str, chunk_rows: int, columns: list = None):
+    """
+    Read a data artifact in chunks of about `chunk_rows` rows, with the storage dtypes applied,
+    so files larger than memory can be processed one chunk at a time.
+    """
+    if artifact_format == "csv":
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            yield apply_schema(chunk)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if artifact_format == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+    elif artifact_format == "feather":
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        raise ValueError(f"Unsupported artifact format: {artifact_format}")
+
+    # Re-cut the file's record batches into chunks of exactly chunk_rows (the last may be shorter)
+    pending = None
+    for batch in batches:
+        if columns is not None and artifact_format == "feather":
+            batch = batch.select(columns)
+        table = pa.Table.from_batches([batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= chunk_rows:
+            yield apply_schema(pending.slice(0, chunk_rows).to_pandas())
+            pending = pending.slice(chunk_rows)
+    if pending is not None and pending.num_rows:
+        yield apply_schema(pending.to_pandas())
@@ -12,4 +12,7 @@ class CustomException(Exception):
         self.error_message = error_message_detail(error_message, error_detail)
     
     def __str__(self):
-        return self.error_message
\ No newline at end of file
+        return self.error_message
+
+class InvalidInputError(ValueError):
+    """Applicant rows that cannot be scored (non-numeric value, unknown category); a client error."""
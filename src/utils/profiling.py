@@ -0,0 +1,162 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+import numpy as np
+import pandas as pd
+import psutil
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+
+class PeakMemorySampler:
+    """
+    Context manager that tracks the peak resident set size of this process
+    (all threads, e.g. joblib workers of an n_jobs=-1 fit) while the block runs.
+
+        with PeakMemorySampler() as memory:
+            model.fit(X, y)
+        memory.peak_mb, memory.increase_mb, memory.seconds
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baseline = 0
+        self.peak = 0
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = 0.0
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self.baseline = self.peak = self.process.memory_info().rss
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / 2**20
+
+    @property
+    def increase_mb(self) -> float:
+        return (self.peak - self.baseline) / 2**20
+
+
+def output_rows(result) -> dict:
+    """
+    Row counts of a stage's output: the length of a frame or array, or of each frame or
+    array in a dict of them, plus any integer `*_rows` entries (streaming summaries).
+    A stage that hands over a data artifact path (data_ingestion) gets the artifact's row
+    count, from the Parquet footer or Feather schema (CSV rows are counted by lines).
+    """
+    def rows(value):
+        if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+            return len(value)
+        if isinstance(value, (str, os.PathLike)) and os.path.isfile(value):
+            path = os.fspath(value)
+            if path.endswith(".parquet"):
+                return pq.ParquetFile(path).metadata.num_rows
+            if path.endswith(".feather"):
+                return feather.read_table(path, memory_map=True).num_rows
+            if path.endswith(".csv"):
+                with open(path, "rb") as f:
+                    return max(sum(1 for _ in f) - 1, 0)
+        return None
+
+    if rows(result) is not None:
+        return {"rows": rows(result)}
+    counts = {}
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if rows(value) is not None:
+                counts[key] = rows(value)
+            elif isinstance(key, str) and key.endswith("_rows") and isinstance(value, int):
+                counts[key] = value
+    return counts
+
+
+class StageProfiler:
+    """
+    Context manager that measures one pipeline stage: wall time, CPU time (this process
+    plus waited-for children), peak RSS, bytes read and written, and optionally a cProfile
+    of the stage written to `cprofile_path` (open it with snakeviz or pstats).
+    I/O counts are process-wide bytes passed through read/write calls (page cache hits
+    included), falling back to storage-level bytes where the platform only has those.
+
+        with StageProfiler("data_preprocessing") as profile:
+            result = run_stage()
+        profile.record  # dict for the run report
+    """
+
+    def __init__(self, name: str, cprofile_path: str = None, top: int = 25):
+        self.name = name
+        self.cprofile_path = cprofile_path
+        self.top = top
+        self.process = psutil.Process()
+        self.record = {}
+        self._memory = PeakMemorySampler()
+        self._profile = None
+
+    def _cpu_seconds(self) -> float:
+        times = self.process.cpu_times()
+        return times.user + times.system + getattr(times, "children_user", 0.0) + getattr(times, "children_system", 0.0)
+
+    def _io(self):
+        try:
+            counters = self.process.io_counters()
+        except (AttributeError, psutil.Error):
+            return None
+        return (getattr(counters, "read_chars", counters.read_bytes),
+                getattr(counters, "write_chars", counters.write_bytes))
+
+    def __enter__(self):
+        self._io_start = self._io()
+        self._cpu_start = self._cpu_seconds()
+        self._memory.__enter__()
+        if self.cprofile_path:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is not None:
+            self._profile.disable()
+        self._memory.__exit__(exc_type, exc, tb)
+        io_end = self._io()
+        self.record = {
+            "stage": self.name,
+            "status": "failed" if exc_type else "completed",
+            "wall_seconds": self._memory.seconds,
+            "cpu_seconds": self._cpu_seconds() - self._cpu_start,
+            "peak_rss_mb": self._memory.peak_mb,
+            "rss_increase_mb": self._memory.increase_mb,
+            "read_bytes": io_end[0] - self._io_start[0] if io_end and self._io_start else None,
+            "write_bytes": io_end[1] - self._io_start[1] if io_end and self._io_start else None
+        }
+        if self._profile is not None:
+            os.makedirs(os.path.dirname(self.cprofile_path) or ".", exist_ok=True)
+            self._profile.dump_stats(self.cprofile_path)
+            self.record["cprofile"] = {"path": self.cprofile_path, "top": self._top_functions()}
+        return False
+
+    def _top_functions(self) -> list:
+        """Functions with the largest cumulative time, for a quick look without opening the profile."""
+        stats = pstats.Stats(self._profile)
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+        return [{"function": f"{path}:{line}({func})", "calls": calls, "tottime": tottime, "cumtime": cumtime}
+                for (path, line, func), (_, calls, tottime, cumtime, _) in entries]
@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Histogram
+
+# Seconds; single-row scoring sits in the low milliseconds, batches and cold loads go higher
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# With several gunicorn workers (Prometheus multiprocess mode) a gauge reports the highest
+# value among live workers; counters and histograms are summed across workers
+GAUGE_MULTIPROCESS_MODE = 'livemax'
+
+
+class ServingMetrics:
+    """
+    Request and per-stage latency histograms, decision counters and error counters of the
+    web app, registered on its Prometheus registry. Observations carry the request id as an
+    exemplar (trace_id), visible when /metrics is scraped in the OpenMetrics format
+    (single-process serving only; prometheus_client drops exemplars in multiprocess mode).
+    Stages: parse_input, prediction_preprocess, power_transform (part of
+    prediction_preprocess), model_predict and render.
+    """
+
+    def __init__(self, registry):
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by endpoint, method and status',
+            ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS, registry=registry)
+        self.stage_latency = Histogram(
+            'prediction_stage_duration_seconds', 'Time spent in each serving stage per request',
+            ['endpoint', 'stage'], buckets=LATENCY_BUCKETS, registry=registry)
+        self.decisions = Counter(
+            'loan_decisions', 'Scored applicants by decision', ['endpoint', 'decision'], registry=registry)
+        self.errors = Counter(
+            'prediction_errors', 'Failed scoring requests by error type', ['endpoint', 'error_type'], registry=registry)
+
+    @staticmethod
+    def _exemplar(request_id):
+        return {'trace_id': request_id} if request_id else None
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float, request_id: str = None):
+        self.request_latency.labels(endpoint=endpoint, method=method, status=str(status)).observe(
+            seconds, exemplar=self._exemplar(request_id))
+
+    def observe_stages(self, endpoint: str, timings: dict, request_id: str = None):
+        """Observe every stage timed into `timings` (seconds by stage name)."""
+        exemplar = self._exemplar(request_id)
+        for stage, seconds in timings.items():
+            self.stage_latency.labels(endpoint=endpoint, stage=stage).observe(seconds, exemplar=exemplar)
+
+    @contextmanager
+    def timed(self, timings: dict, stage: str):
+        """Add the seconds spent in the block to timings[stage]."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+    def count_decisions(self, endpoint: str, predictions):
+        """Count approvals (class 1) and rejections in an array of class predictions."""
+        approved = int((predictions == 1).sum())
+        if approved:
+            self.decisions.labels(endpoint=endpoint, decision='approved').inc(approved)
+        if len(predictions) - approved:
+            self.decisions.labels(endpoint=endpoint, decision='rejected').inc(len(predictions) - approved)
+
+    def count_error(self, endpoint: str, error: Exception):
+        self.errors.labels(endpoint=endpoint, error_type=type(error).__name__).inc()
@@ -0,0 +1,287 @@
+"""
+Mergeable summaries for single-pass statistics over chunked data.
+
+Each sketch is updated chunk by chunk, can be merged with a sketch built on
+another chunk or worker, and serialises to plain JSON.
+"""
+import math
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016).
+    Level h holds items of weight 2^h; a full level is sorted and every other
+    item (random offset) is promoted, so memory stays O(k log(n/k)) and rank
+    error is about 1.7/k with high probability. Exact while n fits in level 0.
+    """
+
+    def __init__(self, k: int = 400, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved exactly
+                keep = items[:1] if len(items) % 2 else items[:0]
+                paired = items[len(keep):]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Capacities depend on the level count; start over from the bottom
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values) -> "KLLSketch":
+        """Add a batch of values; NaN is ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile of everything added; NaN when empty."""
+        if self.n == 0:
+            return float('nan')
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = min(np.searchsorted(cumulative, q * cumulative[-1]), len(items) - 1)
+        return float(items[order][position])
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    @property
+    def size(self) -> int:
+        """Number of items retained."""
+        return sum(len(items) for items in self.levels)
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KLLSketch":
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in data["levels"]]
+        return sketch
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning and Ertl 2019) with the k1 scale function.
+    Values are kept as weighted centroids that are small near the tails and
+    larger in the middle, so extreme quantiles are more precise than the
+    median; memory is O(compression). Exact while the data fits in the buffer.
+    `seed` is accepted for parity with KLLSketch; merging is deterministic.
+    """
+
+    def __init__(self, compression: int = 200, seed: int = 0):
+        self.compression = compression
+        self.n = 0
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        if len(means) <= self.compression:
+            self.means, self.weights = means, weights
+            return
+        # Centroids falling in the same unit interval of the k1 scale are merged,
+        # which bounds every centroid by its quantile position
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        scale = self.compression / (2 * math.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(scale - scale[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def update(self, values) -> "TDigest":
+        """Add a batch of values; NaN is ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+            self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one."""
+        if other.n:
+            self.n += other.n
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile, interpolated between centroid centres; NaN when empty."""
+        if self.n == 0:
+            return float('nan')
+        centres = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centres, self.weights.sum()]
+        values = np.r_[self.minimum, self.means, self.maximum]
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    @property
+    def size(self) -> int:
+        """Number of centroids retained."""
+        return len(self.means)
+
+    def to_dict(self) -> dict:
+        return {"compression": self.compression, "n": self.n, "min": self.minimum, "max": self.maximum,
+                "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        digest = cls(compression=data["compression"])
+        digest.n = data["n"]
+        digest.minimum, digest.maximum = data["min"], data["max"]
+        digest.means = np.asarray(data["means"], dtype=float)
+        digest.weights = np.asarray(data["weights"], dtype=float)
+        return digest
+
+
+# Quantile sketches by name; both take (accuracy parameter, seed)
+QUANTILE_SKETCHES = {"kll": KLLSketch, "tdigest": TDigest}
+
+
+def quantile_sketch_from_dict(data: dict):
+    """Rebuild a KLLSketch or TDigest from its to_dict() form."""
+    return TDigest.from_dict(data) if "compression" in data else KLLSketch.from_dict(data)
+
+
+class FrequencySketch:
+    """
+    Exact value counts for low-cardinality columns (categoricals, small counts).
+    mode() breaks ties like pandas' Series.mode()[0]: the smallest value wins.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, values) -> "FrequencySketch":
+        """Add a batch of values; missing values are ignored."""
+        values = np.asarray(values, dtype=object)
+        values = values[~pd.isna(values)]
+        if len(values):
+            labels, counts = np.unique(values, return_counts=True)
+            for label, count in zip(labels.tolist(), counts.tolist()):
+                self.counts[label] = self.counts.get(label, 0) + count
+        return self
+
+    def merge(self, other: "FrequencySketch") -> "FrequencySketch":
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+        return self
+
+    def mode(self):
+        if not self.counts:
+            return None
+        top = max(self.counts.values())
+        return min(label for label, count in self.counts.items() if count == top)
+
+    def to_dict(self) -> dict:
+        return {"counts": [[label, count] for label, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FrequencySketch":
+        sketch = cls()
+        sketch.counts = {label: count for label, count in data["counts"]}
+        return sketch
+
+
+class ReservoirSample:
+    """
+    Uniform sample of at most `capacity` rows from a stream (Algorithm R),
+    for statistics that need raw values, such as fitting a power transform.
+    """
+
+    def __init__(self, capacity: int, n_columns: int = 1, seed: int = 0):
+        self.capacity = capacity
+        self.seen = 0
+        self.rows = np.empty((0, n_columns))
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, rows) -> "ReservoirSample":
+        rows = np.asarray(rows, dtype=float).reshape(len(rows), -1)
+        free = max(0, self.capacity - len(self.rows))
+        if free:
+            self.rows = np.concatenate([self.rows, rows[:free]])
+        rest = rows[free:]
+        if len(rest):
+            # Row t (0-based over the stream) replaces a random slot with probability capacity/(t+1);
+            # fancy assignment keeps the last write per slot, as the sequential algorithm would
+            positions = self.seen + free + np.arange(len(rest))
+            slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            chosen = slots < self.capacity
+            self.rows[slots[chosen]] = rest[chosen]
+        self.seen += len(rows)
+        return self
+
+    def merge(self, other: "ReservoirSample") -> "ReservoirSample":
+        """Combine two reservoirs into a uniform sample of the union."""
+        total = self.seen + other.seen
+        if total == 0:
+            return self
+        take = min(self.capacity, len(self.rows) + len(other.rows))
+        # Draw from each side in proportion to how many rows it has seen
+        from_self = int(self._rng.binomial(take, self.seen / total))
+        from_self = min(max(from_self, take - len(other.rows)), len(self.rows))
+        mine = self.rows[self._rng.choice(len(self.rows), from_self, replace=False)]
+        theirs = other.rows[self._rng.choice(len(other.rows), take - from_self, replace=False)]
+        self.rows = np.concatenate([mine, theirs])
+        self.seen = total
+        return self
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "seen": self.seen, "rows": self.rows.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReservoirSample":
+        rows = np.asarray(data["rows"], dtype=float)
+        sample = cls(data["capacity"], rows.shape[1] if rows.ndim == 2 and rows.size else 1)
+        sample.seen = data["seen"]
+        if rows.size:
+            sample.rows = rows
+        return sample
+
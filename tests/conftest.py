@@ -0,0 +1,23 @@
+import os
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Config and artifact paths are relative to the repository root."""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope="session")
+def train_frame() -> pd.DataFrame:
+    """Training split shipped under artifacts/data."""
+    return pd.read_parquet(os.path.join(ROOT, "artifacts", "data", "train.parquet"))
+
+
+@pytest.fixture(scope="session")
+def raw_rows() -> pd.DataFrame:
+    """Raw applicant rows as a client would send them (test split without the label)."""
+    return pd.read_parquet(os.path.join(ROOT, "artifacts", "data", "test.parquet")).drop(columns=["loan_approved"])
@@ -0,0 +1,72 @@
+import dataclasses
+import importlib
+import joblib
+import pytest
+from src.components.model_serving import ModelBundle
+from src.components.transform_plan import TransformPlan
+from src.config.configuration import ConfigurationManager
+
+PLAN_PATH = "artifacts/model/transform_plan.json"
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """The app on an empty local registry, serving the shipped model and plan."""
+    mlflow_config = ConfigurationManager.get_mlflow_config
+    tracking_uri = f"file:{tmp_path_factory.mktemp('mlruns')}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+        # No background threads (watcher, traffic writer, drift scheduler) in tests
+        mp.setenv("DEFER_BACKGROUND_THREADS", "1")
+        mp.delenv("SERVING_STATE_DIR", raising=False)
+        mp.setattr(ConfigurationManager, "get_mlflow_config", lambda self: dataclasses.replace(
+            mlflow_config(self), tracking={**mlflow_config(self).tracking, "tracking_uri": tracking_uri}))
+        app = importlib.import_module("app")
+        model = joblib.load("artifacts/model/gigloanpredictormodel.pkl")
+        plan = TransformPlan.load(PLAN_PATH)
+        app.inference_context.bundle = ModelBundle(model, plan, "test", PLAN_PATH)
+        yield app.app.test_client()
+
+
+def records(rows, n=5):
+    rows = rows.head(n)
+    return rows.astype(object).where(rows.notna(), None).to_dict(orient="records")
+
+
+def test_batch_scores_valid_rows(client, raw_rows):
+    response = client.post("/predict/batch", json=records(raw_rows))
+
+    assert response.status_code == 200
+    predictions = response.get_json()["predictions"]
+    assert len(predictions) == 5
+    assert all(0 <= p["approval_probability"] <= 1 and p["loan_approved"] in (0, 1) for p in predictions)
+
+
+@pytest.mark.parametrize("column, value", [
+    ("age", "forty"),
+    ("monthly_income", "n/a"),
+    ("urban_rural", "Suburban"),
+    ("education_level", "PhD"),
+])
+def test_batch_rejects_invalid_values(client, raw_rows, column, value):
+    payload = records(raw_rows)
+    payload[2][column] = value
+    response = client.post("/predict/batch", json=payload)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_batch_rejects_missing_columns(client, raw_rows):
+    payload = records(raw_rows.drop(columns=["credit_score"]))
+    response = client.post("/predict/batch", json=payload)
+
+    assert response.status_code == 400
+    assert "credit_score" in response.get_json()["error"]
+
+
+def test_batch_rejects_bad_csv(client, raw_rows):
+    body = raw_rows.head(3).assign(urban_rural="Suburban").to_csv(index=False)
+    response = client.post("/predict/batch", data=body, content_type="text/csv")
+
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+import pytest
+from src.config import configuration
+from src.config.configuration import ConfigurationManager
+from src.utils.common import read_yaml
+
+
+@pytest.fixture
+def artifact_format(monkeypatch):
+    """Read config.yaml with `artifact_format` replaced by the value set on the returned dict."""
+    override = {}
+
+    def read(path):
+        config = read_yaml(path)
+        config["artifact_format"] = override["format"]
+        return config
+
+    monkeypatch.setattr(configuration, "read_yaml", read)
+    return override
+
+
+def test_data_files_take_the_artifact_format_extension(artifact_format):
+    artifact_format["format"] = "csv"
+    config_manager = ConfigurationManager()
+
+    paths = [config_manager.get_data_ingestion_config().data_file,
+             config_manager.get_model_drift_config().train_data_file,
+             config_manager.get_model_drift_config().test_data_file]
+    dp_config = config_manager.get_data_preprocessing_config()
+    paths += [dp_config.raw_data_file, dp_config.train_data_file, dp_config.test_data_file]
+
+    assert all(path.endswith(".csv") and ".parquet" not in path for path in paths)
+    assert config_manager.config["data_preprocessing"]["train_data_file"] == dp_config.train_data_file
+    assert dp_config.train_data_file == "artifacts/data/train.csv"
+
+
+def test_unknown_artifact_format_fails_fast(artifact_format):
+    artifact_format["format"] = "xlsx"
+    with pytest.raises(ValueError, match="xlsx"):
+        ConfigurationManager()
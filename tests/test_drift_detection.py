@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.drift_detection import native_drift
+
+
+def sample(rows, shift=0.0, seed=0):
+    """Two numeric columns and a categorical one; shift moves the numeric means and the level mix."""
+    rng = np.random.default_rng(seed)
+    level_weights = np.array([0.5, 0.3, 0.2]) if not shift else np.array([0.2, 0.3, 0.5])
+    return pd.DataFrame({
+        "income": rng.normal(3000 + 500 * shift, 500, rows),
+        "age": rng.normal(40 + 10 * shift, 10, rows).astype(np.float32),
+        "region": pd.Categorical(rng.choice(["urban", "rural", "semi"], rows, p=level_weights)),
+    })
+
+
+@pytest.mark.parametrize("rows, numeric_test, categorical_test", [
+    (800, "ks", "chisquare"),
+    (5000, "wasserstein", "psi"),
+])
+def test_shifted_columns_drift_and_unshifted_do_not(rows, numeric_test, categorical_test):
+    reference = sample(rows, seed=1)
+    same = native_drift(reference, sample(rows, seed=2))
+    shifted = native_drift(reference, sample(rows, shift=1.0, seed=2))
+
+    for column, test in [("income", numeric_test), ("age", numeric_test), ("region", categorical_test)]:
+        assert same["drift_by_columns"][column]["stattest"] == test
+        assert not same["drift_by_columns"][column]["drift_detected"]
+        assert shifted["drift_by_columns"][column]["drift_detected"]
+    assert not same["dataset_drift"] and shifted["dataset_drift"]
+
+    # The distances land on their own side of the thresholds whichever test judges the column
+    # (KS p-values are not checked on large samples, where they flag even negligible differences)
+    for column in ("income", "age"):
+        assert same["drift_by_columns"][column]["wasserstein"] < 0.1 <= shifted["drift_by_columns"][column]["wasserstein"]
+        assert same["drift_by_columns"][column]["psi"] < 0.2 <= shifted["drift_by_columns"][column]["psi"]
+    assert same["drift_by_columns"]["region"]["psi"] < 0.2 <= shifted["drift_by_columns"]["region"]["psi"]
+
+
+def test_all_missing_columns_are_skipped():
+    reference, current = sample(500), sample(500, seed=3)
+    current["income"] = np.nan
+
+    report = native_drift(reference, current)
+
+    assert report["skipped_columns"] == ["income"]
+    assert list(report["drift_by_columns"]) == ["age", "region"]
+
+
+@pytest.mark.parametrize("n_workers", [2, 3])
+def test_process_pool_report_matches_single_process(n_workers, tmp_path):
+    reference, current = sample(2000, seed=1), sample(1500, shift=0.5, seed=2)
+    for frame in (reference, current):
+        frame["bonus"] = np.nan if frame is current else frame["income"] / 10
+        frame["applicant_id"] = [f"id-{i}" for i in range(len(frame))]
+
+    single = native_drift(reference, current)
+    pooled = native_drift(reference, current, n_workers=n_workers, shared_dir=str(tmp_path))
+
+    assert pooled == single
+    assert list(pooled["drift_by_columns"]) == ["income", "age", "region"]
+    assert pooled["skipped_columns"] == ["bonus", "applicant_id"]
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,65 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.components.forest_engine import CompiledForest
+from src.components.transform_plan import TransformPlan
+
+
+@pytest.fixture(scope="module")
+def features(raw_rows):
+    plan = TransformPlan.load("artifacts/model/transform_plan.json")
+    return plan.transform_frame(raw_rows)
+
+
+def test_shipped_model_parity(features):
+    model = joblib.load("artifacts/model/gigloanpredictormodel.pkl")
+    forest = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_array_equal(forest.predict_proba(features.to_numpy()), model.predict_proba(features))
+    np.testing.assert_array_equal(forest.predict(features.to_numpy()), model.predict(features))
+    np.testing.assert_array_equal(forest.apply(features.to_numpy()), model.apply(features))
+
+
+@pytest.mark.parametrize("estimator", [
+    RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0),
+    ExtraTreesClassifier(n_estimators=25, random_state=0),
+    DecisionTreeClassifier(random_state=0),
+])
+def test_multiclass_parity(estimator):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6)).astype(np.float32)
+    y = np.digitize(X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.3, size=600), [-0.5, 0.5])
+    model = estimator.fit(X, y)
+    forest = CompiledForest.from_sklearn(model)
+
+    X_new = rng.normal(size=(300, 6))
+    # Small chunks exercise the chunked accumulation
+    np.testing.assert_array_equal(forest.predict_proba(X_new, chunk_rows=64), model.predict_proba(X_new))
+
+
+def test_save_load_round_trip(tmp_path, features):
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(features, np.arange(len(features)) % 2)
+    forest = CompiledForest.from_sklearn(model)
+    path = str(tmp_path / "forest.npz")
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+
+    assert loaded.allow_missing == forest.allow_missing
+    np.testing.assert_array_equal(loaded.predict_proba(features.to_numpy()), model.predict_proba(features))
+
+
+def test_missing_values_follow_sklearn(features):
+    model = joblib.load("artifacts/model/gigloanpredictormodel.pkl")
+    forest = CompiledForest.from_sklearn(model)
+    X = features.head(20).copy()
+    X.iloc[3, 0] = np.nan
+
+    try:
+        expected = model.predict_proba(X)
+    except ValueError:
+        with pytest.raises(ValueError, match="NaN"):
+            forest.predict_proba(X.to_numpy())
+    else:
+        np.testing.assert_array_equal(forest.predict_proba(X.to_numpy()), expected)
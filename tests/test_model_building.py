@@ -0,0 +1,77 @@
+import dataclasses
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.model_building import ModelBuilding
+from src.config.configuration import ConfigurationManager
+
+PARAMS = {"n_estimators": 10, "max_depth": 4, "min_samples_leaf": 2, "random_state": 0}
+
+
+def building_config(tmp_path, **overrides):
+    config = ConfigurationManager().get_model_building_config()
+    settings = dict(model_dir=str(tmp_path), model_params=PARAMS, backend="random_forest", n_jobs=1,
+                    warm_start=True, warm_start_increment=5, class_weight=None)
+    settings.update(overrides)
+    return dataclasses.replace(config, **settings)
+
+
+@pytest.fixture
+def training_set():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 6)), columns=[f"x{i}" for i in range(6)])
+    y = pd.Series((X["x0"] + rng.normal(scale=0.5, size=400) > 0).astype(int), name="loan_approved")
+    return X, y
+
+
+def test_warm_start_extends_saved_forest(tmp_path, training_set):
+    X, y = training_set
+    ModelBuilding(building_config(tmp_path, warm_start=False)).build_model(X, y)
+    first = ModelBuilding(building_config(tmp_path)).build_model(X, y)
+
+    assert len(first.estimators_) == 15
+    assert len(ModelBuilding(building_config(tmp_path)).build_model(X, y).estimators_) == 20
+
+
+@pytest.mark.parametrize("change", [{"max_depth": 8}, {"min_samples_leaf": 5}])
+def test_warm_start_refits_when_params_change(tmp_path, training_set, change):
+    X, y = training_set
+    ModelBuilding(building_config(tmp_path, warm_start=False)).build_model(X, y)
+    # Tuned parameters override model_params, so they count as a change too
+    model = ModelBuilding(building_config(tmp_path)).build_model(X, y, params=change)
+
+    assert len(model.estimators_) == 10
+    assert all(model.get_params()[name] == value for name, value in change.items())
+
+
+def test_warm_start_refits_when_class_weight_changes(tmp_path, training_set):
+    X, y = training_set
+    ModelBuilding(building_config(tmp_path, warm_start=False)).build_model(X, y)
+    model = ModelBuilding(building_config(tmp_path, class_weight="balanced")).build_model(X, y)
+
+    assert len(model.estimators_) == 10 and model.class_weight == "balanced"
+
+
+def chunks(X, y, n_chunks):
+    size = -(-len(X) // n_chunks)
+    return [(X.iloc[start:start + size], y.iloc[start:start + size]) for start in range(0, len(X), size)]
+
+
+@pytest.mark.parametrize("n_estimators, n_chunks", [(10, 3), (10, 4), (7, 7)])
+def test_streaming_forest_has_n_estimators_trees(tmp_path, training_set, n_estimators, n_chunks):
+    X, y = training_set
+    builder = ModelBuilding(building_config(tmp_path, warm_start=False))
+    model = builder.build_model_streaming(chunks(X, y, n_chunks), n_chunks, params={"n_estimators": n_estimators})
+
+    assert len(model.estimators_) == model.n_estimators == n_estimators
+    assert model.predict(X).shape == (len(X),)
+
+
+def test_streaming_skipped_chunk_trees_go_to_the_next_chunk(tmp_path, training_set):
+    X, y = training_set
+    batches = chunks(X, y, 4)
+    single_class = batches[1][1] == 1
+    batches[1] = (batches[1][0][single_class], batches[1][1][single_class])
+    model = ModelBuilding(building_config(tmp_path, warm_start=False)).build_model_streaming(batches, 4)
+
+    assert len(model.estimators_) == PARAMS["n_estimators"]
@@ -0,0 +1,36 @@
+import dataclasses
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src.components.model_evaluation import ModelEvaluation
+from src.config.configuration import ConfigurationManager
+
+
+@pytest.fixture
+def evaluation(tmp_path):
+    config = ConfigurationManager().get_model_evaluation_config()
+    return ModelEvaluation(dataclasses.replace(config, metrics_dir=str(tmp_path), training_stats_file=None,
+                                               rebalance_stats_file=None))
+
+
+def test_chunked_metrics_match_whole_test_set(evaluation):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(1000, 4)), columns=["a", "b", "c", "d"])
+    y = pd.Series((X["a"] + rng.normal(size=1000) > 0.3).astype(int))
+    model = RandomForestClassifier(n_estimators=10, max_depth=3, random_state=0).fit(X[:500], y[:500])
+    X_test, y_test = X[500:], y[500:]
+
+    whole = evaluation.evaluate(X_test, y_test, model=model)
+    # Uneven chunks, the first of them holding a single class
+    order = np.argsort(y_test.to_numpy(), kind="stable")
+    X_test, y_test = X_test.iloc[order], y_test.iloc[order]
+    bounds = [0, 40, 47, 260, 500]
+    batches = [(X_test.iloc[lo:hi], y_test.iloc[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+    chunked = evaluation.evaluate_batches(batches, model=model)
+
+    assert y_test.iloc[:40].nunique() == 1
+    for name in ["true_negative", "false_positive", "false_negative", "true_positive"]:
+        assert chunked[name] == whole[name]
+    for name in ["accuracy", "precision", "recall", "f1_score"]:
+        assert chunked[name] == pytest.approx(whole[name])
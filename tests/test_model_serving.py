@@ -0,0 +1,37 @@
+import dataclasses
+import pytest
+from src.components.model_serving import InferenceContext
+from src.config.configuration import ConfigurationManager
+
+
+@pytest.fixture
+def context(monkeypatch, tmp_path):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    config_manager = ConfigurationManager()
+    mlflow_config = config_manager.get_mlflow_config()
+    mlflow_config = dataclasses.replace(
+        mlflow_config, tracking={**mlflow_config.tracking, "tracking_uri": f"file:{tmp_path}"})
+    return InferenceContext(config_manager.get_data_preprocessing_config(),
+                            config_manager.get_prediction_config(), mlflow_config)
+
+
+def test_failed_loads_are_retried_once_per_interval(context, monkeypatch):
+    attempts = []
+
+    def failing_refresh(force=False):
+        attempts.append(force)
+        raise RuntimeError("registry unavailable")
+
+    monkeypatch.setattr(context, "refresh", failing_refresh)
+    clock = [1000.0]
+    monkeypatch.setattr("src.components.model_serving.time.monotonic", lambda: clock[0])
+
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            context.get_bundle()
+    assert len(attempts) == 1
+
+    clock[0] += context.pr_config.reload_interval
+    with pytest.raises(RuntimeError, match="registry unavailable"):
+        context.get_bundle()
+    assert len(attempts) == 2
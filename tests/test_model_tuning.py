@@ -0,0 +1,59 @@
+import dataclasses
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from src.components import model_tuning
+from src.components.model_tuning import ModelTuning, load_folds
+from src.config.configuration import ConfigurationManager
+
+
+def tuning_config(tmp_path, **overrides):
+    config = ConfigurationManager().get_model_tuning_config()
+    return dataclasses.replace(config, root_dir=str(tmp_path), storage=str(tmp_path / "journal.log"),
+                               cv_folds=3, n_trials=1, n_workers=1, min_trees=2, reduction_factor=2,
+                               search_space={"n_estimators": {"low": 4, "high": 4}}, **overrides)
+
+
+@pytest.fixture
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 5)), columns=[f"x{i}" for i in range(5)])
+    y = pd.Series((X["x0"] + rng.normal(scale=0.5, size=300) > 1.2).astype(int), name="loan_approved")
+    return X, y
+
+
+@pytest.mark.parametrize("method", ["smote", "smote_subset", "random_oversample"])
+def test_folds_rebalance_training_part_only(tmp_path, imbalanced, method):
+    X, y = imbalanced
+    tuner = ModelTuning(tuning_config(tmp_path, rebalance=method, smote_subset_rows=1000))
+    folds = load_folds(tuner._prepare_folds(X, y), 3)
+
+    real_rows = {tuple(row) for row in X.to_numpy(dtype=np.float32)}
+    valid_rows = []
+    for X_train, y_train, X_valid, y_valid in folds:
+        assert np.bincount(y_train)[0] == np.bincount(y_train)[1]
+        assert np.bincount(y_valid)[1] < np.bincount(y_valid)[0]
+        valid_rows += [tuple(row) for row in X_valid]
+    # Validation folds partition the real rows; none is synthetic
+    assert len(valid_rows) == len(X) and set(valid_rows) == real_rows
+
+
+def test_class_weight_applies_to_trials(tmp_path, imbalanced, monkeypatch):
+    X, y = imbalanced
+    config = tuning_config(tmp_path, rebalance="class_weight", class_weight="balanced")
+    folds = load_folds(ModelTuning(config)._prepare_folds(X, y), 3)
+    # No rows added to the training folds
+    assert sum(len(fold[1]) for fold in folds) == 2 * len(X)
+
+    built = []
+    forest = model_tuning.RandomForestClassifier
+    monkeypatch.setattr(model_tuning, "RandomForestClassifier", lambda **params: built.append(params) or forest(**params))
+    study = optuna.create_study(direction="maximize")
+    study.optimize(lambda trial: model_tuning._objective(trial, folds, config), n_trials=1)
+
+    assert len(built) == 3
+    for params, (_, y_train, _, _) in zip(built, folds):
+        weights = params["class_weight"]
+        # Balanced: both classes carry the same total weight
+        assert weights[0] * np.sum(y_train == 0) == pytest.approx(weights[1] * np.sum(y_train == 1))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.rebalancing import rebalance, smote_subset
+
+
+def imbalanced(rows=600, minority_share=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"age": rng.normal(40, 10, rows),
+                      "income": rng.normal(3000, 500, rows).astype(np.float32),
+                      "is_urban": rng.integers(0, 2, rows).astype(np.float32)})
+    y = pd.Series((rng.random(rows) < minority_share).astype(np.int64), name="loan_approved")
+    return X, y
+
+
+@pytest.mark.parametrize("subset_rows", [1000, 20])
+def test_smote_subset_balances_classes(subset_rows):
+    X, y = imbalanced()
+    X_res, y_res = smote_subset(X, y, subset_rows=subset_rows)
+
+    counts = y_res.value_counts()
+    assert counts[0] == counts[1] == (y == 0).sum()
+    assert len(X_res) == len(y_res)
+    # Originals first and unchanged
+    pd.testing.assert_frame_equal(X_res.iloc[:len(X)], X)
+    # Synthetic rows lie between minority rows
+    synthetic = X_res.iloc[len(X):]
+    minority = X[y == 1]
+    assert ((synthetic >= minority.min()) & (synthetic <= minority.max())).all().all()
+
+
+def test_smote_subset_keeps_column_dtypes():
+    X, y = imbalanced()
+    X_res, y_res = smote_subset(X, y, subset_rows=1000)
+
+    assert X_res.dtypes.to_dict() == X.dtypes.to_dict()
+    assert y_res.dtype == y.dtype and y_res.name == y.name
+
+
+def test_smote_subset_leaves_too_small_minority_alone():
+    X, y = imbalanced()
+    y[:] = 0
+    y.iloc[:5] = 1
+
+    X_res, y_res = smote_subset(X, y, subset_rows=1000, k_neighbors=5)
+
+    assert X_res is X and y_res is y
+    assert len(rebalance(X, y, "smote_subset", k_neighbors=4)[0]) == 2 * (len(y) - 5)
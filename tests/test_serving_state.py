@@ -0,0 +1,108 @@
+import dataclasses
+import os
+import threading
+import time
+import pytest
+from src.components.drift_monitor import DriftMonitor
+from src.config.configuration import ConfigurationManager
+from src.pipeline import training_jobs
+from src.pipeline.training_jobs import TrainingJobManager
+
+
+@pytest.fixture
+def gated_training(monkeypatch):
+    """TrainingPipeline.main that runs one stage and then waits for the test to release it."""
+    release = threading.Event()
+
+    def main(self, targets=None, progress=None):
+        progress("data_ingestion", "completed", 0.0)
+        release.wait(10)
+
+    monkeypatch.setattr(training_jobs.TrainingPipeline, "main", main)
+    monkeypatch.setattr(training_jobs, "STATE_POLL_SECONDS", 0.05)
+    return release
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_training_jobs_shared_between_workers(tmp_path, gated_training):
+    # Two managers on one state directory stand in for two gunicorn workers
+    refreshed = []
+    first = TrainingJobManager(on_success=lambda: refreshed.append("first"), state_dir=str(tmp_path))
+    second = TrainingJobManager(on_success=lambda: refreshed.append("second"), state_dir=str(tmp_path))
+    second.start()
+    try:
+        job = first.submit()
+        assert second.submit().job_id == job.job_id
+        wait_for(lambda: len(second.get(job.job_id)["events"]) == 1)
+        assert second.get(job.job_id)["status"] == "running"
+        assert second.get("unknown") is None
+
+        gated_training.set()
+        assert second.wait_for_update(job.job_id, 1, "running", timeout=5)["status"] == "completed"
+        # The other worker reloads once it sees the job complete
+        wait_for(lambda: refreshed == ["first", "second"])
+        # With the lock released, a new job starts; let it finish before the patched pipeline is restored
+        next_job = second.submit()
+        assert next_job.job_id != job.job_id
+        wait_for(lambda: second.get(next_job.job_id)["status"] == "completed")
+    finally:
+        gated_training.set()
+        second.stop()
+
+
+def test_training_job_of_exited_worker_reported_failed(tmp_path, gated_training):
+    first = TrainingJobManager(state_dir=str(tmp_path))
+    second = TrainingJobManager(state_dir=str(tmp_path))
+    job = first.submit()
+    wait_for(lambda: second.get(job.job_id)["status"] == "running")
+
+    # A worker that dies releases its lock with the job still marked running
+    gated_training.set()
+    first._executor.shutdown(wait=True)
+    path = tmp_path / "training_jobs" / f"{job.job_id}.json"
+    path.write_text(path.read_text().replace('"completed"', '"running"'))
+
+    status = second.get(job.job_id)
+    assert status["status"] == "failed"
+    assert "exited" in status["error"]
+
+
+def test_drift_counts_of_exited_workers_dropped(tmp_path, raw_rows):
+    config = ConfigurationManager().get_model_drift_config()
+    monitor = DriftMonitor(config, state_dir=str(tmp_path))
+    monitor.refresh()
+    monitor.update(raw_rows.iloc[:100])
+    monitor.share()
+    shared = tmp_path / "drift_monitor" / f"{os.getpid()}.json"
+    # A pid no process has: the highest possible one
+    shared.rename(shared.with_name(f"{2 ** 22 + 1}.json"))
+
+    assert monitor.snapshot()["current_rows"] == 100
+
+
+def test_drift_counts_merged_between_workers(tmp_path, monkeypatch, raw_rows):
+    config = dataclasses.replace(ConfigurationManager().get_model_drift_config(), min_current_rows=1)
+    first, second = DriftMonitor(config, state_dir=str(tmp_path)), DriftMonitor(config, state_dir=str(tmp_path))
+    alone = DriftMonitor(config)
+    for monitor in (first, second, alone):
+        assert monitor.refresh()
+    first.update(raw_rows.iloc[:300])
+    second.update(raw_rows.iloc[300:500])
+    alone.update(raw_rows.iloc[:500])
+
+    # Shared files are named by pid; give the first monitor another live process's name
+    with monkeypatch.context() as mp:
+        mp.setattr("os.getpid", lambda: os.getppid())
+        first.share()
+    merged = second.snapshot()
+
+    assert merged["current_rows"] == 500
+    expected = alone.snapshot()
+    for column, details in merged["columns"].items():
+        assert details["psi"] == pytest.approx(expected["columns"][column]["psi"])
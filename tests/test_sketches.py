@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src.utils.sketches import KLLSketch, TDigest, quantile_sketch_from_dict
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_errors(sketch, values: np.ndarray) -> np.ndarray:
+    """Distance between each requested quantile and the rank of the sketch's answer."""
+    values = np.sort(values)
+    ranks = np.array([np.searchsorted(values, sketch.quantile(q), side="right") for q in QUANTILES]) / len(values)
+    return np.abs(ranks - QUANTILES)
+
+
+def shards(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Shards of different sizes and distributions, as the chunks of a skewed dataset would be
+    return [rng.lognormal(mean=10, sigma=0.6, size=40_000), rng.normal(loc=20_000, scale=5_000, size=25_000),
+            rng.exponential(scale=15_000, size=35_000)]
+
+
+@pytest.mark.parametrize("make", [lambda seed: KLLSketch(400, seed), lambda seed: TDigest(400, seed)],
+                         ids=["kll", "tdigest"])
+def test_merged_sketch_accuracy(make):
+    parts = shards()
+    merged = make(0)
+    for i, part in enumerate(parts):
+        partial = make(i)
+        for chunk in np.array_split(part, 7):
+            partial.update(chunk)
+        merged.merge(partial)
+    values = np.concatenate(parts)
+
+    assert merged.n == len(values)
+    # KLL rank error is about 1.7 / k; t-digest is at least as tight here
+    assert rank_errors(merged, values).max() < 0.01
+
+
+@pytest.mark.parametrize("make", [KLLSketch, TDigest], ids=["kll", "tdigest"])
+def test_exact_while_small(make):
+    values = np.random.default_rng(1).normal(size=151)
+    sketch = make(400).update(values[:100]).merge(make(400).update(values[100:]))
+
+    assert sketch.median() == pytest.approx(np.median(values))
+
+
+@pytest.mark.parametrize("make", [KLLSketch, TDigest], ids=["kll", "tdigest"])
+def test_nan_ignored_and_dict_round_trip(make):
+    values = np.random.default_rng(2).uniform(size=20_000)
+    values[::10] = np.nan
+    sketch = make(200).update(values)
+    restored = quantile_sketch_from_dict(sketch.to_dict())
+
+    assert sketch.n == np.count_nonzero(~np.isnan(values))
+    assert type(restored) is make
+    assert [restored.quantile(q) for q in QUANTILES] == [sketch.quantile(q) for q in QUANTILES]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.traffic_recorder import TrafficRecorder
+from src.entity.config_entity import TrafficCaptureConfig
+
+
+def make_recorder(tmp_path, **overrides) -> TrafficRecorder:
+    settings = dict(enabled=True, traffic_dir=str(tmp_path / "traffic"), segment_rows=30, flush_interval=3600,
+                    max_segments=10, max_queue_batches=100, window_rows=50, window_mode="sliding")
+    settings.update(overrides)
+    return TrafficRecorder(TrafficCaptureConfig(**settings))
+
+
+def write_rows(recorder: TrafficRecorder, sizes):
+    """Write segments of the given sizes; row i carries age = i (its sequence number)."""
+    start = recorder.next_seq
+    for size in sizes:
+        recorder._write_segment(pd.DataFrame({"age": np.arange(start, start + size)}))
+        start += size
+
+
+def ages(frame: pd.DataFrame) -> list:
+    return frame["age"].astype(int).tolist()
+
+
+def test_sliding_window(tmp_path):
+    recorder = make_recorder(tmp_path)
+    write_rows(recorder, [30, 30, 25])
+
+    assert ages(recorder.window()) == list(range(35, 85))
+    assert ages(recorder.window(rows=10)) == list(range(75, 85))
+    # More rows asked for than captured: everything there is
+    assert ages(recorder.window(rows=500)) == list(range(85))
+
+
+def test_tumbling_window(tmp_path):
+    recorder = make_recorder(tmp_path, window_mode="tumbling")
+    write_rows(recorder, [30, 30, 25])
+
+    # Latest complete block of 50 rows counted from the first row: rows 0-49, not the partial 50-84
+    assert ages(recorder.window()) == list(range(50))
+    assert ages(recorder.window(rows=40)) == list(range(40, 80))
+    write_rows(recorder, [15])
+    assert ages(recorder.window()) == list(range(50, 100))
+
+
+def test_window_after_rotation(tmp_path):
+    recorder = make_recorder(tmp_path, max_segments=2)
+    write_rows(recorder, [30, 30, 25])
+
+    assert [first for _, first, _ in recorder.segments()] == [30, 60]
+    # The oldest segment is gone, so the window starts at the oldest kept row
+    assert ages(recorder.window(rows=80)) == list(range(30, 85))
+    # A new recorder on the same directory continues the sequence
+    assert make_recorder(tmp_path, max_segments=2).next_seq == 85
+
+
+def test_unknown_mode(tmp_path):
+    recorder = make_recorder(tmp_path)
+    write_rows(recorder, [10])
+    with pytest.raises(ValueError, match="Unknown window mode"):
+        recorder.window(mode="hopping")
+
+
+def test_writer_thread_flushes_on_stop(tmp_path, raw_rows):
+    recorder = make_recorder(tmp_path, segment_rows=1000)
+    recorder.start()
+    for start in range(0, 60, 20):
+        inputs = raw_rows.iloc[start:start + 20].reset_index(drop=True)
+        predictions = pd.DataFrame({"approval_probability": np.full(20, 0.5), "loan_approved": np.ones(20, dtype=int)})
+        recorder.record(inputs, predictions)
+    recorder.stop()
+
+    window = recorder.window(rows=100)
+    assert len(window) == 60
+    assert {"loan_approved", "approval_probability", "scored_at"} <= set(window.columns)
+    np.testing.assert_allclose(window["age"], raw_rows["age"].head(60).astype(np.float32))
@@ -0,0 +1,22 @@
+import numpy as np
+from src.components.transform_plan import TransformPlan, TransformPlanBuilder
+
+
+def test_plan_save_load_round_trip(tmp_path, train_frame, raw_rows):
+    plan = TransformPlan.fit(train_frame, platform_features=True)
+    path = str(tmp_path / "plan" / "transform_plan.json")
+    plan.save(path)
+    loaded = TransformPlan.load(path)
+
+    assert loaded.to_dict() == plan.to_dict()
+    np.testing.assert_array_equal(loaded.transform(raw_rows), plan.transform(raw_rows))
+    assert list(loaded.transform_frame(raw_rows.head(5)).columns) == plan.feature_names
+
+
+
+def test_builder_save_load_round_trip(tmp_path, train_frame):
+    builder = TransformPlanBuilder.from_frame(train_frame, chunk_rows=1000)
+    path = str(tmp_path / "builder.json")
+    builder.save(path)
+
+    assert TransformPlanBuilder.load(path).finalize().to_dict() == builder.finalize().to_dict()